@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Shared Airtable I/O for the venue scripts.
+
+list_records() reads a table through the list endpoint: a formula, a fields[]
+projection and/or a set of record IDs (RECORD_ID() OR-chunks, read in
+parallel), yielded as a generator while the next pages are prefetched.
+
+AirtableMirror keeps a local SQLite copy of a table (e.g. Venues). sync()
+only asks Airtable for records modified since the last sync of the fields
+requested (LAST_MODIFIED_TIME() formula + fields[] projection), so after the
+first run reads are deltas and queries run locally.
+
+AirtableWriteQueue is a write-behind queue for record updates. Updates to the
+same record are merged, and pending records go out 10 per PATCH (Airtable's
+batch limit) through a limiter that keeps every queue in the process under
+the base's 5 requests/second. Transient errors (429/5xx) are retried by the
+HTTP client; a batch rejected because of one bad record is re-sent record by
+record, so only that record fails. Queues flush on close() and again when
+the interpreter exits.
+
+Usage (scripts outside scripts/ put it on sys.path first):
+  from airtable_io import AirtableWriteQueue
+
+  queue = AirtableWriteQueue(api_key, base_id, 'Venues')
+  handle = queue.update(record_id, {'gps_coordinates': '45.1, 1.2'})
+  ...
+  queue.close()             # flush and stop
+  handle.ok, handle.error   # result once flushed (handle.wait() blocks)
+
+  mirror = AirtableMirror(api_key, base_id, 'Venues')
+  mirror.sync(['venue_name', 'venue_address', 'gps_coordinates'])
+  todo = [r for r in mirror.records() if not r['fields'].get('gps_coordinates')]
+  queue = AirtableWriteQueue(api_key, base_id, 'Venues', on_written=mirror.apply_update)
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import deque
+from queue import Full, Queue
+
+from http_client import RetryPolicy, TokenBucket, api_request, log
+
+AIRTABLE_API = 'https://api.airtable.com/v0'
+BATCH_SIZE = 10              # Records per PATCH (Airtable maximum)
+REQUESTS_PER_SECOND = 5      # Airtable per-base limit
+MAX_DELAY = 1.0              # Seconds an update waits for others to fill its batch
+SENDER_THREADS = 2
+
+# PATCH only sets the fields it names, so repeating one is safe
+AIRTABLE_RETRY = RetryPolicy(attempts=5, backoff=1, max_backoff=30,
+                             retry_statuses=(429, 500, 502, 503, 504),
+                             retry_methods={'GET', 'PATCH'})
+
+# Shared by every queue and reader in this process; taken on every attempt, retries included
+AIRTABLE_LIMITER = TokenBucket(REQUESTS_PER_SECOND * 60, burst=1)
+
+PAGE_SIZE = 100              # Records per list request (Airtable maximum)
+PREFETCH_PAGES = 2           # Pages read ahead of the caller, per query
+READ_WORKERS = 3             # Record-ID chunk queries read concurrently
+RECORD_ID_CHUNK = 50         # RECORD_ID() terms per formula (keeps the URL well under 16k)
+MIRROR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'working', 'airtable_mirror')
+SYNC_OVERLAP = 120           # Seconds re-read before the last sync (clock skew between us and Airtable)
+FULL_SYNC_EVERY = 24 * 3600  # Full re-read this often, to drop records deleted in Airtable
+
+
+def airtable_headers(api_key):
+    return {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+
+
+def table_url(base_id, table):
+    return f"{AIRTABLE_API}/{base_id}/{urllib.parse.quote(table, safe='')}"
+
+
+class AirtableError(Exception):
+    """An Airtable read failed."""
+
+
+# ─── Reading ────────────────────────────────────────────────────
+
+def _query_pages(api_key, url, params):
+    """Yield the records of each page of one list query, in order (pages
+    are chained by offset, so one query can only be read serially)."""
+    params = dict(params)
+    while True:
+        status, resp = api_request(f"{url}?{urllib.parse.urlencode(params, doseq=True)}",
+                                   headers=airtable_headers(api_key), method='GET',
+                                   retry=AIRTABLE_RETRY, limiter=AIRTABLE_LIMITER)
+        if status != 200 or not isinstance(resp, dict):
+            raise AirtableError(f"Airtable query failed ({status}): {str(resp)[:200]}")
+        yield resp.get('records', [])
+        params['offset'] = resp.get('offset')
+        if not params['offset']:
+            return
+
+
+class _PageFetcher(threading.Thread):
+    """Reads one query's pages into a small bounded buffer, so the next
+    page is already in flight while the caller handles the current one."""
+
+    def __init__(self, pages, stop):
+        super().__init__(daemon=True)
+        self.pages = pages
+        self.stop = stop
+        self.buffer = Queue(PREFETCH_PAGES)
+
+    def run(self):
+        try:
+            for page in self.pages:
+                if not self._put(('page', page)):
+                    return
+            self._put(('done', None))
+        except Exception as e:
+            self._put(('error', e))
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.buffer.put(item, timeout=0.5)
+                return True
+            except Full:
+                pass
+        return False
+
+
+def list_records(api_key, base_id, table, formula=None, fields=None, record_ids=None, prefetch=True):
+    """Yield every record ({id, createdTime, fields}) matching `formula`,
+    with only `fields` returned when given. `record_ids` limits the read to
+    those records: they are queried RECORD_ID_CHUNK at a time, READ_WORKERS
+    chunks concurrently. Records come back in query order either way.
+    With prefetch, pages are fetched ahead in background threads while the
+    caller works through the current one. Raises AirtableError."""
+    params = {'pageSize': str(PAGE_SIZE)}
+    if fields:
+        params['fields[]'] = list(fields)
+    if record_ids is None:
+        formulas = [formula]
+    else:
+        record_ids = list(dict.fromkeys(record_ids))
+        formulas = []
+        for i in range(0, len(record_ids), RECORD_ID_CHUNK):
+            ids = ','.join(f"RECORD_ID()={formula_string(rid)}"
+                           for rid in record_ids[i:i + RECORD_ID_CHUNK])
+            formulas.append(f"AND({formula}, OR({ids}))" if formula else f"OR({ids})")
+
+    url = table_url(base_id, table)
+    queries = [dict(params, filterByFormula=f) if f else params for f in formulas]
+    if not prefetch:
+        for query in queries:
+            for page in _query_pages(api_key, url, query):
+                yield from page
+        return
+
+    stop = threading.Event()
+    pending = iter(queries)
+    running = deque()
+
+    def start_next():
+        query = next(pending, None)
+        if query is not None:
+            fetcher = _PageFetcher(_query_pages(api_key, url, query), stop)
+            fetcher.start()
+            running.append(fetcher)
+
+    try:
+        for _ in range(READ_WORKERS):
+            start_next()
+        while running:
+            kind, value = running[0].buffer.get()
+            if kind == 'page':
+                yield from value
+            elif kind == 'error':
+                raise value
+            else:
+                running.popleft()
+                start_next()
+    finally:
+        stop.set()
+
+
+def formula_string(value):
+    """Quote a value for use inside an Airtable formula."""
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+# ─── Local Mirror ───────────────────────────────────────────────
+
+def _utc_iso(ts):
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(ts))
+
+
+class AirtableMirror:
+    """Local SQLite copy of one Airtable table.
+
+    Each record's fields are stored as JSON. For every mirrored field the
+    time of its last sync is kept, so sync(fields) only fetches records
+    modified since then (minus SYNC_OVERLAP), projected to those fields. A
+    full re-read (which also drops records deleted in Airtable) happens on
+    first use of a field and every FULL_SYNC_EVERY seconds. apply_update()
+    is the write-through hook for AirtableWriteQueue(on_written=...).
+    """
+
+    def __init__(self, api_key, base_id, table, path=None):
+        self.api_key = api_key
+        self.base_id = base_id
+        self.table = table
+        self.path = path or os.path.join(MIRROR_DIR, f"{base_id}_{table}.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS records (id TEXT PRIMARY KEY, fields TEXT NOT NULL)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS field_sync '
+                            '(field TEXT PRIMARY KEY, synced_at REAL NOT NULL, full_at REAL NOT NULL)')
+
+    def _field_sync(self, fields):
+        marks = ','.join('?' * len(fields))
+        rows = self.db.execute(f'SELECT field, synced_at, full_at FROM field_sync WHERE field IN ({marks})',
+                               list(fields)).fetchall()
+        return {field: (synced_at, full_at) for field, synced_at, full_at in rows}
+
+    def sync(self, fields, full=False):
+        """Bring `fields` up to date for every record. Returns the number of
+        records fetched from Airtable. Raises AirtableError."""
+        fields = sorted(set(fields))
+        started = time.time()
+        with self.lock:
+            known = self._field_sync(fields)
+        if not full and len(known) == len(fields):
+            since = min(synced_at for synced_at, _ in known.values())
+            full = started - min(full_at for _, full_at in known.values()) > FULL_SYNC_EVERY
+        else:
+            full = True
+
+        formula = None
+        if not full:
+            formula = (f"IS_AFTER(LAST_MODIFIED_TIME(), "
+                       f"DATETIME_PARSE({formula_string(_utc_iso(since - SYNC_OVERLAP))}))")
+        fetched = self._store(list_records(self.api_key, self.base_id, self.table, formula, fields),
+                              fields, prune=full)
+
+        with self.lock, self.db:
+            for field in fields:
+                full_at = started if full else known[field][1]
+                self.db.execute('INSERT OR REPLACE INTO field_sync VALUES (?, ?, ?)',
+                                (field, started, full_at))
+        log(f"  Mirror {self.table}: {'full' if full else 'incremental'} sync of "
+            f"{len(fields)} field(s), {fetched} record(s) fetched")
+        return fetched
+
+    def refresh_records(self, record_ids, fields):
+        """Re-read `fields` of the given records from Airtable now (projected
+        list queries by RECORD_ID()). Returns the records fetched."""
+        return self._store(list_records(self.api_key, self.base_id, self.table,
+                                        fields=fields, record_ids=record_ids), fields)
+
+    def _store(self, records, fields, prune=False):
+        """Merge fetched records' `fields` into the mirror (a field absent
+        from a record is empty in Airtable). Returns the count stored."""
+        seen = set()
+        page = []
+        for rec in records:
+            seen.add(rec['id'])
+            page.append(rec)
+            if len(page) >= PAGE_SIZE:
+                self._merge(page, fields)
+                page = []
+        self._merge(page, fields)
+        if prune:
+            with self.lock, self.db:
+                gone = [rid for (rid,) in self.db.execute('SELECT id FROM records') if rid not in seen]
+                self.db.executemany('DELETE FROM records WHERE id = ?', [(rid,) for rid in gone])
+        return len(seen)
+
+    def _merge(self, records, fields):
+        with self.lock, self.db:
+            for rec in records:
+                row = self.db.execute('SELECT fields FROM records WHERE id = ?', (rec['id'],)).fetchone()
+                stored = json.loads(row[0]) if row else {}
+                for field in fields:
+                    stored.pop(field, None)
+                stored.update(rec.get('fields', {}))
+                self.db.execute('INSERT OR REPLACE INTO records VALUES (?, ?)',
+                                (rec['id'], json.dumps(stored, ensure_ascii=False)))
+
+    def records(self, fields=None):
+        """Yield every mirrored record as {'id', 'fields'} (like the Airtable
+        API), with fields limited to `fields` when given."""
+        with self.lock:
+            rows = self.db.execute('SELECT id, fields FROM records ORDER BY id').fetchall()
+        for record_id, data in rows:
+            stored = json.loads(data)
+            if fields is not None:
+                stored = {f: stored[f] for f in fields if f in stored}
+            yield {'id': record_id, 'fields': stored}
+
+    def get(self, record_id):
+        with self.lock:
+            row = self.db.execute('SELECT fields FROM records WHERE id = ?', (record_id,)).fetchone()
+        return {'id': record_id, 'fields': json.loads(row[0])} if row else None
+
+    def apply_update(self, record_id, fields):
+        """Write-through: apply fields just written to Airtable locally."""
+        with self.lock, self.db:
+            row = self.db.execute('SELECT fields FROM records WHERE id = ?', (record_id,)).fetchone()
+            stored = json.loads(row[0]) if row else {}
+            for field, value in fields.items():
+                if value in (None, ''):
+                    stored.pop(field, None)
+                else:
+                    stored[field] = value
+            self.db.execute('INSERT OR REPLACE INTO records VALUES (?, ?)',
+                            (record_id, json.dumps(stored, ensure_ascii=False)))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# ─── Write Queue ────────────────────────────────────────────────
+
+class PendingUpdate:
+    """Result of a queued update: `ok` is None until its batch was sent."""
+
+    def __init__(self, record_id):
+        self.record_id = record_id
+        self.ok = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the update was sent. Returns True if it was written."""
+        self._done.wait(timeout)
+        return bool(self.ok)
+
+    def _finish(self, ok, error=None):
+        self.ok = ok
+        self.error = error
+        self._done.set()
+
+
+class AirtableWriteQueue:
+    """Write-behind queue of field updates for one Airtable table.
+
+    update() returns immediately. A batch is sent as soon as BATCH_SIZE
+    records are pending, or once the oldest has waited `max_delay` seconds,
+    so callers that need the result can wait() on the returned handle
+    without stalling for long. `on_written(record_id, fields)` is called
+    after each successful write (e.g. AirtableMirror.apply_update).
+    """
+
+    def __init__(self, api_key, base_id, table, batch_size=BATCH_SIZE, max_delay=MAX_DELAY,
+                 limiter=None, typecast=False, senders=SENDER_THREADS, on_written=None):
+        self.api_key = api_key
+        self.on_written = on_written  # called as on_written(record_id, fields) after each write
+        self.url = table_url(base_id, table)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.limiter = limiter or AIRTABLE_LIMITER
+        self.typecast = typecast
+        self.pending = {}        # record_id -> [fields, handle, queued_at]  (oldest first)
+        self.in_flight = 0
+        self.flushing = 0
+        self.closed = False
+        self.requests = 0        # PATCH calls made
+        self.written = 0         # records written
+        self.failed = {}         # record_id -> error
+        self.cond = threading.Condition()
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(senders)]
+        for thread in self.threads:
+            thread.start()
+        _QUEUES.add(self)
+
+    def update(self, record_id, fields):
+        """Queue `fields` for record_id (merged with any queued update to the
+        same record). Returns a PendingUpdate."""
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("AirtableWriteQueue is closed")
+            entry = self.pending.get(record_id)
+            if entry is not None:
+                entry[0].update(fields)
+                return entry[1]
+            handle = PendingUpdate(record_id)
+            self.pending[record_id] = [dict(fields), handle, time.monotonic()]
+            self.cond.notify()
+            return handle
+
+    def flush(self):
+        """Send everything queued so far and wait until it is written."""
+        with self.cond:
+            self.flushing += 1
+            self.cond.notify_all()
+            try:
+                while self.pending or self.in_flight:
+                    self.cond.wait()
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        """Flush and stop the sender threads. Safe to call twice."""
+        if self.closed:
+            return
+        self.flush()
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join()
+        _QUEUES.discard(self)
+        if self.failed:
+            log(f"  Airtable: {len(self.failed)} record(s) not written")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Sender threads
+
+    def _ready(self):
+        """Seconds until the next batch is due (0 = now), or None if idle."""
+        if not self.pending:
+            return None
+        if self.flushing or self.closed or len(self.pending) >= self.batch_size:
+            return 0
+        oldest = next(iter(self.pending.values()))[2]
+        return max(0.0, oldest + self.max_delay - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    wait = self._ready()
+                    if wait == 0:
+                        break
+                    if wait is None and self.closed:
+                        return
+                    self.cond.wait(wait)
+                batch = []
+                for record_id in list(self.pending)[:self.batch_size]:
+                    fields, handle, _ = self.pending.pop(record_id)
+                    batch.append((record_id, fields, handle))
+                self.in_flight += 1
+            try:
+                self._send(batch)
+            except Exception as e:
+                # Keep the thread alive and release every waiter on this batch
+                for _, _, handle in batch:
+                    if not handle._done.is_set():
+                        self._finish(handle, False, f"{type(e).__name__}: {e}")
+            finally:
+                with self.cond:
+                    self.in_flight -= 1
+                    self.cond.notify_all()
+
+    def _patch(self, batch):
+        payload = {'records': [{'id': record_id, 'fields': fields} for record_id, fields, _ in batch]}
+        if self.typecast:
+            payload['typecast'] = True
+        with self.cond:
+            self.requests += 1
+        return api_request(self.url, data=payload, headers=airtable_headers(self.api_key),
+                           method='PATCH', retry=AIRTABLE_RETRY, limiter=self.limiter)
+
+    def _send(self, batch):
+        status, resp = self._patch(batch)
+        if status == 200 and isinstance(resp, dict):
+            written = {rec.get('id') for rec in resp.get('records', [])}
+            missing = [item for item in batch if item[0] not in written]
+            for record_id, fields, handle in batch:
+                if record_id in written:
+                    if self.on_written is not None:
+                        try:
+                            self.on_written(record_id, fields)
+                        except Exception as e:
+                            log(f"  Airtable: {record_id} written, but on_written failed: {e}")
+                    self._finish(handle, True)
+            if missing and len(batch) > 1:
+                for item in missing:
+                    self._send([item])
+            else:
+                for _, _, handle in missing:
+                    self._finish(handle, False, "record missing from Airtable response")
+            return
+
+        if len(batch) > 1 and status in (400, 403, 404, 413, 422):
+            # One bad record (deleted, invalid field value) rejects the whole
+            # batch: re-send record by record so only that one fails
+            for item in batch:
+                self._send([item])
+            return
+
+        error = f"HTTP {status}: {str(resp)[:200]}"
+        for record_id, _, handle in batch:
+            self._finish(handle, False, error)
+
+    def _finish(self, handle, ok, error=None):
+        with self.cond:
+            if ok:
+                self.written += 1
+            else:
+                self.failed[handle.record_id] = error
+                log(f"  Airtable update failed for {handle.record_id}: {error}")
+        handle._finish(ok, error)
+
+
+_QUEUES = set()
+
+
+@atexit.register
+def _flush_on_exit():
+    for queue in list(_QUEUES):
+        queue.close()
@@ -2,19 +2,30 @@
 Batch extract profile image URLs from FWS venue listing pages.
 
 Queries Airtable for venues with an fws_url but no image_url,
-fetches each page, extracts the og:image meta tag (or feature_banner_img
-fallback), and writes the URL back to image_url.
+fetches the pages concurrently (politely: a few at a time per host),
+extracts the og:image meta tag (or feature_banner_img fallback), and writes
+the URL back to image_url in batches.
+
+Each page is streamed through an incremental HTML scanner only until the
+image tag has been seen (og:image sits in <head>), and re-runs send the
+ETag / Last-Modified of the previous fetch, so unchanged pages answer 304
+with no body.
 
 Usage:
-  python scripts/batch_extract_image_urls.py
+  python scripts/batch_extract_image_urls.py [--check-images] [--workers <n>]
+
+  --check-images  HEAD-check each extracted image URL; broken ones are not written
+  --workers <n>   pages fetched at once (default 8; per-host limits still apply)
 """
+import html
 import json
 import os
 import re
 import sys
-import time
-import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from airtable_io import AirtableError, AirtableMirror, AirtableWriteQueue
+from http_client import HostLimiter, RetryPolicy, get_client
 
 # Fix Windows console encoding
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
@@ -30,155 +41,254 @@ FETCH_HEADERS = {
     "Accept": "text/html,application/xhtml+xml",
 }
 
-RATE_LIMIT_DELAY = 1.0  # seconds between page fetches
+WORKERS = 8                 # Pages fetched at once
+PER_HOST_CONNECTIONS = 4    # Requests in flight to any one host
+PER_HOST_RATE = 10          # Requests started per second to any one host
+MAX_HTML_CHARS = 2_000_000  # Stop reading a page after this much without an image
 
+PAGE_RETRY = RetryPolicy(attempts=3, backoff=1, max_backoff=10)
 
-# ─── HTTP Helpers ────────────────────────────────────────────────
+# ETag / Last-Modified and result of each page's last fetch, for conditional re-fetches
+VALIDATORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "working",
+                               "image_url_pages.json")
 
-def api_request(url, data=None, headers=None, method="GET"):
-    """Make HTTP request. Returns (status_code, parsed_response)."""
-    if headers is None:
-        headers = {}
-    body = None
-    if data is not None:
-        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
-    try:
-        resp = urllib.request.urlopen(req, timeout=120)
-        return resp.status, json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        try:
-            error_body = e.read().decode("utf-8")
-        except Exception:
-            error_body = str(e)
-        return e.code, error_body
-    except urllib.error.URLError as e:
-        return 0, f"Network error: {e.reason}"
-    except Exception as e:
-        return 0, f"Error: {str(e)}"
+HOST_LIMITER = HostLimiter(PER_HOST_CONNECTIONS, PER_HOST_RATE)
 
 
-def fetch_html(url):
-    """Fetch a web page and return the HTML as a string. Returns None on error."""
-    req = urllib.request.Request(url, headers=FETCH_HEADERS)
+# ─── HTTP Helpers ────────────────────────────────────────────────
+
+def load_validators():
     try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        return resp.read().decode("utf-8", errors="replace")
-    except urllib.error.HTTPError as e:
-        print(f"    HTTP {e.code} fetching {url}")
-        return None
-    except urllib.error.URLError as e:
-        print(f"    Network error fetching {url}: {e.reason}")
-        return None
-    except Exception as e:
-        print(f"    Error fetching {url}: {e}")
-        return None
+        with open(VALIDATORS_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_validators(validators):
+    os.makedirs(os.path.dirname(VALIDATORS_PATH), exist_ok=True)
+    tmp = VALIDATORS_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(validators, f, indent=1)
+    os.replace(tmp, VALIDATORS_PATH)
+
+
+def fetch_page_head(url, previous=None):
+    """Fetch a page, reading only as far as its image tag. Returns (status,
+    image_url, headers): image_url is None if the page has none, for an
+    HTTP error, or for a 304 Not Modified (sent when `previous` validators
+    still match). Raises OSError if the host can't be reached."""
+    headers = dict(FETCH_HEADERS)
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous and previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    with HOST_LIMITER.slot(url):
+        with get_client().stream("GET", url, headers=headers, timeout=30, retry=PAGE_RETRY) as resp:
+            if resp.status != 200:
+                return resp.status, None, resp.headers
+            return 200, stream_image_url(resp.iter_text()), resp.headers
+
+
+def image_url_ok(image_url):
+    """HEAD-check an image URL: True if it answers 2xx with an image (or
+    unspecified) content type. Falls back to GET for servers without HEAD."""
+    for method in ("HEAD", "GET"):
+        try:
+            with HOST_LIMITER.slot(image_url):
+                with get_client().stream(method, image_url, headers={"User-Agent": FETCH_HEADERS["User-Agent"]},
+                                         timeout=30, retry=PAGE_RETRY) as resp:
+                    status, content_type = resp.status, resp.headers.get("Content-Type", "")
+                    if method == "HEAD":
+                        resp.content  # empty: finishing it puts the connection back in the pool
+        except OSError:
+            return False
+        if status in (405, 501) and method == "HEAD":
+            continue
+        return 200 <= status < 300 and (not content_type or content_type.startswith("image/"))
+    return False
 
 
-def airtable_headers():
-    return {"Authorization": f"Bearer {AIRTABLE_API_KEY}", "Content-Type": "application/json"}
+# ─── Image Extraction ───────────────────────────────────────────
 
+# Where scanning can stop to look closer: the two tags we want, and the
+# blocks whose content is not markup (a "<meta" inside them is just text)
+TAG_START_RE = re.compile(r'<(?:(meta|img)(?=[\s/>])|(script|style)(?=[\s>])|(!--))', re.IGNORECASE)
+TAG_REST_RE = re.compile(r'(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')   # one char per step: no backtracking blow-up
+ATTR_RE = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+BLOCK_END = {'script': re.compile(r'</script\s*>', re.IGNORECASE),
+             'style': re.compile(r'</style\s*>', re.IGNORECASE),
+             '!--': re.compile(r'-->')}
+MAX_TAG_CHARS = 16 * 1024   # A <meta>/<img> longer than this is skipped
+
+
+def tag_attrs(tag):
+    """Attributes of a start tag's text (after the name) as {lowercase name: value}."""
+    return {m.group(1).lower(): html.unescape(m.group(2) or m.group(3) or m.group(4) or '')
+            for m in ATTR_RE.finditer(tag)}
+
+
+class ImageTagFinder:
+    """Incremental scan for the profile image: the first
+    <meta property="og:image" content=...> or <img class="feature_banner_img"
+    src=...>, attributes in any order. Feed it text chunks; it jumps from
+    one candidate tag to the next, skips <script>/<style>/comment bodies
+    without keeping them, and holds at most one unfinished tag between
+    chunks, so memory does not grow with the page. (og:image lives in
+    <head>, so it always comes before the banner.)"""
+
+    def __init__(self):
+        self.image_url = None
+        self.buffer = ''
+        self.block_end = None   # closing pattern while inside script/style/comment
+
+    def feed(self, data):
+        """Scan another chunk. Returns the image URL once found, else None."""
+        if self.image_url is not None:
+            return self.image_url
+        buf = self.buffer + data
+        pos = 0
+        while True:
+            if self.block_end is not None:
+                end = self.block_end.search(buf, pos)
+                if end is None:
+                    pos = max(pos, len(buf) - 16)   # keep a tail in case the closing tag is split
+                    break
+                self.block_end = None
+                pos = end.end()
+                continue
+
+            start = TAG_START_RE.search(buf, pos)
+            if start is None:
+                pos = max(pos, len(buf) - 16)       # keep a tail in case a tag name is split
+                break
+            if start.group(2) or start.group(3):
+                self.block_end = BLOCK_END[(start.group(2) or start.group(3)).lower()]
+                pos = start.end()
+                continue
+
+            rest = TAG_REST_RE.match(buf, start.end())
+            if rest is None:
+                if len(buf) - start.start() > MAX_TAG_CHARS:
+                    pos = start.end()               # runaway tag: skip it
+                    continue
+                pos = start.start()                 # unfinished tag: wait for more
+                break
+            pos = rest.end()
+            if self._match(start.group(1).lower(), tag_attrs(rest.group(0)[:-1])):
+                break
+        self.buffer = buf[pos:] if self.image_url is None else ''
+        return self.image_url
+
+    def _match(self, tag, attrs):
+        if tag == 'meta':
+            if attrs.get('property', '').lower() == 'og:image' and attrs.get('content', '').strip():
+                self.image_url = attrs['content'].strip()
+        elif 'feature_banner_img' in attrs.get('class', '').split() and attrs.get('src', '').strip():
+            self.image_url = attrs['src'].strip()
+        return self.image_url is not None
+
+
+def stream_image_url(chunks):
+    """Feed HTML text chunks to an ImageTagFinder until it has the image
+    URL (or MAX_HTML_CHARS were read). Returns the URL or None."""
+    finder = ImageTagFinder()
+    read = 0
+    for chunk in chunks:
+        if finder.feed(chunk):
+            return finder.image_url
+        read += len(chunk)
+        if read > MAX_HTML_CHARS:
+            break
+    return None
 
-# ─── Image Extraction ───────────────────────────────────────────
 
-def extract_image_url(html):
+def extract_image_url(page_html):
     """Extract the profile image URL from FWS venue page HTML.
 
     Tries og:image meta tag first, then feature_banner_img img src.
     Returns the URL string or None.
     """
-    # Strategy 1: og:image meta tag
-    # Handles both attribute orderings:
-    #   <meta property="og:image" content="URL" />
-    #   <meta content="URL" property="og:image" />
-    match = re.search(
-        r'<meta\s+(?:property=["\']og:image["\']\s+content=["\']([^"\']+)["\']'
-        r'|content=["\']([^"\']+)["\']\s+property=["\']og:image["\'])',
-        html,
-        re.IGNORECASE,
-    )
-    if match:
-        url = match.group(1) or match.group(2)
-        if url:
-            return url.strip()
-
-    # Strategy 2: feature_banner_img class on an img tag
-    match = re.search(
-        r'<img\s[^>]*class=["\'][^"\']*feature_banner_img[^"\']*["\'][^>]*src=["\']([^"\']+)["\']',
-        html,
-        re.IGNORECASE,
-    )
-    if match:
-        return match.group(1).strip()
-
-    # Also try src before class (attribute order can vary)
-    match = re.search(
-        r'<img\s[^>]*src=["\']([^"\']+)["\'][^>]*class=["\'][^"\']*feature_banner_img[^"\']*["\']',
-        html,
-        re.IGNORECASE,
-    )
-    if match:
-        return match.group(1).strip()
-
-    return None
+    return ImageTagFinder().feed(page_html)
 
 
 # ─── Airtable ────────────────────────────────────────────────────
 
-def fetch_venues_missing_image():
-    """Fetch all venue records that have fws_url but no image_url."""
+def fetch_venues_missing_image(mirror):
+    """Fetch all venue records that have fws_url but no image_url
+    (delta-synced into the local mirror, then filtered locally)."""
+    try:
+        mirror.sync(["venue_name", "fws_url", "image_url"])
+    except AirtableError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
     records = []
-    offset = None
-    formula = "AND({fws_url} != '', {image_url} = '')"
-
-    while True:
-        params = {
-            "filterByFormula": formula,
-            "fields[]": ["venue_name", "fws_url"],
-            "pageSize": "100",
-        }
-        if offset:
-            params["offset"] = offset
-
-        url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE}?{urllib.parse.urlencode(params, doseq=True)}"
-        status, resp = api_request(url, headers=airtable_headers(), method="GET")
-
-        if status != 200:
-            print(f"ERROR: Airtable query failed ({status}): {resp}")
-            sys.exit(1)
-
-        for rec in resp.get("records", []):
-            fields = rec.get("fields", {})
+    for rec in mirror.records():
+        fields = rec["fields"]
+        if fields.get("fws_url", "") and not fields.get("image_url", ""):
             records.append({
                 "id": rec["id"],
                 "name": fields.get("venue_name", "(unnamed)"),
                 "fws_url": fields.get("fws_url", ""),
             })
+    return records
 
-        offset = resp.get("offset")
-        if not offset:
-            break
 
-    return records
+def update_image_url(queue, record_id, image_url):
+    """Queue a image_url update (written in batches of 10). Returns a PendingUpdate."""
+    return queue.update(record_id, {"image_url": image_url})
 
 
-def update_image_url(record_id, image_url):
-    """Write image_url to a single Airtable record."""
-    url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE}/{record_id}"
-    status, _ = api_request(
-        url,
-        data={"fields": {"image_url": image_url}},
-        headers=airtable_headers(),
-        method="PATCH",
-    )
-    return status == 200
+# ─── Pipeline ────────────────────────────────────────────────────
+
+def find_image(fws_url, previous, check_images):
+    """Fetch one venue page and extract its image URL. Returns (image_url,
+    reason, validators): reason says why image_url is None; validators are
+    what to remember about the page for the next run (None: keep previous)."""
+    try:
+        status, image_url, headers = fetch_page_head(fws_url, previous)
+    except Exception as e:
+        return None, f"could not fetch page: {e}", None
+
+    if status == 304:
+        validators = previous
+        image_url = previous.get("image_url")
+    elif status != 200:
+        return None, f"could not fetch page: HTTP {status}", None
+    else:
+        validators = None
+        if headers.get("ETag") or headers.get("Last-Modified"):
+            validators = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"),
+                          "image_url": image_url}
+
+    if image_url is None:
+        return None, "no image found on page", validators
+    if check_images and not image_url_ok(image_url):
+        return None, f"image URL does not load: {image_url}", validators
+    return image_url, None, validators
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
 
 
 # ─── Main ────────────────────────────────────────────────────────
 
 def main():
+    argv = sys.argv[1:]
+    workers = pop_option(argv, "--workers", int) or WORKERS
+    check_images = "--check-images" in argv
+
     print("Fetching venues with fws_url but no image_url...")
-    venues = fetch_venues_missing_image()
+    mirror = AirtableMirror(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE)
+    venues = fetch_venues_missing_image(mirror)
 
     if not venues:
         print("No venues found that need image extraction.")
@@ -186,42 +296,44 @@ def main():
 
     print(f"Found {len(venues)} venue(s) to process.\n")
 
+    queue = AirtableWriteQueue(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE,
+                               on_written=mirror.apply_update)
     success = 0
     failed = 0
     skipped = 0
 
-    for i, v in enumerate(venues, 1):
-        name = v["name"]
-        fws_url = v["fws_url"]
-
-        if not fws_url.strip():
-            print(f"  [{i}/{len(venues)}] {name} — SKIP (empty fws_url)")
+    todo = []
+    for v in venues:
+        if v["fws_url"].strip():
+            todo.append(v)
+        else:
+            print(f"  {v['name']} — SKIP (empty fws_url)")
             skipped += 1
-            continue
 
-        print(f"  [{i}/{len(venues)}] {name} — fetching {fws_url}")
-        html = fetch_html(fws_url)
-
-        if html is None:
-            print(f"    FAIL (could not fetch page)")
-            failed += 1
-        else:
-            image_url = extract_image_url(html)
+    validators = load_validators()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(find_image, v["fws_url"], validators.get(v["fws_url"]), check_images): v
+                   for v in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            v = futures[future]
+            image_url, reason, seen = future.result()
+            if seen:
+                validators[v["fws_url"]] = seen
             if image_url is None:
-                print(f"    FAIL (no image found on page)")
+                print(f"  [{i}/{len(todo)}] {v['name']} — FAIL ({reason})")
                 failed += 1
             else:
-                ok = update_image_url(v["id"], image_url)
-                if ok:
-                    print(f"    OK — {image_url}")
-                    success += 1
-                else:
-                    print(f"    FAIL (Airtable write error)")
-                    failed += 1
-
-        # Polite crawling delay
-        if i < len(venues):
-            time.sleep(RATE_LIMIT_DELAY)
+                update_image_url(queue, v["id"], image_url)
+                print(f"  [{i}/{len(todo)}] {v['name']} — OK — {image_url}")
+                success += 1
+    save_validators(validators)
+
+    # Flush the queued Airtable writes; a record that could not be written counts as failed
+    queue.close()
+    for record_id, error in queue.failed.items():
+        print(f"  {record_id} — FAIL (Airtable write error: {error})")
+    success -= len(queue.failed)
+    failed += len(queue.failed)
 
     print(f"\nDone. Success: {success} | Failed: {failed} | Skipped: {skipped}")
 
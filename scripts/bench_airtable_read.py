@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Airtable bulk reads, serial paging vs airtable_io.list_records.
+
+Starts a local stub of the Airtable list endpoint (offset paging, fields[]
+projection, RECORD_ID() filters) that answers each request after a fixed
+latency, like the real API, and times two warm-up style reads:
+  - a full-table scan (what the batch scripts did on every run)
+  - a read of a scattered set of record IDs (e.g. a --batch manifest)
+each with prefetch off (one page at a time, as before) and on. The caller
+spends --work-ms per record on each page, standing in for parsing and the
+mirror's SQLite writes.
+
+Both modes go through the shared 5 requests/second limiter, so the gain
+is bounded by it: reads can overlap the caller's work and each other, but
+never exceed Airtable's per-base rate.
+
+Usage:
+  python bench_airtable_read.py [--records N] [--latency-ms N] [--work-ms N]
+"""
+
+import json
+import re
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import airtable_io
+from airtable_io import list_records
+
+LATENCY = 0.25
+TABLE = {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        wanted = params.get('fields[]')
+        ids = sorted(TABLE)
+        record_ids = re.findall(r"RECORD_ID\(\)='([^']+)'", params.get('filterByFormula', [''])[0])
+        if record_ids:
+            ids = [rid for rid in record_ids if rid in TABLE]
+        offset = int(params.get('offset', ['0'])[0])
+        size = int(params['pageSize'][0])
+        page = ids[offset:offset + size]
+        body = {'records': [{'id': rid, 'fields': {k: v for k, v in TABLE[rid].items()
+                                                   if not wanted or k in wanted}}
+                            for rid in page]}
+        if offset + size < len(ids):
+            body['offset'] = str(offset + size)
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v0"
+
+
+def timed(label, work, **kwargs):
+    start = time.perf_counter()
+    count = 0
+    for _ in list_records('key', 'appBench', 'Venues', **kwargs):
+        count += 1
+        time.sleep(work)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {count:>5} records  {elapsed:6.2f}s")
+    return elapsed
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
+
+
+def main():
+    global LATENCY
+    argv = sys.argv[1:]
+    n = pop_option(argv, '--records', int) or 2000
+    LATENCY = (pop_option(argv, '--latency-ms', float) or 250) / 1000
+    work = (pop_option(argv, '--work-ms', float) or 1) / 1000
+
+    for i in range(n):
+        TABLE[f"rec{i:06d}"] = {'venue_name': f"Venue {i}", 'venue_address': f"{i} rue de Paris",
+                                'gps_coordinates': '', 'venue_url_scraped': 'x' * 2000}
+    server, airtable_io.AIRTABLE_API = start_stub()
+    print(f"Stub: {n} records, {LATENCY * 1000:.0f} ms per request, caller {work * 1000:.1f} ms per record\n")
+
+    fields = ['venue_name', 'venue_address', 'gps_coordinates']
+    print("Full-table scan (fields[] projected):")
+    old = timed('serial pages', work, fields=fields, prefetch=False)
+    new = timed('prefetched pages', work, fields=fields)
+    print(f"  speedup {old / new:.1f}x\n")
+
+    record_ids = sorted(TABLE)[::3]
+    print(f"{len(record_ids)} scattered record IDs (RECORD_ID() chunks of {airtable_io.RECORD_ID_CHUNK}):")
+    old = timed('serial chunks', work, fields=fields, record_ids=record_ids, prefetch=False)
+    new = timed(f"{airtable_io.READ_WORKERS} parallel chunks", work, fields=fields, record_ids=record_ids)
+    print(f"  speedup {old / new:.1f}x")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
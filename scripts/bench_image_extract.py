@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: profile-image extraction, whole-document regexes vs the
+streaming ImageTagFinder in batch_extract_image_urls.py.
+
+For each page, times:
+  - regex:     the previous extract_image_url — decode the whole body, then
+               up to three re.search passes with [^>]* patterns
+  - streaming: stream_image_url fed 64 KB chunks, stopping at the match
+and reports the characters consumed and the peak memory (tracemalloc) of
+each, plus whether both found the same URL.
+
+Pages: every *.html file under --pages (captured venue pages, e.g. saved
+with `curl -o`), or by default three generated WordPress-style pages: one
+with og:image at the end of a large <head>, one with only the banner
+image, and one with neither (the regexes' worst case).
+
+Usage:
+  python bench_image_extract.py [--pages <dir>] [--repeat N]
+"""
+
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("AIRTABLE_API_KEY", "")  # the script reads it at import; unused here
+from batch_extract_image_urls import stream_image_url  # noqa: E402
+
+CHUNK_CHARS = 64 * 1024
+
+OLD_OG_IMAGE_RE = re.compile(
+    r'<meta\s+(?:property=["\']og:image["\']\s+content=["\']([^"\']+)["\']'
+    r'|content=["\']([^"\']+)["\']\s+property=["\']og:image["\'])',
+    re.IGNORECASE,
+)
+OLD_BANNER_CLASS_FIRST_RE = re.compile(
+    r'<img\s[^>]*class=["\'][^"\']*feature_banner_img[^"\']*["\'][^>]*src=["\']([^"\']+)["\']',
+    re.IGNORECASE,
+)
+OLD_BANNER_SRC_FIRST_RE = re.compile(
+    r'<img\s[^>]*src=["\']([^"\']+)["\'][^>]*class=["\'][^"\']*feature_banner_img[^"\']*["\']',
+    re.IGNORECASE,
+)
+
+
+def regex_extract(chunks):
+    html = ''.join(chunks)
+    match = OLD_OG_IMAGE_RE.search(html)
+    if match and (match.group(1) or match.group(2)):
+        return (match.group(1) or match.group(2)).strip(), len(html)
+    for pattern in (OLD_BANNER_CLASS_FIRST_RE, OLD_BANNER_SRC_FIRST_RE):
+        match = pattern.search(html)
+        if match:
+            return match.group(1).strip(), len(html)
+    return None, len(html)
+
+
+def streaming_extract(chunks):
+    consumed = 0
+
+    def counted():
+        nonlocal consumed
+        for chunk in chunks:
+            consumed += len(chunk)
+            yield chunk
+
+    return stream_image_url(counted()), consumed
+
+
+def wordpress_page(og, banner):
+    head = ['<!DOCTYPE html><html lang="fr-FR"><head><meta charset="UTF-8">']
+    for i in range(150):
+        head.append(f'<link rel="stylesheet" id="style-{i}-css" href="https://example.com/wp-content/'
+                    f'plugins/p{i}/style.css?ver=6.4.{i}" type="text/css" media="all" />')
+    head.append('<style>' + ''.join(f'.c{i}{{margin:{i}px;padding:0 {i}px}}' for i in range(3000)) + '</style>')
+    head.append('<script type="application/ld+json">{"@graph":[' +
+                ','.join(f'{{"@id":"https://example.com/#n{i}","name":"node {i}"}}' for i in range(800)) + ']}</script>')
+    if og:
+        head.append('<meta property="og:image" content="https://example.com/wp-content/uploads/venue-hero.jpg" />')
+    head.append('</head>')
+    body = ['<body class="venue-template-default single single-venue">']
+    for i in range(1500):
+        body.append(f'<div class="card"><img loading="lazy" decoding="async" width="300" height="200" '
+                    f'data-src="https://example.com/wp-content/uploads/gallery-{i}.jpg" '
+                    f'src="data:image/svg+xml,%3Csvg%3E" alt="Gallery image {i} of the venue grounds"></div>')
+        if banner and i == 40:
+            body.append('<img width="1920" height="800" src="https://example.com/wp-content/uploads/banner.jpg" '
+                        'class="attachment-full size-full feature_banner_img" alt="" />')
+    body.append('</body></html>')
+    return ''.join(head + body)
+
+
+def load_pages(pages_dir):
+    if pages_dir:
+        pages = {}
+        for path in sorted(glob.glob(os.path.join(pages_dir, '**', '*.html'), recursive=True)):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages[os.path.relpath(path, pages_dir)] = f.read()
+        return pages
+    return {
+        'og:image in <head>': wordpress_page(og=True, banner=False),
+        'banner only': wordpress_page(og=False, banner=True),
+        'no image': wordpress_page(og=False, banner=False),
+    }
+
+
+def measure(fn, html, repeat):
+    chunks = [html[i:i + CHUNK_CHARS] for i in range(0, len(html), CHUNK_CHARS)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result, consumed = fn(iter(chunks))
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn(iter(chunks))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, consumed, elapsed, peak
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
+
+
+def main():
+    argv = sys.argv[1:]
+    pages_dir = pop_option(argv, '--pages', str)
+    repeat = pop_option(argv, '--repeat', int) or 20
+
+    pages = load_pages(pages_dir)
+    if not pages:
+        print(f"No *.html files under {pages_dir}")
+        sys.exit(1)
+
+    total = {'regex': 0.0, 'streaming': 0.0}
+    for name, html in pages.items():
+        print(f"{name} ({len(html):,} chars)")
+        results = {}
+        for label, fn in (('regex', regex_extract), ('streaming', streaming_extract)):
+            result, consumed, elapsed, peak = measure(fn, html, repeat)
+            results[label] = result
+            total[label] += elapsed
+            print(f"  {label:<10} {elapsed * 1000:8.2f} ms  read {consumed:>9,} chars  peak {peak / 1024:8.0f} KB")
+        same = 'same URL' if results['regex'] == results['streaming'] else 'DIFFERENT URL'
+        print(f"  -> {results['streaming']} ({same})\n")
+    print(f"Total per pass: regex {total['regex'] * 1000:.1f} ms, streaming {total['streaming'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of text extracted from Google Drive brochure files.
+
+Entries are keyed by what Drive says about the file's content, so an
+unchanged file is never downloaded or parsed twice, across runs and across
+venues:
+
+  md5:<md5Checksum>                  uploaded files (PDF, DOCX, ...): the same
+                                     bytes under any file ID share one entry
+  <file id>@<modifiedTime>:<format>  Google Docs/Sheets, which have no checksum;
+                                     an edit changes modifiedTime
+
+Ask Drive for `md5Checksum,modifiedTime` in `fields=` to get a key.
+
+Text is stored zlib-compressed in working/brochure_cache.sqlite3. When the
+compressed total passes MAX_CACHE_BYTES, the least recently used entries
+are evicted.
+
+Usage (scripts outside scripts/ put it on sys.path first):
+  from brochure_cache import cache_key, get_brochure_cache
+
+  cache = get_brochure_cache()
+  key = cache_key(meta)                       # None if Drive gave neither field
+  text = cache.get(key, max_chars)            # None on a miss
+  cache.put(key, text, max_chars)             # max_chars: the extraction budget, None if complete
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from http_client import log
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'working', 'brochure_cache.sqlite3')
+MAX_CACHE_BYTES = 256 * 1024 * 1024   # Compressed text kept before LRU eviction
+COMPRESS_LEVEL = 6
+WHOLE_TEXT = 2 ** 62                  # Stored budget of a text that wasn't cut short
+
+
+def cache_key(meta, export_format=None):
+    """Cache key for a Drive file's metadata (see module docstring), or
+    None if it has neither md5Checksum nor modifiedTime."""
+    if meta.get('md5Checksum'):
+        return f"md5:{meta['md5Checksum']}"
+    if meta.get('modifiedTime') and meta.get('id'):
+        return f"{meta['id']}@{meta['modifiedTime']}:{export_format or meta.get('mimeType', '')}"
+    return None
+
+
+class BrochureCache:
+    """SQLite cache of extracted text, compressed, evicted least recently
+    used first once it holds more than max_bytes."""
+
+    def __init__(self, path=None, max_bytes=MAX_CACHE_BYTES):
+        self.path = path or CACHE_PATH
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.hits = 0
+        self.misses = 0
+        with self.lock:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS brochures (key TEXT PRIMARY KEY, text BLOB NOT NULL, '
+                            'size INTEGER NOT NULL, max_chars INTEGER NOT NULL, used_at REAL NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS brochures_used_at ON brochures (used_at)')
+
+    def get(self, key, max_chars=None):
+        """The cached text for `key`, or None if there is none extracted with
+        a budget of at least max_chars (None: the whole text). '' means
+        nothing readable."""
+        if key is None:
+            return None
+        with self.lock:
+            row = self.db.execute('SELECT text, max_chars FROM brochures WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] < (max_chars or WHOLE_TEXT):
+                self.misses += 1
+                return None
+            self.db.execute('UPDATE brochures SET used_at = ? WHERE key = ?', (time.time(), key))
+            self.hits += 1
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key, text, max_chars=None):
+        """Store the text extracted for `key` with a budget of max_chars
+        (None: the whole text); None is stored as '' (nothing readable)."""
+        if key is None:
+            return
+        blob = zlib.compress((text or '').encode('utf-8'), COMPRESS_LEVEL)
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO brochures VALUES (?, ?, ?, ?, ?)',
+                            (key, blob, len(blob), max_chars or WHOLE_TEXT, time.time()))
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the total fits max_bytes."""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM brochures').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        dropped = 0
+        for key, size in self.db.execute('SELECT key, size FROM brochures ORDER BY used_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute('DELETE FROM brochures WHERE key = ?', (key,))
+            total -= size
+            dropped += 1
+        log(f"  Brochure cache: evicted {dropped} least recently used entr{'y' if dropped == 1 else 'ies'}")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_brochure_cache():
+    """The process-wide BrochureCache, or None if it can't be opened."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            try:
+                _CACHE = BrochureCache()
+            except sqlite3.Error as e:
+                log(f"  Brochure cache unavailable ({e})")
+                _CACHE = False
+        return _CACHE or None
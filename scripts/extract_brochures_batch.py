@@ -1,6 +1,15 @@
 """
 Batch extract brochure text from Google Drive docs and write to Airtable.
 Uses Google Drive API to export docs as plain text, then updates Airtable.
+
+Venues are handled VENUE_WORKERS at a time. Each venue's candidate name
+queries go to Drive at once and the best-ranked match wins; every query
+waits on a shared limiter so the batch stays within the Drive quota.
+With --folder, the brochure folder is listed once and names are matched
+locally instead.
+
+Usage:
+  python extract_brochures_batch.py <venues.json> [--folder <folder_id>] [--workers N]
 """
 import json
 import os
@@ -9,10 +18,24 @@ import re
 import time
 import sys
 import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from brochure_cache import cache_key, get_brochure_cache
+from http_client import TokenBucket
 
 # Configuration
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
+VENUE_WORKERS = 4              # Venues searched and exported at once
+QUERY_WORKERS = 16             # Drive search queries in flight across all venues
+DRIVE_QUERIES_PER_MINUTE = 600
+DRIVE_LIMITER = TokenBucket(DRIVE_QUERIES_PER_MINUTE, burst=10)
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+DOC_MIME_TYPE = "application/vnd.google-apps.document"
+SHORT_NAME_PREFIXES = ["Chateau ", "Château ", "Domaine ", "Hotel ", "Hôtel ", "Bastide ", "Manoir ", "Abbaye ",
+                       "Maison ", "Le ", "La ", "Les "]
 
 
 def requests_get_with_retry(url, **kwargs):
@@ -88,66 +111,133 @@ def fix_mojibake(s):
         return s
 
 
-def search_google_drive(venue_name, access_token):
-    """Search Google Drive for a Google Doc matching the venue name."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-
+def search_candidates(venue_name):
+    """The Drive name queries to try for a venue, best first, as
+    (operator, name, page size, pick): pick(files) returns the matching file
+    among the query's results, or None."""
     # Try to fix mojibake in venue name
     clean_name = fix_mojibake(venue_name)
+    name_lower = clean_name.lower().strip()
+
+    def pick_first(files):
+        return files[0] if files else None
+
+    def pick_close(files):
+        # Find best match
+        for f in files:
+            fname = f["name"].lower().strip()
+            if fname == name_lower or name_lower in fname or fname in name_lower:
+                return f
+        # If no close match, check if any doc name is similar
+        for f in files:
+            fname = strip_accents(f["name"].lower().strip())
+            sname = strip_accents(name_lower)
+            if fname == sname or sname in fname or fname in sname:
+                return f
+        return None
+
+    def pick_containing(short):
+        return lambda files: next((f for f in files if short.lower() in f["name"].lower()), None)
 
     # Strategy 1: exact name match
-    for search_name in [clean_name, venue_name, strip_accents(clean_name)]:
-        escaped = search_name.replace("'", "\\'")
-        query = f"name = '{escaped}' and mimeType = 'application/vnd.google-apps.document' and trashed = false"
-        params = {"q": query, "fields": "files(id,name)", "pageSize": 5}
-        resp = requests_get_with_retry("https://www.googleapis.com/drive/v3/files", headers=headers, params=params)
-        if resp.status_code == 200:
-            files = resp.json().get("files", [])
-            if files:
-                return files[0]["id"], files[0]["name"]
+    candidates = [("=", search_name, 5, pick_first)
+                  for search_name in [clean_name, venue_name, strip_accents(clean_name)]]
 
     # Strategy 2: name contains (try key words from venue name)
-    for search_name in [clean_name, strip_accents(clean_name)]:
-        escaped = search_name.replace("'", "\\'")
-        query = f"name contains '{escaped}' and mimeType = 'application/vnd.google-apps.document' and trashed = false"
-        params = {"q": query, "fields": "files(id,name)", "pageSize": 10}
-        resp = requests_get_with_retry("https://www.googleapis.com/drive/v3/files", headers=headers, params=params)
-        if resp.status_code == 200:
-            files = resp.json().get("files", [])
-            # Find best match
-            name_lower = clean_name.lower().strip()
-            for f in files:
-                fname = f["name"].lower().strip()
-                if fname == name_lower or name_lower in fname or fname in name_lower:
-                    return f["id"], f["name"]
-            # If no close match, check if any doc name is similar
-            for f in files:
-                fname = strip_accents(f["name"].lower().strip())
-                sname = strip_accents(name_lower)
-                if fname == sname or sname in fname or fname in sname:
-                    return f["id"], f["name"]
+    candidates += [("contains", search_name, 10, pick_close)
+                   for search_name in [clean_name, strip_accents(clean_name)]]
 
     # Strategy 3: try shorter name (remove common prefixes)
-    short_names = []
-    for prefix in ["Chateau ", "Château ", "Domaine ", "Hotel ", "Hôtel ", "Bastide ", "Manoir ", "Abbaye ", "Maison ", "Le ", "La ", "Les "]:
+    for prefix in SHORT_NAME_PREFIXES:
         if clean_name.lower().startswith(prefix.lower()):
             remainder = clean_name[len(prefix):]
             if len(remainder) > 3:
-                short_names.append(remainder)
+                candidates.append(("contains", remainder, 10, pick_containing(remainder)))
+
+    # The same query twice can't find anything new
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        if candidate[:2] not in seen:
+            seen.add(candidate[:2])
+            unique.append(candidate)
+    return unique
+
+
+def drive_name_query(operator, search_name, page_size, access_token):
+    """One Drive files.list query for Google Docs by name, paced by
+    DRIVE_LIMITER. Returns the files found (none on an HTTP error)."""
+    DRIVE_LIMITER.acquire()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    escaped = search_name.replace("'", "\\'")
+    query = f"name {operator} '{escaped}' and mimeType = '{DOC_MIME_TYPE}' and trashed = false"
+    params = {"q": query, "fields": "files(id,name,modifiedTime)", "pageSize": page_size}
+    resp = requests_get_with_retry(DRIVE_FILES_URL, headers=headers, params=params)
+    if resp.status_code == 200:
+        return resp.json().get("files", [])
+    return []
+
+
+def search_google_drive(venue_name, access_token, pool=None):
+    """Search Google Drive for a Google Doc matching the venue name. Returns
+    its {id, name, modifiedTime}, or None.
+
+    With a thread pool, all candidate queries are sent at once; the best
+    ranked one with a match wins (as if they'd been tried in order) and
+    queries not yet started are cancelled."""
+    candidates = search_candidates(venue_name)
+    if pool is None:
+        for operator, search_name, page_size, pick in candidates:
+            match = pick(drive_name_query(operator, search_name, page_size, access_token))
+            if match:
+                return match
+        return None
 
-    for short in short_names:
-        escaped = short.replace("'", "\\'")
-        query = f"name contains '{escaped}' and mimeType = 'application/vnd.google-apps.document' and trashed = false"
-        params = {"q": query, "fields": "files(id,name)", "pageSize": 10}
-        resp = requests_get_with_retry("https://www.googleapis.com/drive/v3/files", headers=headers, params=params)
-        if resp.status_code == 200:
-            files = resp.json().get("files", [])
-            for f in files:
-                fname = f["name"].lower()
-                if short.lower() in fname:
-                    return f["id"], f["name"]
+    futures = [pool.submit(drive_name_query, operator, search_name, page_size, access_token)
+               for operator, search_name, page_size, _ in candidates]
+    try:
+        for (_, _, _, pick), future in zip(candidates, futures):
+            match = pick(future.result())
+            if match:
+                return match
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
 
-    return None, None
+
+def list_folder_docs(folder_id, access_token):
+    """Every Google Doc in a Drive folder, following nextPageToken."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {"q": f"'{folder_id}' in parents and mimeType = '{DOC_MIME_TYPE}' and trashed = false",
+              "fields": "nextPageToken,files(id,name,modifiedTime)", "pageSize": 1000}
+    docs = []
+    while True:
+        DRIVE_LIMITER.acquire()
+        resp = requests_get_with_retry(DRIVE_FILES_URL, headers=headers, params=params)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Folder listing failed: HTTP {resp.status_code} {resp.text[:200]}")
+        page = resp.json()
+        docs.extend(page.get("files", []))
+        if not page.get("nextPageToken"):
+            return docs
+        params["pageToken"] = page["nextPageToken"]
+
+
+def search_folder_docs(venue_name, docs):
+    """search_google_drive against an already listed folder, with no Drive
+    calls: '=' compares names case-insensitively, 'contains' is a substring
+    test."""
+    for operator, search_name, _, pick in search_candidates(venue_name):
+        wanted = search_name.lower()
+        if operator == "=":
+            files = [d for d in docs if d["name"].lower() == wanted]
+        else:
+            files = [d for d in docs if wanted in d["name"].lower()]
+        match = pick(files)
+        if match:
+            return match
+    return None
 
 
 def export_doc_as_text(doc_id, access_token):
@@ -161,6 +251,19 @@ def export_doc_as_text(doc_id, access_token):
     return None
 
 
+def export_doc_cached(doc, access_token):
+    """export_doc_as_text, served from the brochure cache (shared with
+    extract_brochure.py) while the doc's modifiedTime is unchanged."""
+    cache = get_brochure_cache()
+    key = cache_key(doc, 'text/plain')
+    text = cache.get(key) if cache else None
+    if text is None:
+        text = export_doc_as_text(doc["id"], access_token)
+        if cache and text is not None:
+            cache.put(key, text)
+    return text
+
+
 def clean_content(text):
     """Clean the exported text content."""
     if not text:
@@ -205,81 +308,114 @@ def update_airtable(records):
     return resp.status_code == 200, resp.status_code, resp.text[:300] if resp.text else ""
 
 
+def extract_venue(venue, find_doc, token):
+    """Find and export one venue's brochure doc, with the access token
+    current when it starts (`token["access"]`, refreshed by main). Returns
+    (Airtable update, result row, progress line)."""
+    record_id = venue["id"]
+    venue_name = venue["name"]
+    access_token = token["access"]
+    try:
+        # Search for Google Doc
+        doc = find_doc(venue_name, access_token)
+
+        if not doc:
+            return ({"id": record_id, "content": "[ERROR]: Link unreachable."},
+                    {"venue": venue_name, "status": "ERROR", "chars": 0, "reason": "No Google Doc found"},
+                    "NO DOC FOUND")
+
+        doc_name = doc["name"]
+        # Export as plain text (unless unchanged since a previous run)
+        text = export_doc_cached(doc, access_token)
+
+        if not text or len(text.strip()) < 50:
+            return ({"id": record_id, "content": "[ERROR]: Files are images without readable text."},
+                    {"venue": venue_name, "status": "ERROR", "chars": 0, "reason": "Empty doc"},
+                    f"found: '{doc_name}' -> EMPTY/UNREADABLE")
+
+        # Clean and store
+        cleaned = clean_content(text)
+        char_count = len(cleaned)
+        return ({"id": record_id, "content": cleaned},
+                {"venue": venue_name, "status": "OK", "chars": char_count, "doc_name": doc_name},
+                f"found: '{doc_name}' -> OK ({char_count:,} chars)")
+    except Exception as e:
+        return ({"id": record_id, "content": "[ERROR]: Link unreachable."},
+                {"venue": venue_name, "status": "ERROR", "chars": 0, "reason": str(e)[:100]},
+                f"EXCEPTION: {e}")
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
+
+
 def main():
-    venues_file = sys.argv[1]
+    argv = sys.argv[1:]
+    folder_id = pop_option(argv, "--folder", str)
+    workers = pop_option(argv, "--workers", int) or VENUE_WORKERS
+    venues_file = argv[0]
     with open(venues_file) as f:
         venues = json.load(f)
 
     print(f"Processing {len(venues)} venues...")
-    access_token = get_access_token()
+    token = {"access": get_access_token()}   # Refreshed mid-run; venues not yet started pick it up
+
+    query_pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS)
+    if folder_id:
+        docs = list_folder_docs(folder_id, token["access"])
+        print(f"Listed {len(docs)} Google Docs in folder {folder_id}; matching names locally")
+
+        def find_doc(venue_name, access_token):
+            return search_folder_docs(venue_name, docs)
+    else:
+        def find_doc(venue_name, access_token):
+            return search_google_drive(venue_name, access_token, query_pool)
 
     results = []
     batch_for_airtable = []
     consecutive_failures = 0
 
-    for i, venue in enumerate(venues):
-        record_id = venue["id"]
-        venue_name = venue["name"]
-
-        print(f"\n[{i+1}/{len(venues)}] {venue_name}...", end=" ", flush=True)
-
-        try:
-            # Search for Google Doc
-            doc_id, doc_name = search_google_drive(venue_name, access_token)
-
-            if not doc_id:
-                print("NO DOC FOUND")
-                batch_for_airtable.append({
-                    "id": record_id,
-                    "content": "[ERROR]: Link unreachable."
-                })
-                results.append({"venue": venue_name, "status": "ERROR", "chars": 0, "reason": "No Google Doc found"})
+    with ThreadPoolExecutor(max_workers=workers) as venue_pool:
+        # Venues are submitted at most 2 x workers ahead of the one being
+        # reported, in order, so output and Airtable writes keep venue order
+        # and a token refresh below reaches every venue not started yet
+        ahead = deque()
+        upcoming = iter(venues)
+        for i, venue in enumerate(venues):
+            while len(ahead) < 2 * workers:
+                next_venue = next(upcoming, None)
+                if next_venue is None:
+                    break
+                ahead.append(venue_pool.submit(extract_venue, next_venue, find_doc, token))
+            update, result, line = ahead.popleft().result()
+            print(f"\n[{i+1}/{len(venues)}] {venue['name']}... {line}", flush=True)
+            batch_for_airtable.append(update)
+            results.append(result)
+
+            if result["status"] == "OK":
+                consecutive_failures = 0
+            else:
                 consecutive_failures += 1
-                if consecutive_failures >= 3:
+                if result.get("reason") == "No Google Doc found" and consecutive_failures >= 3:
                     print("\n! 3+ consecutive failures. Refreshing token...")
-                    access_token = refresh_access_token() or access_token
+                    token["access"] = refresh_access_token() or token["access"]
                     consecutive_failures = 0
-            else:
-                print(f"found: '{doc_name}' -> ", end="", flush=True)
-
-                # Export as plain text
-                text = export_doc_as_text(doc_id, access_token)
-
-                if not text or len(text.strip()) < 50:
-                    print("EMPTY/UNREADABLE")
-                    batch_for_airtable.append({
-                        "id": record_id,
-                        "content": "[ERROR]: Files are images without readable text."
-                    })
-                    results.append({"venue": venue_name, "status": "ERROR", "chars": 0, "reason": "Empty doc"})
-                    consecutive_failures += 1
-                else:
-                    # Clean and store
-                    cleaned = clean_content(text)
-                    char_count = len(cleaned)
-                    print(f"OK ({char_count:,} chars)")
 
-                    batch_for_airtable.append({"id": record_id, "content": cleaned})
-                    results.append({"venue": venue_name, "status": "OK", "chars": char_count, "doc_name": doc_name})
-                    consecutive_failures = 0
-        except Exception as e:
-            print(f"EXCEPTION: {e}")
-            batch_for_airtable.append({
-                "id": record_id,
-                "content": "[ERROR]: Link unreachable."
-            })
-            results.append({"venue": venue_name, "status": "ERROR", "chars": 0, "reason": str(e)[:100]})
-            consecutive_failures += 1
-
-        # Write to Airtable in batches of 10
-        if len(batch_for_airtable) >= 10:
-            success, status, resp_text = update_airtable(batch_for_airtable)
-            if success:
-                print(f"  → Airtable batch write: OK ({len(batch_for_airtable)} records)")
-            else:
-                print(f"  → Airtable batch write: FAILED ({status}) - {resp_text}")
-            batch_for_airtable = []
-            time.sleep(0.3)
+            # Write to Airtable in batches of 10
+            if len(batch_for_airtable) >= 10:
+                success, status, resp_text = update_airtable(batch_for_airtable)
+                if success:
+                    print(f"  → Airtable batch write: OK ({len(batch_for_airtable)} records)")
+                else:
+                    print(f"  → Airtable batch write: FAILED ({status}) - {resp_text}")
+                batch_for_airtable = []
+                time.sleep(0.3)
+    query_pool.shutdown()
 
     # Write remaining records
     if batch_for_airtable:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Nominatim /search endpoint, for testing geocoding
+offline.
+
+Answers GET /search?q=...&format=json like Nominatim: a one-element list
+for a known place, [] otherwise. Places come from a JSON file of
+{"query": [lat, lon]} (queries are matched after the same normalization as
+the geocode cache, so case, accents and a trailing "France" don't matter),
+or a few built-in communes. Every request is logged to stderr.
+
+Usage:
+  python scripts/fake_nominatim.py [--port 8088] [--data places.json] [--fail-every N]
+  NOMINATIM_URL=http://127.0.0.1:8088/search python scripts/batch_geocode.py
+
+--fail-every N answers every Nth request with a 503, to exercise retries.
+"""
+
+import json
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from geocoding import normalize_address
+from http_client import log
+
+SAMPLE_PLACES = {
+    '24200 Sarlat-la-Canéda': [44.8897, 1.2166],
+    'Sarlat-la-Canéda': [44.8897, 1.2166],
+    '33000 Bordeaux': [44.8378, -0.5792],
+    'Bordeaux': [44.8378, -0.5792],
+    '84000 Avignon': [43.9493, 4.8055],
+    'Avignon': [43.9493, 4.8055],
+    '75001 Paris': [48.8603, 2.3477],
+    'Paris': [48.8566, 2.3522],
+}
+
+
+class FakeNominatim(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    places = {}
+    fail_every = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query).get('q', [''])[0]
+        with self.lock:
+            type(self).requests += 1
+            count = self.requests
+
+        if parts.path.rstrip('/') != '/search':
+            self._send(404, {'error': 'not found'})
+            outcome = '404'
+        elif self.fail_every and count % self.fail_every == 0:
+            self._send(503, {'error': 'simulated outage'})
+            outcome = '503'
+        else:
+            coords = self.places.get(normalize_address(query))
+            results = []
+            if coords:
+                results.append({'lat': str(coords[0]), 'lon': str(coords[1]), 'display_name': query})
+            self._send(200, results)
+            outcome = 'hit' if coords else 'miss'
+        log(f"  [{count}] q={query!r} -> {outcome}")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(places=None, port=0, fail_every=0):
+    """Start the stand-in in a background thread. Returns (server, search_url)."""
+    FakeNominatim.places = {normalize_address(q): c for q, c in (places or SAMPLE_PLACES).items()}
+    FakeNominatim.fail_every = fail_every
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeNominatim)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search"
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
+
+
+def main():
+    argv = sys.argv[1:]
+    port = pop_option(argv, '--port', int) or 8088
+    data = pop_option(argv, '--data', str)
+    fail_every = pop_option(argv, '--fail-every', int) or 0
+
+    places = None
+    if data:
+        with open(data, encoding='utf-8') as f:
+            places = json.load(f)
+    server, url = serve(places, port, fail_every)
+    print(f"Fake Nominatim at {url} ({len(FakeNominatim.places)} places)")
+    print(f"  export NOMINATIM_URL={url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Shared venue geocoding (OpenStreetMap Nominatim) with a persistent cache.
+
+Every Nominatim answer is cached in working/geocode_cache.sqlite3, keyed by
+the normalized query (case, accents, punctuation and a trailing "France"
+ignored), so re-runs and venues sharing an address cost nothing. Misses
+are cached too, for a shorter time; network errors are not cached.
+
+An address that Nominatim can't place is retried down a fallback ladder:
+the full address, then "<postcode> <commune>", then the commune alone. The
+result says which level matched.
+
+Nominatim allows 1 request/second. Calls are paced through the cache
+database, so separate processes (e.g. one `process_venue.py --geocode` per
+record) share the limit; cache hits never wait.
+
+Usage (scripts outside scripts/ put it on sys.path first):
+  from geocoding import Geocoder, geocode_address
+
+  lat, lon = geocode_address('Château de X, 24200 Sarlat-la-Canéda')
+
+  geocoder = Geocoder()
+  results = geocoder.geocode_many(addresses)   # {address: (lat, lon, level)}
+
+Set NOMINATIM_URL to point at a stand-in server (fake_nominatim.py) to run
+offline.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.parse
+
+from http_client import RetryPolicy, api_request, log
+
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+NOMINATIM_HEADERS = {'User-Agent': 'FWSVenueGeocoder/1.0'}
+RATE_LIMIT_DELAY = 1.1       # Seconds between Nominatim calls (max 1 req/sec)
+
+NOMINATIM_RETRY = RetryPolicy(attempts=3, backoff=2, max_backoff=30)
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'working', 'geocode_cache.sqlite3')
+HIT_TTL = 180 * 24 * 3600    # Found coordinates are reused for 6 months
+MISS_TTL = 7 * 24 * 3600     # "No result" is remembered for a week
+
+LEVEL_ADDRESS = 'address'
+LEVEL_POSTCODE = 'postcode'
+LEVEL_COMMUNE = 'commune'
+
+POSTCODE_COMMUNE_RE = re.compile(r'\b(\d{5})\s+([^,\d][^,]*)')
+CEDEX_RE = re.compile(r'\s+cedex\b.*$', re.IGNORECASE)
+
+
+class GeocodeError(Exception):
+    """Nominatim could not be reached or refused the request."""
+
+
+# ─── Address Handling ───────────────────────────────────────────
+
+def normalize_address(address):
+    """Cache key for an address or query: lowercase ASCII words, with a
+    trailing "France" dropped."""
+    text = unicodedata.normalize('NFKD', address)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r'[^a-z0-9]+', ' ', text).strip()
+    return re.sub(r'(?:^| )france$', '', text).strip()
+
+
+def fallback_queries(address):
+    """The ladder of (level, query) to try for an address, most precise
+    first, without repeats."""
+    parts = [p.strip() for p in address.split(',')]
+    parts = [p for p in parts if p and p.lower() != 'france']
+    ladder = [(LEVEL_ADDRESS, ', '.join(parts))]
+
+    match = POSTCODE_COMMUNE_RE.search(address)
+    if match:
+        commune = CEDEX_RE.sub('', match.group(2)).strip()
+        ladder.append((LEVEL_POSTCODE, f"{match.group(1)} {commune}"))
+        ladder.append((LEVEL_COMMUNE, commune))
+    elif len(parts) > 1:
+        ladder.append((LEVEL_COMMUNE, parts[-1]))
+
+    seen = set()
+    queries = []
+    for level, query in ladder:
+        key = normalize_address(query)
+        if key and key not in seen:
+            seen.add(key)
+            queries.append((level, query))
+    return queries
+
+
+# ─── Cache ──────────────────────────────────────────────────────
+
+class GeocodeCache:
+    """SQLite cache of Nominatim answers keyed by normalized query. A row
+    with NULL coordinates is a cached miss."""
+
+    def __init__(self, path=None):
+        self.path = path or CACHE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self.lock:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS geocodes '
+                            '(query TEXT PRIMARY KEY, lat REAL, lon REAL, cached_at REAL NOT NULL)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS pacing (name TEXT PRIMARY KEY, next_at REAL NOT NULL)')
+
+    def get(self, query):
+        """Returns (found, coords): found is False if nothing fresh is
+        cached; coords is (lat, lon), or None for a cached miss."""
+        with self.lock:
+            row = self.db.execute('SELECT lat, lon, cached_at FROM geocodes WHERE query = ?',
+                                  (normalize_address(query),)).fetchone()
+        if row is None:
+            return False, None
+        lat, lon, cached_at = row
+        ttl = MISS_TTL if lat is None else HIT_TTL
+        if time.time() - cached_at > ttl:
+            return False, None
+        return True, None if lat is None else (lat, lon)
+
+    def put(self, query, coords):
+        lat, lon = coords if coords else (None, None)
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?)',
+                            (normalize_address(query), lat, lon, time.time()))
+
+    def reserve_call(self, delay):
+        """Claim the next Nominatim slot, shared by every process using this
+        cache. Returns the seconds to sleep before calling."""
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.db.execute("SELECT next_at FROM pacing WHERE name = 'nominatim'").fetchone()
+                now = time.time()
+                start = max(now, row[0] if row else 0)
+                self.db.execute("INSERT OR REPLACE INTO pacing VALUES ('nominatim', ?)", (start + delay,))
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+        return start - now
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# ─── Geocoder ───────────────────────────────────────────────────
+
+class Geocoder:
+    """Cached, rate-limited Nominatim client with the fallback ladder."""
+
+    def __init__(self, cache=None, url=None, delay=RATE_LIMIT_DELAY):
+        self.cache = cache or GeocodeCache()
+        self.url = url or NOMINATIM_URL
+        self.delay = delay
+        self.calls = 0
+        self.cache_hits = 0
+
+    def search(self, query):
+        """One Nominatim query (cached). Returns (lat, lon) or None if there
+        is no match. Raises GeocodeError if Nominatim can't be asked."""
+        found, coords = self.cache.get(query)
+        if found:
+            self.cache_hits += 1
+            return coords
+
+        wait = self.cache.reserve_call(self.delay)
+        if wait > 0:
+            time.sleep(wait)
+        self.calls += 1
+        q = query if 'france' in query.lower() else f"{query}, France"
+        params = urllib.parse.urlencode({'q': q, 'format': 'json', 'limit': '1'})
+        status, resp = api_request(f"{self.url}?{params}", headers=NOMINATIM_HEADERS, method='GET',
+                                   timeout=30, retry=NOMINATIM_RETRY)
+        if status != 200 or not isinstance(resp, list):
+            raise GeocodeError(f"Nominatim query failed ({status}): {str(resp)[:200]}")
+
+        coords = None
+        if resp and resp[0].get('lat') and resp[0].get('lon'):
+            coords = (float(resp[0]['lat']), float(resp[0]['lon']))
+        self.cache.put(query, coords)
+        return coords
+
+    def geocode(self, address):
+        """Geocode an address, falling back to postcode + commune and then the
+        commune. Returns (lat, lon, level), or (None, None, None) if nothing
+        matched or Nominatim failed (failures are logged, not cached)."""
+        for level, query in fallback_queries(address):
+            try:
+                coords = self.search(query)
+            except GeocodeError as e:
+                log(f"  Geocode error for {query!r}: {e}")
+                return None, None, None
+            if coords:
+                if level != LEVEL_ADDRESS:
+                    log(f"  Geocoded {address!r} at {level} level ({query!r})")
+                return coords[0], coords[1], level
+        return None, None, None
+
+    def geocode_many(self, addresses):
+        """Geocode a whole job: each distinct (normalized) address is looked
+        up once. Returns {address: (lat, lon, level)} for every input."""
+        addresses = list(addresses)
+        unique = {}
+        for address in addresses:
+            unique.setdefault(normalize_address(address), address)
+        log(f"Geocoding {len(addresses)} address(es), {len(unique)} distinct")
+
+        by_key = {}
+        for i, (key, address) in enumerate(unique.items(), 1):
+            by_key[key] = self.geocode(address)
+            if i % 25 == 0:
+                log(f"  {i}/{len(unique)} geocoded ({self.calls} Nominatim calls, {self.cache_hits} cached)")
+        log(f"  Done: {self.calls} Nominatim calls, {self.cache_hits} answered from cache")
+        return {address: by_key[normalize_address(address)] for address in addresses}
+
+
+_GEOCODER = None
+_GEOCODER_LOCK = threading.Lock()
+
+
+def get_geocoder():
+    """The process-wide Geocoder (shared cache and pacing)."""
+    global _GEOCODER
+    with _GEOCODER_LOCK:
+        if _GEOCODER is None:
+            _GEOCODER = Geocoder()
+        return _GEOCODER
+
+
+def geocode_address(address):
+    """Geocode an address using OpenStreetMap Nominatim (cached, with the
+    fallback ladder). Returns (lat, lon) or (None, None)."""
+    lat, lon, _ = get_geocoder().geocode(address)
+    return lat, lon
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client — pooled keep-alive connections for the venue scripts.
+
+Replaces the per-script urllib `api_request` copies, which opened a fresh
+TCP+TLS connection for every call to Firecrawl, Airtable, Nominatim and
+Google Drive. One HttpClient keeps idle connections per host and reuses them,
+every request goes through one RetryPolicy (jittered exponential backoff
+that honours Retry-After / rate-limit reset headers) and a per-host
+CircuitBreaker, and response bodies can be streamed (and gunzipped) chunk by
+chunk instead of read whole. Pass a RetryStats to count the retries made on
+behalf of one job (e.g. one venue).
+
+Usage (scripts outside scripts/ put it on sys.path first):
+  from http_client import api_request, get_client
+
+  status, data = api_request(url, data=payload, headers=h, method='POST')
+
+  resp = get_client().request('GET', url, headers=h)          # body read
+  print(resp.status, resp.json())
+
+  with get_client().stream('GET', url, headers=h) as resp:    # body streamed
+      for chunk in resp.iter_bytes():
+          ...
+
+HTTP/2: set HTTP_CLIENT_HTTP2=1 (or pass HttpClient(http2=True)) to send
+requests through httpx with h2 when it is installed
+(python -m pip install "httpx[http2]"); otherwise the built-in HTTP/1.1
+pools are used. Stdlib only otherwise.
+"""
+
+import codecs
+import contextlib
+import email.utils
+import http.client
+import json
+import os
+import random
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+
+DEFAULT_TIMEOUT = 120
+MAX_IDLE_PER_HOST = 8       # Idle keep-alive connections kept per host
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = f"Python-http_client/{sys.version_info[0]}.{sys.version_info[1]}"
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+# Errors that mean a reused keep-alive connection had already been closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                           BrokenPipeError, ConnectionAbortedError)
+
+
+def log(msg):
+    """Print to stderr for progress messages."""
+    print(msg, file=sys.stderr)
+
+
+# ─── Retry Policy ───────────────────────────────────────────────
+
+def retry_after_seconds(headers, now=None):
+    """Seconds the server asked us to wait, or None.
+
+    Reads Retry-After (delta seconds or HTTP date), then the RateLimit-Reset /
+    X-RateLimit-Reset family (delta seconds, or an epoch timestamp).
+    """
+    if headers is None:
+        return None
+    now = time.time() if now is None else now
+    value = headers.get('Retry-After')
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            pass
+    for name in ('RateLimit-Reset', 'X-RateLimit-Reset', 'X-Ratelimit-Reset'):
+        value = headers.get(name)
+        if not value:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        if seconds > 1e9:          # epoch timestamp, not a delta
+            seconds -= now
+        return max(0.0, seconds)
+    return None
+
+
+class RetryPolicy:
+    """When to retry a request and how long to wait first.
+
+    Failures to connect are retried for every method (the request never
+    reached the server). Failures after the request was sent, and responses
+    with a status in `retry_statuses`, are only retried for `retry_methods`
+    (idempotent ones by default), so a POST is never sent twice unless the
+    caller knows a rejected call is safe to repeat. A reused connection found
+    closed by the server is retried at once and does not count as an attempt
+    when the request hadn't gone out yet, or its method is idempotent;
+    otherwise the failure goes through the rules above.
+
+    Waits grow exponentially from `backoff` seconds up to `max_backoff`, with
+    jitter (a random 50–100% of that) so parallel workers don't retry in
+    lockstep. When the response carries Retry-After or a rate-limit reset
+    header, that wait is used instead; one longer than `max_retry_after`
+    means giving up.
+    """
+
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=8, retry_statuses=(429, 502, 503, 504),
+                 retry_methods=IDEMPOTENT_METHODS, jitter=True, max_retry_after=120):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+        self.retry_methods = set(retry_methods)
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+
+    def retry_error(self, method, attempt, sent):
+        if attempt + 1 >= self.attempts:
+            return False
+        return not sent or method in self.retry_methods
+
+    def retry_status(self, method, status, attempt):
+        return (attempt + 1 < self.attempts and status in self.retry_statuses
+                and method in self.retry_methods)
+
+    def delay(self, attempt, headers=None):
+        """Seconds to wait before retry number `attempt + 1`, or None to give up."""
+        asked = retry_after_seconds(headers)
+        if asked is not None:
+            return asked if asked <= self.max_retry_after else None
+        wait = min(self.max_backoff, self.backoff * 2 ** attempt)
+        if self.jitter:
+            wait *= random.uniform(0.5, 1.0)
+        return wait
+
+
+class RetryStats:
+    """Thread-safe tally of the retries made for one job, by reason."""
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def record(self, reason):
+        with self.lock:
+            self.counts[reason] = self.counts.get(reason, 0) + 1
+
+    @property
+    def total(self):
+        with self.lock:
+            return sum(self.counts.values())
+
+    def summary(self):
+        """e.g. '3 (HTTP 429 x2, ConnectionResetError x1)', or '0'."""
+        with self.lock:
+            items = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        if not items:
+            return '0'
+        detail = ', '.join(f"{reason} x{count}" for reason, count in items)
+        return f"{sum(count for _, count in items)} ({detail})"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when a host's circuit is open and the retry budget is spent."""
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After `threshold` consecutive failures (connection errors or 5xx) a host's
+    circuit opens: requests wait out `cooldown` seconds instead of hammering
+    a host that is down. Then a single trial request is let through; success
+    closes the circuit, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.hosts = {}  # host -> [consecutive failures, opened_at or None, trial in flight]
+
+    def wait_time(self, host):
+        """0 if a request to host may go now (claiming the trial slot if
+        half-open), else seconds to wait before asking again."""
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None or state[1] is None:
+                return 0
+            remaining = state[1] + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if state[2]:
+                return 1.0  # another request is the trial; check back shortly
+            state[2] = True
+            return 0
+
+    def success(self, host):
+        with self.lock:
+            self.hosts.pop(host, None)
+
+    def failure(self, host):
+        with self.lock:
+            state = self.hosts.setdefault(host, [0, None, False])
+            state[0] += 1
+            if state[2] or (state[1] is None and state[0] >= self.threshold):
+                if state[1] is None:
+                    log(f"  Circuit open for {host} after {state[0]} failures, pausing {self.cooldown}s")
+                state[1] = time.monotonic()
+                state[2] = False
+
+
+# ─── Rate Limiting ──────────────────────────────────────────────
+
+class TokenBucket:
+    """Thread-safe token bucket limiter.
+
+    Refills at `rate_per_minute` tokens per minute and holds at most `burst`
+    tokens, so short bursts are allowed but the per-minute quota is honoured.
+    """
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """Per-host politeness for crawling: at most `connections` requests in
+    flight to any one host, started at most `rate_per_second` per host.
+
+        with limiter.slot(url):
+            resp = client.request('GET', url)
+    """
+
+    def __init__(self, connections=4, rate_per_second=5):
+        self.connections = connections
+        self.rate_per_second = rate_per_second
+        self.lock = threading.Lock()
+        self.hosts = {}  # host -> (semaphore, TokenBucket)
+
+    def _host(self, url):
+        host = (urllib.parse.urlsplit(url).hostname or '').lower()
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = (threading.BoundedSemaphore(self.connections),
+                                    TokenBucket(self.rate_per_second * 60, burst=1))
+            return self.hosts[host]
+
+    @contextlib.contextmanager
+    def slot(self, url):
+        semaphore, bucket = self._host(url)
+        with semaphore:
+            bucket.acquire()
+            yield
+
+
+# ─── Responses ──────────────────────────────────────────────────
+
+def _charset(headers, default='utf-8'):
+    content_type = headers.get('Content-Type') or ''
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset' and value:
+            return value.strip('"\'')
+    return default
+
+
+class HttpResponse:
+    """A response whose body is read lazily from `chunks` (already decoded
+    from any Content-Encoding). `release(reusable)` hands the connection
+    back to its pool once the body has been read to the end, or closes it."""
+
+    def __init__(self, status, headers, url, chunks, release):
+        self.status = status
+        self.headers = headers
+        self.url = url
+        self._chunks = chunks
+        self._release = release
+        self._content = None
+
+    def iter_bytes(self):
+        """Yield the body in chunks as it arrives (at most once)."""
+        if self._content is not None:
+            yield self._content
+            return
+        completed = False
+        try:
+            yield from self._chunks
+            completed = True
+        finally:
+            self._finish(completed)
+
+    def iter_text(self, encoding=None):
+        """Yield the body as text, decoding incrementally."""
+        decoder = codecs.getincrementaldecoder(encoding or _charset(self.headers))(errors='replace')
+        for chunk in self.iter_bytes():
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b''.join(self.iter_bytes())
+        return self._content
+
+    def text(self, encoding=None):
+        return self.content.decode(encoding or _charset(self.headers), errors='replace')
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def close(self):
+        """Stop reading; the connection is reused only if the body was read."""
+        self._finish(False)
+
+    def _finish(self, completed):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(completed)
+            if self._content is None and completed:
+                self._content = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Connection Pools ───────────────────────────────────────────
+
+class _HostPool:
+    """Idle keep-alive connections to one (scheme, host, port)."""
+
+    def __init__(self, scheme, host, port, ssl_context, max_idle):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def get(self, timeout):
+        """Return (connection, reused)."""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+            if conn is None:
+                self.opened += 1
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout,
+                                               context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        return conn, False
+
+    def put(self, conn):
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _decoded_chunks(resp, chunk_size):
+    """Read an http.client response in chunks, undoing gzip/deflate."""
+    encoding = (resp.getheader('Content-Encoding') or '').lower()
+    if encoding == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        decompressor = zlib.decompressobj()
+    else:
+        decompressor = None
+    while True:
+        chunk = resp.read(chunk_size)
+        if not chunk:
+            break
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
+    if decompressor is not None:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+# ─── Client ─────────────────────────────────────────────────────
+
+class HttpClient:
+    """Thread-safe HTTP client with per-host keep-alive pools.
+
+    Each request borrows an idle connection to its host (or opens one) and
+    returns it once the response body has been read, so concurrent threads
+    never share a connection and sequential calls skip the TCP+TLS handshake.
+    Redirects are followed; Authorization is dropped when the host changes.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retry=None, http2=False,
+                 max_idle_per_host=MAX_IDLE_PER_HOST, chunk_size=CHUNK_SIZE, breaker=None):
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_idle_per_host = max_idle_per_host
+        self.chunk_size = chunk_size
+        self.ssl_context = ssl.create_default_context()
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._httpx = None
+        if http2:
+            try:
+                import httpx
+                self._httpx = httpx.Client(http2=True, timeout=timeout, follow_redirects=False)
+            except ImportError:
+                log("  httpx[http2] not installed — using HTTP/1.1 keep-alive pools")
+
+    # Public API
+
+    def request(self, method, url, body=None, headers=None, timeout=None, retry=None, stats=None,
+                limiter=None):
+        """Send a request and read the whole body. Returns an HttpResponse.
+        Raises OSError if the server could not be reached.
+
+        `retry` overrides the client's RetryPolicy for this call; retries
+        made are counted in `stats` (a RetryStats) when given. `limiter`
+        (e.g. a TokenBucket) is acquired before every attempt, retries
+        included."""
+        resp = self.stream(method, url, body=body, headers=headers, timeout=timeout,
+                           retry=retry, stats=stats, limiter=limiter)
+        resp.content
+        return resp
+
+    def stream(self, method, url, body=None, headers=None, timeout=None, retry=None, stats=None,
+               limiter=None):
+        """Send a request and return the HttpResponse with its body unread.
+        Read it with iter_bytes()/iter_text() or close it (use `with`)."""
+        method = method.upper()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = dict(headers or {})
+        timeout = timeout or self.timeout
+
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._send(method, url, body, headers, timeout, retry or self.retry, stats, limiter)
+            location = resp.headers.get('Location')
+            if resp.status not in REDIRECT_STATUSES or not location:
+                return resp
+            resp.content  # drain so the connection can be reused
+            next_url = urllib.parse.urljoin(url, location)
+            if resp.status == 303 or (resp.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+                headers = {k: v for k, v in headers.items()
+                           if k.lower() not in ('content-type', 'content-length')}
+            if urllib.parse.urlsplit(next_url).netloc != urllib.parse.urlsplit(url).netloc:
+                headers = {k: v for k, v in headers.items() if k.lower() != 'authorization'}
+            url = next_url
+        return resp
+
+    def connections_opened(self):
+        """Total connections opened so far (all hosts)."""
+        with self._pools_lock:
+            return sum(pool.opened for pool in self._pools.values())
+
+    def close(self):
+        with self._pools_lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+        if self._httpx is not None:
+            self._httpx.close()
+
+    # Internals
+
+    def _pool(self, parts):
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(scheme, parts.hostname, port,
+                                                    self.ssl_context, self.max_idle_per_host)
+        return pool
+
+    def _send(self, method, url, body, headers, timeout, policy, stats, limiter=None):
+        """One hop (no redirects), with retries per `policy`, each attempt
+        waiting for `limiter` first."""
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        attempt = 0
+        while True:
+            wait = self.breaker.wait_time(host)
+            if wait:
+                if not policy.retry_error(method, attempt, sent=False):
+                    raise CircuitOpenError(f"Circuit open for {host}")
+                reason = 'circuit open'
+                log(f"  Circuit open for {host}, waiting {wait:.1f}s...")
+            else:
+                if limiter is not None:
+                    limiter.acquire()
+                try:
+                    resp = self._send_once(method, url, body, headers, timeout)
+                except _SendError as e:
+                    self.breaker.failure(host)
+                    if not policy.retry_error(method, attempt, e.sent):
+                        raise e.error
+                    wait = policy.delay(attempt)
+                    reason = type(e.error).__name__
+                else:
+                    if resp.status >= 500:
+                        self.breaker.failure(host)
+                    else:
+                        self.breaker.success(host)
+                    if not policy.retry_status(method, resp.status, attempt):
+                        return resp
+                    wait = policy.delay(attempt, resp.headers)
+                    if wait is None:
+                        return resp  # server asked for a longer pause than we allow
+                    resp.close()
+                    reason = f"HTTP {resp.status}"
+                log(f"  {reason} on {method} {url}, retrying in {wait:.1f}s...")
+            if stats is not None:
+                stats.record(reason)
+            time.sleep(wait)
+            attempt += 1
+
+    def _send_once(self, method, url, body, headers, timeout):
+        if self._httpx is not None:
+            return self._send_httpx(method, url, body, headers, timeout)
+
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        send_headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip'}
+        send_headers.update(headers)
+
+        pool = self._pool(parts)
+        while True:
+            conn, reused = pool.get(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=send_headers)
+                sent = True
+                resp = conn.getresponse()
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused and (not sent or method in IDEMPOTENT_METHODS):
+                    continue  # server dropped an idle keep-alive connection
+                raise _SendError(e, sent)
+            except OSError as e:
+                conn.close()
+                raise _SendError(e, sent)
+            except http.client.HTTPException as e:
+                conn.close()
+                raise _SendError(ConnectionError(f"{type(e).__name__}: {e}"), sent)
+            break
+
+        def release(completed, conn=conn, resp=resp):
+            if completed and not resp.will_close:
+                resp.read()  # marks the response done (a HEAD's was never read), so conn can send again
+                pool.put(conn)
+            else:
+                resp.close()
+                conn.close()
+
+        chunks = _decoded_chunks(resp, self.chunk_size) if method != 'HEAD' else iter(())
+        return HttpResponse(resp.status, resp.headers, url, chunks, release)
+
+    def _send_httpx(self, method, url, body, headers, timeout):
+        import httpx
+        req = self._httpx.build_request(method, url, content=body, headers=headers, timeout=timeout)
+        try:
+            resp = self._httpx.send(req, stream=True)
+        except httpx.ConnectError as e:
+            raise _SendError(ConnectionError(str(e)), False)
+        except httpx.TransportError as e:
+            raise _SendError(ConnectionError(str(e)), True)
+        return HttpResponse(resp.status_code, resp.headers, url,
+                            resp.iter_bytes(self.chunk_size), lambda completed: resp.close())
+
+
+class _SendError(Exception):
+    """Wraps a transport error with whether the request had been sent."""
+
+    def __init__(self, error, sent):
+        super().__init__(str(error))
+        self.error = error
+        self.sent = sent
+
+
+# ─── Shared Instance ────────────────────────────────────────────
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client():
+    """The process-wide HttpClient (created on first use)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = HttpClient(http2=os.environ.get('HTTP_CLIENT_HTTP2') == '1')
+        return _CLIENT
+
+
+def api_request(url, data=None, headers=None, method='GET', timeout=DEFAULT_TIMEOUT,
+                retry=None, stats=None, limiter=None):
+    """Make a JSON HTTP request. Returns (status_code, parsed_response).
+
+    Same contract as the scripts' old urllib helper: `data` is sent as JSON;
+    a 2xx/3xx gives the parsed JSON body, an HTTP error (status, body text),
+    and a network failure (0, "Network error: ..."). `retry`, `stats` and
+    `limiter` are passed to HttpClient.request.
+    """
+    body = None
+    if data is not None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    try:
+        resp = get_client().request(method, url, body=body, headers=headers, timeout=timeout,
+                                    retry=retry, stats=stats, limiter=limiter)
+    except (OSError, socket.timeout) as e:
+        return 0, f"Network error: {e}"
+    except Exception as e:
+        return 0, f"Error: {str(e)}"
+    if resp.status >= 400:
+        return resp.status, resp.text()
+    try:
+        return resp.status, resp.json()
+    except Exception as e:
+        return 0, f"Error: {str(e)}"
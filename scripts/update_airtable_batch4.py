@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 """
-Update Airtable records from batch4 JSON payload using pyairtable
+Update Airtable records from batch4 JSON payload (10 records per request)
 """
 
 import json
 import os
-from pyairtable import Api
+from airtable_io import AirtableWriteQueue
 
 # Airtable configuration
 BASE_ID = "appFQYNRTuooIRZZz"
@@ -24,27 +24,18 @@ with open(payload_file, 'r', encoding='utf-8') as f:
 
 print(f"Loaded {len(records)} records from {payload_file}")
 
-# Initialize Airtable API
-api = Api(api_token)
-table = api.table(BASE_ID, TABLE_ID)
+# Queue every update; the queue sends 10 records per PATCH under the 5 req/s limit
+queue = AirtableWriteQueue(api_token, BASE_ID, TABLE_ID)
 
-# Update records
 print("\nUpdating records...")
-updated_count = 0
-errors = []
-
 for record in records:
-    record_id = record['id']
-    fields = record['fields']
-
-    try:
-        table.update(record_id, fields)
-        updated_count += 1
-        print(f"  ✓ Updated record {record_id}")
-    except Exception as e:
-        error_msg = f"  ✗ Failed to update record {record_id}: {str(e)}"
-        print(error_msg)
-        errors.append(error_msg)
+    queue.update(record['id'], record['fields'])
+queue.close()
+
+errors = [f"  ✗ Failed to update record {record_id}: {error}"
+          for record_id, error in queue.failed.items()]
+updated_count = queue.written
+print(f"  ✓ Updated {updated_count} records in {queue.requests} requests")
 
 # Summary
 print(f"\n{'='*60}")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of downloading and extracting a large brochure PDF.
+
+Serves synthetic PDFs (uncompressed random-noise images plus a line of text
+per page, so the size is what pypdf has to get through) from a local
+stand-in for the Drive API, and runs each way of getting them into pypdf
+in a fresh process, reporting its wall time and peak RSS:
+
+  - buffered:  the whole body read into memory, written to a temp file in
+               working_dir, and that path handed to pypdf
+  - temp file: streamed to a temp file in working_dir, path handed to pypdf
+               (pypdf then reads the whole file back into memory)
+  - spool:     what extract_brochure.py does now — streamed into a
+               SpooledTemporaryFile that pypdf reads in place
+
+Usage:
+  python bench_brochure_download.py [--sizes 50,100] [--pages 20]
+
+Peak RSS comes from resource.getrusage, so this runs on Linux/macOS only.
+"""
+
+import http.server
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+MODES = ('buffered', 'temp file', 'spool')
+
+
+# ─── Synthetic PDFs ─────────────────────────────────────────────
+
+def write_pdf(path, size_mb, pages):
+    """A valid PDF of about size_mb, written piecewise so the generator
+    itself stays small. Page i is objects 4+3i (page), 5+3i (text), 6+3i
+    (image); 1-3 are the catalog, page tree and font."""
+    side = int((size_mb * 1024 * 1024 / pages / 3) ** 0.5)
+    offsets = {}
+    with open(path, 'wb') as f:
+        def obj(number, body, stream=None):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode())
+            f.write(body.encode())
+            if stream is not None:
+                f.write(b"\nstream\n")
+                stream(f)
+                f.write(b"\nendstream")
+            f.write(b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        kids = ' '.join(f"{4 + 3 * i} 0 R" for i in range(pages))
+        obj(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>")
+        obj(3, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i in range(pages):
+            page, text, image = 4 + 3 * i, 5 + 3 * i, 6 + 3 * i
+            obj(page, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {text} 0 R "
+                      f"/Resources << /Font << /F1 3 0 R >> /XObject << /Im{i} {image} 0 R >> >> >>")
+            content = (f"q 500 0 0 500 48 200 cm /Im{i} Do Q "
+                       f"BT /F1 14 Tf 48 760 Td (Domaine page {i + 1} - tarifs mariage {size_mb} MB) Tj ET").encode()
+            obj(text, f"<< /Length {len(content)} >>", lambda out, content=content: out.write(content))
+
+            def noise(out, remaining=side * side * 3):
+                while remaining:
+                    block = min(remaining, 1024 * 1024)
+                    out.write(os.urandom(block))
+                    remaining -= block
+            obj(image, f"<< /Type /XObject /Subtype /Image /Width {side} /Height {side} "
+                       f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Length {side * side * 3} >>", noise)
+
+        xref_at = f.tell()
+        count = len(offsets) + 1
+        f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for number in range(1, count):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode())
+
+
+# ─── Drive Stand-in ─────────────────────────────────────────────
+
+def serve(files):
+    """Serve {file_id: path} as GET /files/<id>?alt=media on a local port.
+    Returns the API base URL."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            match = re.match(r'/files/([^/?]+)\?alt=media', self.path)
+            path = files.get(match.group(1)) if match else None
+            if path is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                while block := f.read(256 * 1024):
+                    self.wfile.write(block)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ─── Measured Child ─────────────────────────────────────────────
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def extract_from_path(path):
+    """The previous extract_pdf_text: pypdf given the path."""
+    import pypdf
+    reader = pypdf.PdfReader(path)
+    return '\n\n'.join(text for text in (page.extract_text() for page in reader.pages) if text.strip())
+
+
+def run_mode(mode, file_id, working_dir):
+    """One download + extraction in this process; prints time, RSS before
+    and peak RSS, and the characters extracted."""
+    import extract_brochure as eb
+    import pypdf  # noqa: F401  (imported before the baseline is taken)
+    eb.PAGE_CACHE_PATH = os.path.join(working_dir, f"pages_{os.getpid()}.sqlite3")   # always extract
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'spool':
+        with eb.download_spool(working_dir) as spool:
+            eb.gdrive_download(file_id, 'token', spool)
+            text = eb.extract_text_from_file(spool, 'brochure.pdf', 'application/pdf')
+    else:
+        dest = os.path.join(working_dir, f"temp_{file_id}.pdf")
+        try:
+            if mode == 'buffered':
+                resp = eb.gdrive_get(f"{eb.DRIVE_API}/files/{file_id}?alt=media", 'token')
+                with open(dest, 'wb') as f:
+                    f.write(resp.content)
+                del resp
+            else:
+                with open(dest, 'wb') as f:
+                    eb.gdrive_download(file_id, 'token', f)
+            text = extract_from_path(dest)
+        finally:
+            os.remove(dest)
+    print(f"{time.perf_counter() - start:.3f} {baseline:.1f} {peak_rss_mb():.1f} {len(text or '')}")
+
+
+def pop_option(argv, flag, cast):
+    if flag in argv:
+        i = argv.index(flag)
+        value = cast(argv[i + 1])
+        del argv[i:i + 2]
+        return value
+    return None
+
+
+def main():
+    argv = sys.argv[1:]
+    child = pop_option(argv, '--child', str)
+    if child:
+        run_mode(child, argv[0], argv[1])
+        return
+
+    sizes = pop_option(argv, '--sizes', lambda v: [int(s) for s in v.split(',')]) or [50, 100]
+    pages = pop_option(argv, '--pages', int) or 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for size in sizes:
+            path = os.path.join(tmp, f"brochure_{size}mb.pdf")
+            write_pdf(path, size, pages)
+            files[f"pdf{size}"] = path
+        env = dict(os.environ, DRIVE_API_URL=serve(files))
+        working_dir = os.path.join(tmp, 'working')
+        os.makedirs(working_dir)
+
+        for file_id, path in files.items():
+            print(f"{os.path.getsize(path) / 1024 / 1024:.0f} MB PDF, {pages} pages")
+            for mode in MODES:
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, file_id, working_dir],
+                                     env=env, capture_output=True, text=True, check=True).stdout.split()
+                elapsed, baseline, peak, chars = float(out[0]), float(out[1]), float(out[2]), int(out[3])
+                print(f"  {mode:<10} {elapsed:6.2f} s  peak RSS {peak:7.1f} MB  (+{peak - baseline:6.1f} MB)  "
+                      f"{chars:,} chars")
+            print()
+
+
+if __name__ == '__main__':
+    main()
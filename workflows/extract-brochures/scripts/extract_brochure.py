@@ -17,17 +17,51 @@ Output:
   Progress/debug messages go to stderr
 
 Dependencies: pypdf, python-docx (install via: python -m pip install pypdf python-docx)
+HTTP goes through the shared keep-alive client in scripts/http_client.py (stdlib).
+Downloads are streamed into memory (or a temp file in working_dir past 16 MB)
+and read in place by the extractors. DRIVE_API_URL overrides the Drive API
+base URL (e.g. a local stand-in for benchmarks).
 """
 
 import sys
 import os
 import re
 import json
-import urllib.request
-import urllib.error
 import urllib.parse
 import tempfile
+import contextlib
 import io
+import shutil
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+
+# Shared pooled HTTP client (repo scripts/http_client.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts'))
+from brochure_cache import cache_key, get_brochure_cache  # noqa: E402
+from http_client import get_client  # noqa: E402
+
+DRIVE_API = os.environ.get('DRIVE_API_URL', 'https://www.googleapis.com/drive/v3')
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024               # Downloads up to this size stay in memory
+LIST_PAGE_SIZE = 1000                             # Drive's maximum per listing page
+DOWNLOAD_WORKERS = 4                              # Folder files downloaded/exported at once
+EXTRACT_PROCESSES = min(4, os.cpu_count() or 1)   # PDF/DOCX parsing is CPU-bound
+MAX_OUTPUT_CHARS = 95000                          # main() truncates the result here
+OUTPUT_RESERVE = 2000                             # Headroom for folder headers, dividers and warnings
+EXTRACT_BUDGET = MAX_OUTPUT_CHARS - OUTPUT_RESERVE  # Extraction stops once this much text is in hand
+PAGES_PER_SHARD = 16                              # PDF pages per extraction task
+PARALLEL_MIN_PAGES = 24                           # Fewer uncached pages are extracted in-process
+# Folder files whose names match these are extracted (and output) first
+PRICING_NAME_RE = re.compile(r'tarif|prix|price|pricing|\brates?\b|forfait|package|devis|quote|cost|budget')
+WEDDING_NAME_RE = re.compile(r'mariage|wedding|brochure|reception|evenement|event|noces|celebration')
+PAGE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                               'working', 'pdf_page_cache.sqlite3')
+PAGE_CACHE_MAX_BYTES = 128 * 1024 * 1024          # Compressed page text kept before LRU eviction
 
 # Force UTF-8 for stdout/stderr on Windows
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -68,65 +102,105 @@ def extract_doc_id_from_url(url):
     return None
 
 
-def gdrive_download(file_id, access_token, dest_path):
-    """Download a file from Google Drive using the API."""
-    url = f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {access_token}"
-    })
+def gdrive_get(url, access_token, stream=False):
+    """GET a Drive API URL over the shared keep-alive client."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    if stream:
+        return get_client().stream('GET', url, headers=headers)
+    return get_client().request('GET', url, headers=headers)
+
+
+def gdrive_download(file_id, access_token, dest):
+    """Stream a file from Google Drive into the binary file object `dest`
+    and rewind it."""
+    url = f"{DRIVE_API}/files/{file_id}?alt=media"
+    with gdrive_get(url, access_token, stream=True) as resp:
+        if resp.status != 200:
+            log(f"  Download failed: HTTP {resp.status}")
+            return False
+        for chunk in resp.iter_bytes():
+            dest.write(chunk)
+    dest.seek(0)
+    return True
+
+
+@contextlib.contextmanager
+def download_spool(working_dir, size=None):
+    """Buffer for a download of `size` bytes (as Drive reports it). Files up
+    to SPOOL_MAX_MEMORY stay in memory; larger ones go to a named temp file
+    in working_dir, which PDF page shards in other processes can open by
+    name. The extractors read either in place.
+
+    The temp file is created with delete=False and removed here on exit:
+    on Windows a delete-on-close file can't be opened a second time, so
+    the shards couldn't read it."""
+    if size is None or int(size) <= SPOOL_MAX_MEMORY:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, dir=working_dir) as spool:
+            yield spool
+        return
+    spool = tempfile.NamedTemporaryFile(dir=working_dir, prefix='temp_', delete=False)
     try:
-        with urllib.request.urlopen(req) as resp:
-            with open(dest_path, 'wb') as f:
-                f.write(resp.read())
-        return True
-    except urllib.error.HTTPError as e:
-        log(f"  Download failed: HTTP {e.code}")
-        return False
+        yield spool
+    finally:
+        spool.close()
+        try:
+            os.remove(spool.name)
+        except OSError:
+            pass
 
 
 def gdrive_get_file_meta(file_id, access_token):
-    """Get file metadata (name, mimeType) from Google Drive."""
-    url = f"https://www.googleapis.com/drive/v3/files/{file_id}?fields=name,mimeType,size"
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {access_token}"
-    })
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError:
+    """Get file metadata (name, mimeType, and md5Checksum/modifiedTime for
+    the brochure cache) from Google Drive."""
+    url = f"{DRIVE_API}/files/{file_id}?fields=id,name,mimeType,size,md5Checksum,modifiedTime"
+    resp = gdrive_get(url, access_token)
+    if resp.status != 200:
         return None
+    return resp.json()
 
 
 def gdrive_list_folder(folder_id, access_token):
-    """List files in a Google Drive folder."""
-    url = (f"https://www.googleapis.com/drive/v3/files"
-           f"?q=%27{folder_id}%27+in+parents+and+trashed%3Dfalse"
-           f"&fields=files(id,name,mimeType,size)"
-           f"&pageSize=100")
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {access_token}"
-    })
-    try:
-        with urllib.request.urlopen(req) as resp:
-            data = json.loads(resp.read())
-            return data.get('files', [])
-    except urllib.error.HTTPError as e:
-        log(f"  Folder listing failed: HTTP {e.code}")
-        return None
+    """List every file in a Google Drive folder, following nextPageToken."""
+    files = []
+    page_token = None
+    while True:
+        url = (f"{DRIVE_API}/files"
+               f"?q=%27{folder_id}%27+in+parents+and+trashed%3Dfalse"
+               f"&fields=nextPageToken,files(id,name,mimeType,size,md5Checksum,modifiedTime)"
+               f"&pageSize={LIST_PAGE_SIZE}")
+        if page_token:
+            url += f"&pageToken={urllib.parse.quote(page_token)}"
+        resp = gdrive_get(url, access_token)
+        if resp.status != 200:
+            log(f"  Folder listing failed: HTTP {resp.status}")
+            return None
+        page = resp.json()
+        files.extend(page.get('files', []))
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return files
 
 
 def gdrive_export_doc(doc_id, access_token):
     """Export a Google Doc as plain text."""
-    url = f"https://www.googleapis.com/drive/v3/files/{doc_id}/export?mimeType=text/plain"
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {access_token}"
-    })
+    url = f"{DRIVE_API}/files/{doc_id}/export?mimeType=text/plain"
+    resp = gdrive_get(url, access_token)
+    if resp.status != 200:
+        log(f"  Doc export failed: HTTP {resp.status}")
+        return None
+    return resp.text('utf-8')
+
+
+def gdrive_export_sheet(file_id, access_token):
+    """Export a Google Sheet as CSV. Returns None on failure."""
+    url = f"{DRIVE_API}/files/{file_id}/export?mimeType=text/csv"
     try:
-        with urllib.request.urlopen(req) as resp:
-            return resp.read().decode('utf-8', errors='replace')
-    except urllib.error.HTTPError as e:
-        log(f"  Doc export failed: HTTP {e.code}")
+        resp = gdrive_get(url, access_token)
+    except Exception:
+        return None
+    if resp.status != 200:
         return None
+    return resp.text('utf-8')
 
 
 def clean_text(text):
@@ -142,40 +216,238 @@ def clean_text(text):
     return text.strip()
 
 
-def extract_pdf_text(filepath):
-    """Extract text from a PDF file using pypdf."""
+class PageCache:
+    """SQLite cache of extracted PDF page text keyed by (SHA-256 of the file,
+    page index), so a re-run or a retry after a failure only extracts the
+    pages it doesn't have yet. Like the brochure cache, text is stored
+    zlib-compressed and whole files are evicted least recently used first
+    once the total passes max_bytes."""
+
+    def __init__(self, path=None, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.path = path or PAGE_CACHE_PATH
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self.lock:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('DROP TABLE IF EXISTS pages')   # uncompressed, unbounded layout
+            self.db.execute('CREATE TABLE IF NOT EXISTS page_text (digest TEXT, page INTEGER, text BLOB NOT NULL, '
+                            'size INTEGER NOT NULL, PRIMARY KEY (digest, page))')
+            self.db.execute('CREATE TABLE IF NOT EXISTS page_files (digest TEXT PRIMARY KEY, used_at REAL NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS page_files_used_at ON page_files (used_at)')
+
+    def get(self, digest):
+        """{page index: text} for every cached page of the file."""
+        with self.lock:
+            rows = self.db.execute('SELECT page, text FROM page_text WHERE digest = ?', (digest,)).fetchall()
+            if rows:
+                self.db.execute('UPDATE page_files SET used_at = ? WHERE digest = ?', (time.time(), digest))
+        return {page: zlib.decompress(text).decode('utf-8') for page, text in rows}
+
+    def put(self, digest, pages):
+        """Store [(page index, text), ...]."""
+        rows = []
+        for index, text in pages:
+            blob = zlib.compress(text.encode('utf-8'))
+            rows.append((digest, index, blob, len(blob)))
+        with self.lock:
+            self.db.executemany('INSERT OR REPLACE INTO page_text VALUES (?, ?, ?, ?)', rows)
+            self.db.execute('INSERT OR REPLACE INTO page_files VALUES (?, ?)', (digest, time.time()))
+            self._evict(digest)
+
+    def _evict(self, keep):
+        """Drop the least recently used files' pages until the total fits
+        max_bytes, never the file being stored (`keep`)."""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM page_text').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        dropped = 0
+        for digest, size in self.db.execute(
+                'SELECT f.digest, COALESCE(SUM(t.size), 0) FROM page_files f LEFT JOIN page_text t '
+                'ON t.digest = f.digest GROUP BY f.digest ORDER BY f.used_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            self.db.execute('DELETE FROM page_text WHERE digest = ?', (digest,))
+            self.db.execute('DELETE FROM page_files WHERE digest = ?', (digest,))
+            total -= size
+            dropped += 1
+        log(f"  PDF page cache: evicted {dropped} least recently used file{'' if dropped == 1 else 's'}")
+
+
+_PAGE_CACHE = None
+_PAGE_CACHE_LOCK = threading.Lock()
+
+
+def get_page_cache():
+    """The process-wide PageCache, or None if it can't be opened."""
+    global _PAGE_CACHE
+    with _PAGE_CACHE_LOCK:
+        if _PAGE_CACHE is None:
+            try:
+                _PAGE_CACHE = PageCache()
+            except sqlite3.Error as e:
+                log(f"  PDF page cache unavailable ({e})")
+                _PAGE_CACHE = False
+        return _PAGE_CACHE or None
+
+
+def content_digest(stream):
+    """SHA-256 of a binary file object's contents; leaves it rewound."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while block := stream.read(1024 * 1024):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def extract_pages(source, indexes):
+    """Cleaned text of the given pages of a PDF path or bytes, as
+    [(page index, text)], text None for a page that failed. Runs in a
+    worker process."""
+    import pypdf
+    pages = []
+    with open_source(source) as stream:
+        reader = pypdf.PdfReader(stream)
+        for index in indexes:
+            try:
+                pages.append((index, clean_text(reader.pages[index].extract_text() or '')))
+            except Exception as e:
+                log(f"  PDF page {index + 1} extraction failed: {e}")
+                pages.append((index, None))
+    return pages
+
+
+@contextlib.contextmanager
+def shareable_source(stream):
+    """A path page shards in other processes can open: the stream's own
+    file if it has one, else a temp copy written block by block (an
+    in-memory or rolled-over spool is never read whole into memory),
+    removed on exit."""
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+    fd, path = tempfile.mkstemp(prefix='temp_', suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            stream.seek(0)
+            shutil.copyfileobj(stream, out, 1024 * 1024)
+        stream.seek(0)
+        yield path
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+
+def extract_pdf_text(stream, max_chars=EXTRACT_BUDGET, parallel=True):
+    """Extract text from a PDF (binary file object) using pypdf. Given a
+    stream rather than a path, pypdf reads it in place instead of loading a
+    copy of the whole file.
+
+    Pages already in the page cache are reused. If at least
+    PARALLEL_MIN_PAGES are left (and `parallel`, on a multi-core machine),
+    they are split into PAGES_PER_SHARD-page shards across EXTRACT_PROCESSES
+    processes and merged back in page order. Extraction stops once the
+    pages read so far fill max_chars, since main() would cut the rest."""
     try:
         import pypdf
-        reader = pypdf.PdfReader(filepath)
-        pages = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text and text.strip():
-                pages.append(clean_text(text))
+        cache = get_page_cache()
+        digest = content_digest(stream)
+        reader = pypdf.PdfReader(stream)
+        page_count = len(reader.pages)
+        done = cache.get(digest) if cache else {}
+        todo = [i for i in range(page_count) if i not in done]
+
+        failed = set()
+
+        def filled(upto):
+            """Chars in the run of finished pages from `upto` on, and where
+            that run ends."""
+            chars = 0
+            while upto < page_count and (upto in done or upto in failed):
+                chars += len(done.get(upto, '')) + 2
+                upto += 1
+            return chars, upto
+
+        def finish(pages):
+            """Record extracted pages; failed ones (text None) aren't cached,
+            so they are retried next run."""
+            extracted = [(i, text) for i, text in pages if text is not None]
+            failed.update(i for i, text in pages if text is None)
+            done.update(extracted)
+            if cache and extracted:
+                cache.put(digest, extracted)
+
+        chars, upto = filled(0)
+        if chars < max_chars and todo:
+            if parallel and EXTRACT_PROCESSES > 1 and len(todo) >= PARALLEL_MIN_PAGES:
+                log(f"  Extracting {len(todo)} of {page_count} PDF pages in {EXTRACT_PROCESSES} processes")
+                shards = [todo[i:i + PAGES_PER_SHARD] for i in range(0, len(todo), PAGES_PER_SHARD)]
+                spawn = multiprocessing.get_context('spawn')
+                with shareable_source(stream) as source:
+                    processes = ProcessPoolExecutor(max_workers=EXTRACT_PROCESSES, mp_context=spawn)
+                    try:
+                        futures = [processes.submit(extract_pages, source, shard) for shard in shards]
+                        for future in as_completed(futures):
+                            finish(future.result())
+                            more, upto = filled(upto)
+                            chars += more
+                            if chars >= max_chars:
+                                break
+                    finally:
+                        processes.shutdown(wait=True, cancel_futures=True)
+            else:
+                for index in todo:
+                    if chars >= max_chars:
+                        break
+                    try:
+                        text = clean_text(reader.pages[index].extract_text() or '')
+                    except Exception as e:
+                        log(f"  PDF page {index + 1} extraction failed: {e}")
+                        text = None
+                    finish([(index, text)])
+                    more, upto = filled(upto)
+                    chars += more
+            if upto < page_count:
+                log(f"  Output limit reached after page {upto} of {page_count}; skipped the rest")
+
+        pages = [done[i] for i in range(page_count) if done.get(i, '').strip()]
         return '\n\n'.join(pages)
     except Exception as e:
         log(f"  PDF extraction failed: {e}")
         return None
 
 
-def extract_docx_text(filepath):
-    """Extract text from a DOCX file using python-docx."""
+def extract_docx_text(stream, max_chars=EXTRACT_BUDGET):
+    """Extract text from a DOCX (binary file object) using python-docx,
+    stopping once max_chars are in hand."""
     try:
         from docx import Document
-        doc = Document(filepath)
+        doc = Document(stream)
         paragraphs = []
+        chars = 0
         for para in doc.paragraphs:
+            if chars >= max_chars:
+                return '\n\n'.join(paragraphs)
             if para.text.strip():
                 paragraphs.append(para.text.strip())
+                chars += len(paragraphs[-1]) + 2
 
         # Also extract tables
         for table in doc.tables:
+            if chars >= max_chars:
+                break
             rows = []
             for row in table.rows:
                 cells = [cell.text.strip() for cell in row.cells]
                 rows.append(' | '.join(cells))
             if rows:
                 paragraphs.append('\n'.join(rows))
+                chars += len(paragraphs[-1]) + 2
 
         return '\n\n'.join(paragraphs)
     except Exception as e:
@@ -183,17 +455,33 @@ def extract_docx_text(filepath):
         return None
 
 
-def extract_text_from_file(filepath, filename, mime_type=None):
-    """Extract text based on file type."""
+def open_source(source):
+    """A binary file object for `source`: a path, bytes, or an open file
+    (returned as is)."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if isinstance(source, str):
+        return open(source, 'rb')
+    return source
+
+
+def extract_text_from_file(source, filename, mime_type=None, parallel=True, max_chars=EXTRACT_BUDGET):
+    """Extract text based on file type. `source` is a path, the file's
+    bytes, or a binary file object (e.g. a download spool), read in place.
+    `parallel` lets a long PDF's pages be split across processes; reading
+    stops at about max_chars."""
     ext = os.path.splitext(filename)[1].lower()
 
     if ext == '.pdf' or (mime_type and 'pdf' in mime_type):
-        return extract_pdf_text(filepath)
+        with open_source(source) as stream:
+            return extract_pdf_text(stream, max_chars, parallel)
     elif ext in ('.docx',) or (mime_type and 'wordprocessing' in str(mime_type)):
-        return extract_docx_text(filepath)
+        with open_source(source) as stream:
+            return extract_docx_text(stream, max_chars)
     elif ext in ('.txt', '.md', '.csv'):
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            return f.read()
+        with open_source(source) as stream:
+            # A char is at most 4 bytes, so this covers max_chars; a char split at the cut lies past it
+            return stream.read(max_chars * 4).decode('utf-8', errors='replace')[:max_chars]
     elif ext in ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'):
         return None  # Images — no OCR available
     else:
@@ -210,6 +498,44 @@ def is_google_workspace_type(mime_type):
     return mime_type in workspace_types
 
 
+def cached_export(meta, access_token, sheet=False):
+    """Export a Google Doc as text (or a Sheet as CSV), from the brochure
+    cache while its modifiedTime is unchanged. None if the export failed."""
+    export, export_format = (gdrive_export_sheet, 'text/csv') if sheet else (gdrive_export_doc, 'text/plain')
+    cache = get_brochure_cache()
+    key = cache_key(meta, export_format)
+    text = cache.get(key) if cache else None
+    if text is None:
+        text = export(meta['id'], access_token)
+        if cache and text is not None:
+            cache.put(key, text)
+    else:
+        log(f"  Export cached ({len(text):,} chars)")
+    return text
+
+
+def cached_download_text(meta, access_token, working_dir, max_chars=EXTRACT_BUDGET):
+    """Download an uploaded file and extract its text, unless the brochure
+    cache already has text for these bytes (same md5Checksum, from any file
+    or venue). Returns (fetched, text): fetched is False if the download
+    failed; text is None or '' if nothing was readable."""
+    cache = get_brochure_cache()
+    key = cache_key(meta)
+    text = cache.get(key, max_chars) if cache else None
+    if text is not None:
+        log(f"  Extraction cached ({len(text):,} chars)")
+        return True, text
+
+    with download_spool(working_dir, meta.get('size')) as spool:
+        if not gdrive_download(meta['id'], access_token, spool):
+            return False, None
+        text = extract_text_from_file(spool, meta.get('name', 'unknown'), meta.get('mimeType', ''),
+                                      max_chars=max_chars)
+    if cache:
+        cache.put(key, text, max_chars)
+    return True, text
+
+
 def process_gdrive_file(url, access_token, working_dir):
     """Process a single Google Drive file URL."""
     file_id = extract_file_id_from_url(url)
@@ -230,45 +556,84 @@ def process_gdrive_file(url, access_token, working_dir):
     # Handle Google Workspace files via export
     if is_google_workspace_type(mime_type):
         if 'document' in mime_type:
-            text = gdrive_export_doc(file_id, access_token)
+            text = cached_export(meta, access_token)
             if text and text.strip():
                 return text.strip()
             return "[ERROR]: Files are images without readable text."
         elif 'spreadsheet' in mime_type:
             # Export as CSV
-            export_url = f"https://www.googleapis.com/drive/v3/files/{file_id}/export?mimeType=text/csv"
-            req = urllib.request.Request(export_url, headers={
-                "Authorization": f"Bearer {access_token}"
-            })
-            try:
-                with urllib.request.urlopen(req) as resp:
-                    text = resp.read().decode('utf-8', errors='replace')
-                    if text.strip():
-                        return text.strip()
-            except Exception:
-                pass
+            text = cached_export(meta, access_token, sheet=True)
+            if text and text.strip():
+                return text.strip()
             return "[ERROR]: Files are images without readable text."
         else:
             return "[ERROR]: Unsupported file types found."
 
     # Download binary file
-    dest = os.path.join(working_dir, f"temp_{file_id}{os.path.splitext(filename)[1]}")
-    if not gdrive_download(file_id, access_token, dest):
+    fetched, text = cached_download_text(meta, access_token, working_dir)
+    if not fetched:
         return "[ERROR]: Link unreachable."
 
-    try:
-        text = extract_text_from_file(dest, filename, mime_type)
-        if text and text.strip():
-            return text.strip()
-        else:
-            return "[ERROR]: Files are images without readable text."
-    finally:
-        if os.path.exists(dest):
-            os.remove(dest)
+    if text and text.strip():
+        return text.strip()
+    else:
+        return "[ERROR]: Files are images without readable text."
 
 
-def process_gdrive_folder(folder_id, access_token, working_dir):
-    """Process a Google Drive folder — list and extract all files."""
+def fetch_folder_file(f, access_token, working_dir):
+    """Export or download one folder file. Returns ('text', text) for
+    Google Workspace files, ('file', path) for a download written to
+    working_dir, or (None, None) if it couldn't be fetched. Extraction runs
+    in another process, which opens the path itself, so the file's bytes
+    are never held or copied in this one."""
+    fid = f['id']
+    fname = f['name']
+    fmime = f.get('mimeType', '')
+    try:
+        if is_google_workspace_type(fmime):
+            if 'document' in fmime:
+                return 'text', gdrive_export_doc(fid, access_token)
+            if 'spreadsheet' in fmime:
+                return 'text', gdrive_export_sheet(fid, access_token)
+            return None, None  # Slides — skip for now
+        dest = os.path.join(working_dir, f"temp_{fid}{os.path.splitext(fname)[1].lower()}")
+        try:
+            with open(dest, 'wb') as out:
+                if gdrive_download(fid, access_token, out):
+                    return 'file', dest
+        except Exception:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(dest)
+            raise
+        os.remove(dest)
+    except Exception as e:
+        log(f"    {fname}: download failed: {e}")
+    return None, None
+
+
+def brochure_priority(filename):
+    """0 for a pricing file, 1 for a wedding brochure, 2 for anything else
+    (by name, accents and case ignored)."""
+    name = unicodedata.normalize('NFKD', filename)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    if PRICING_NAME_RE.search(name):
+        return 0
+    if WEDDING_NAME_RE.search(name):
+        return 1
+    return 2
+
+
+def process_gdrive_folder(folder_id, access_token, working_dir, max_chars=EXTRACT_BUDGET):
+    """Process a Google Drive folder — list and extract all files.
+
+    Pricing files come first, then wedding brochures, then the rest (each
+    group in listing order), so what matters most fits under the output
+    limit. Files are downloaded DOWNLOAD_WORKERS at a time, and each is
+    handed to a pool of EXTRACT_PROCESSES processes as soon as it lands, so
+    PDF parsing runs on every core while the rest download. Once the files
+    finished so far, in that order, hold max_chars, the rest are skipped.
+    Files the brochure cache knows aren't fetched at all, and files with
+    the same content (md5Checksum) are fetched once."""
     log(f"  Folder ID: {folder_id}")
     files = gdrive_list_folder(folder_id, access_token)
 
@@ -279,11 +644,14 @@ def process_gdrive_folder(folder_id, access_token, working_dir):
 
     log(f"  Found {len(files)} files in folder")
 
-    results = []
-    errors = []
-
-    for f in files:
-        fid = f['id']
+    texts = {}   # listing index -> extracted text (None if unreadable)
+    order = []   # listing indexes of the files to output, most useful first
+    jobs = []
+    cache = get_brochure_cache()
+    keys = {}    # listing index fetched -> brochure cache key
+    copies = {}  # listing index fetched -> indexes of other files with the same content
+    fetched_for = {}
+    for i, f in enumerate(files):
         fname = f['name']
         fmime = f.get('mimeType', '')
         log(f"  Processing: {fname} ({fmime})")
@@ -293,47 +661,114 @@ def process_gdrive_folder(folder_id, access_token, working_dir):
             log(f"    Skipping subfolder")
             continue
 
-        text = None
-
-        # Handle Google Workspace files
-        if is_google_workspace_type(fmime):
-            if 'document' in fmime:
-                text = gdrive_export_doc(fid, access_token)
-            elif 'spreadsheet' in fmime:
-                export_url = f"https://www.googleapis.com/drive/v3/files/{fid}/export?mimeType=text/csv"
-                req = urllib.request.Request(export_url, headers={
-                    "Authorization": f"Bearer {access_token}"
-                })
-                try:
-                    with urllib.request.urlopen(req) as resp:
-                        text = resp.read().decode('utf-8', errors='replace')
-                except Exception:
-                    pass
-            # Slides — skip for now
-        else:
-            # Download and extract
-            ext = os.path.splitext(fname)[1].lower()
+        order.append(i)
+        ext = os.path.splitext(fname)[1].lower()
+        if not is_google_workspace_type(fmime):
             if ext in ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'):
                 log(f"    Image file — no OCR available, skipping")
-                errors.append(fname)
+                texts[i] = None
                 continue
             if ext in ('.zip', '.exe', '.rar', '.7z'):
                 log(f"    Unsupported format, skipping")
-                errors.append(fname)
+                texts[i] = None
                 continue
 
-            dest = os.path.join(working_dir, f"temp_{fid}{ext}")
-            if gdrive_download(fid, access_token, dest):
+        workspace = is_google_workspace_type(fmime)
+        key = cache_key(f, ('text/csv' if 'spreadsheet' in fmime else 'text/plain') if workspace else None)
+        cached = cache.get(key, None if workspace else max_chars) if cache else None
+        if cached is not None:
+            log(f"    Cached ({len(cached):,} chars)")
+            texts[i] = cached
+            continue
+        if key in fetched_for:
+            log(f"    Same content as {files[fetched_for[key]]['name']}")
+            copies.setdefault(fetched_for[key], []).append(i)
+            continue
+        if key:
+            fetched_for[key] = i
+            keys[i] = key
+        jobs.append(i)
+
+    def settle(i, text, budget=None, store=True):
+        """Record a file's text (for its same-content copies too) and cache it."""
+        texts[i] = text
+        for j in copies.get(i, ()):
+            texts[j] = text
+        if store and cache and i in keys:
+            cache.put(keys[i], text, budget)
+
+    order.sort(key=lambda i: brochure_priority(files[i]['name']))
+    rank = {i: n for n, i in enumerate(order)}
+    jobs.sort(key=rank.get)
+
+    # Spawned, not forked: forking while download threads run can deadlock
+    spawn = multiprocessing.get_context('spawn')
+    threads = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS)
+    processes = ProcessPoolExecutor(max_workers=EXTRACT_PROCESSES, mp_context=spawn)
+    pending = {threads.submit(fetch_folder_file, files[i], access_token, working_dir): ('fetch', i) for i in jobs}
+    temp_files = {}
+    position = 0   # order[:position] are finished
+    chars = 0
+    try:
+        while True:
+            while position < len(order) and order[position] in texts:
+                text = texts[order[position]]
+                if text and text.strip():
+                    chars += len(text.strip()) + len(files[order[position]]['name']) + 24   # + header, divider
+                position += 1
+            if not pending or chars >= max_chars:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step, i = pending.pop(future)
+                if step == 'fetch':
+                    kind, value = future.result()
+                    if kind == 'file':
+                        f = files[i]
+                        temp_files[i] = value
+                        # Files already run in parallel here; pages aren't split further
+                        extraction = processes.submit(extract_text_from_file, value, f['name'],
+                                                      f.get('mimeType', ''), parallel=False, max_chars=max_chars)
+                        pending[extraction] = ('extract', i)
+                    else:
+                        settle(i, value, store=kind == 'text' and value is not None)
+                    continue
                 try:
-                    text = extract_text_from_file(dest, fname, fmime)
-                finally:
-                    if os.path.exists(dest):
-                        os.remove(dest)
+                    settle(i, future.result(), max_chars)
+                except Exception as e:
+                    log(f"    {files[i]['name']}: extraction failed: {e}")
+                    settle(i, None, store=False)
+                dest = temp_files.pop(i, None)
+                if dest and os.path.exists(dest):
+                    os.remove(dest)
+    finally:
+        for future in pending:
+            future.cancel()
+        threads.shutdown(wait=True, cancel_futures=True)
+        processes.shutdown(wait=True, cancel_futures=True)
+        # Downloads that finished after the budget filled
+        for future, (step, i) in pending.items():
+            if step == 'fetch' and not future.cancelled() and future.exception() is None:
+                kind, value = future.result()
+                if kind == 'file':
+                    temp_files[i] = value
+        for dest in temp_files.values():
+            if os.path.exists(dest):
+                os.remove(dest)
+
+    if position < len(order):
+        log(f"  Output budget filled after {position} of {len(order)} files; skipping the rest")
+        order = order[:position]
 
+    results = []
+    errors = []
+    for i in order:
+        text = texts[i]
         if text and text.strip():
-            results.append((fname, text.strip()))
+            results.append((files[i]['name'], text.strip()))
         else:
-            errors.append(fname)
+            errors.append(files[i]['name'])
 
     if not results:
         if errors:
@@ -368,25 +803,19 @@ def process_gdocs(doc_id, access_token, working_dir):
 
     # Native Google Doc — use export
     if is_google_workspace_type(mime_type):
-        text = gdrive_export_doc(doc_id, access_token)
+        text = cached_export(meta, access_token)
         if text and text.strip():
             return text.strip()
         return "[ERROR]: Files are images without readable text."
 
     # Uploaded file (e.g., .docx opened in Google Docs) — download binary
-    ext = os.path.splitext(filename)[1].lower()
-    dest = os.path.join(working_dir, f"temp_{doc_id}{ext}")
-    if not gdrive_download(doc_id, access_token, dest):
+    fetched, text = cached_download_text(meta, access_token, working_dir)
+    if not fetched:
         return "[ERROR]: Link unreachable."
 
-    try:
-        text = extract_text_from_file(dest, filename, mime_type)
-        if text and text.strip():
-            return text.strip()
-        return "[ERROR]: Files are images without readable text."
-    finally:
-        if os.path.exists(dest):
-            os.remove(dest)
+    if text and text.strip():
+        return text.strip()
+    return "[ERROR]: Files are images without readable text."
 
 
 def refresh_token_if_needed(tokens_path):
@@ -432,19 +861,22 @@ def refresh_token_if_needed(tokens_path):
         'refresh_token': refresh_token,
         'grant_type': 'refresh_token'
     }).encode('utf-8')
-    req = urllib.request.Request('https://oauth2.googleapis.com/token', data=data)
     try:
-        with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read())
-            new_token = result.get('access_token')
-            if new_token:
-                # Update tokens file
-                tokens['access_token'] = new_token
-                tokens['expiry_date'] = int(time.time() * 1000) + result.get('expires_in', 3600) * 1000
-                with open(tokens_path, 'w') as f:
-                    json.dump(tokens, f, indent=2)
-                log("  Token refreshed successfully")
-                return new_token
+        resp = get_client().request('POST', 'https://oauth2.googleapis.com/token', body=data, headers={
+            "Content-Type": "application/x-www-form-urlencoded"
+        })
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+        result = resp.json()
+        new_token = result.get('access_token')
+        if new_token:
+            # Update tokens file
+            tokens['access_token'] = new_token
+            tokens['expiry_date'] = int(time.time() * 1000) + result.get('expires_in', 3600) * 1000
+            with open(tokens_path, 'w') as f:
+                json.dump(tokens, f, indent=2)
+            log("  Token refreshed successfully")
+            return new_token
     except Exception as e:
         log(f"  Token refresh failed: {e}")
 
@@ -486,7 +918,7 @@ def main():
         result = f"[ERROR]: Unknown URL type: {url_type}"
 
     # Truncate if needed
-    max_len = 95000
+    max_len = MAX_OUTPUT_CHARS
     if len(result) > max_len:
         # Find last complete paragraph before limit
         truncated = result[:max_len]
@@ -0,0 +1,319 @@
+"""
+Benchmark (and regression-check) the cleaning stages of process_venue.py.
+
+1. Line classifier: compares the legacy sequential checks (kept below, copied
+   from clean_markdown before the compiled classifier) with classify_line over
+   a text corpus, checks both keep exactly the same lines, reports lines/sec.
+   Corpus: every .md file and every string value in .json files under the
+   given directories (default: the repo's outputs/ folder), plus the raw
+   scrapes in working/raw_archive/ when they exist.
+
+2. Cookie blocks: runs the legacy _remove_cookie_blocks and the current one
+   over a seeded synthetic regression corpus (varied hit/gap/blank patterns)
+   and 10,000-line pages, requires identical output, and reports timings.
+
+Usage:
+  python bench_clean.py [--repeat N] [<corpus_dir> ...]
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import process_venue as pv  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(SCRIPT_DIR, '..', '..', '..', 'outputs')
+
+
+# ─── Legacy Filter (reference) ──────────────────────────────────
+
+LEGACY_BOOKING_KEYWORDS = [
+    'arrival', 'departure', 'check-in', 'check-out', 'checkin', 'checkout',
+    'number of adults', 'number of guests', 'select date', 'book now',
+    'book your stay', 'availability', 'réserver', 'arrivée', 'départ',
+    "nombre d'adultes", 'rechercher', 'vérifier la disponibilité',
+    'check availability', 'select room', 'adults', 'children',
+    'promo code', 'discount code', 'best rate'
+]
+
+
+def legacy_is_noise(line):
+    """The per-line checks exactly as clean_markdown ran them before classify_line."""
+    stripped = line.strip()
+    lower = stripped.lower()
+    if re.match(r'^(\[.{1,20}\]\([^)]+\)\s*\|\s*){2,}', stripped):
+        return True
+    if re.match(r'^\[?(go to |skip to |aller au |passer au )?(main )?content\]?', lower):
+        return True
+    if lower in pv.UI_NOISE_WORDS:
+        return True
+    if re.match(r'^\[?(en|fr|es|de|it|nl|pt)\]?\s*(\(.*?\))?\s*$', stripped, re.IGNORECASE):
+        return True
+    if any(kw in lower for kw in LEGACY_BOOKING_KEYWORDS) and len(stripped) < 120:
+        return True
+    if any(kw in lower for kw in pv.FORM_FIELD_KEYWORDS) and len(stripped) < 80:
+        return True
+    if pv.FORM_DROPDOWN_RE.match(stripped):
+        return True
+    if 'data:image/svg+xml' in stripped:
+        return True
+    if re.match(r'^[-*]?\s*!\[.*?\]\(.*?\)$', stripped) and not re.search(r'[a-zA-Z]{5,}', stripped.split('](')[0]):
+        return True
+    if re.match(r'^[0-9a-f]{16,}$', stripped):
+        return True
+    if 'recaptcha' in lower and len(stripped) < 200:
+        return True
+    if re.match(r'^\[privacy\].*\[terms\]', stripped, re.IGNORECASE):
+        return True
+    if re.match(r'^\[?(manage|gérer)\s+(options|services|consent|cookies|vendors)', lower):
+        return True
+    if lower in ('gérer le consentement', 'gérer le consentement aux cookies', 'manage consent'):
+        return True
+    if 'cookie' in lower and len(stripped) > 80 and any(
+        p in lower for p in ['function properly', 'we use cookies', 'consent',
+                              'nous utilisons', 'fonctionner correctement']
+    ):
+        return True
+    if lower in ('sorry, we have no imagery here.', 'sorry, we have no imagery here',
+                  'no imagery available', 'no image available'):
+        return True
+    if re.match(r'^`[←→↑↓\+\-]`$', stripped) or lower in (
+        'move left', 'move right', 'move up', 'move down',
+        'zoom in', 'zoom out', 'jump left by 75%', 'jump right by 75%',
+        'jump up by 75%', 'jump down by 75%', 'keyboard shortcuts',
+    ):
+        return True
+    if re.match(r'^map\s*data', lower) or 'geobasis' in lower or 'map data ©' in lower:
+        return True
+    if any(p in lower for p in [
+        'all rights reserved', 'tous droits', '© ', 'copyright',
+        'follow us on', 'suivez-nous'
+    ]) and len(stripped) < 200:
+        return True
+    if re.match(r'^(\[?(facebook|twitter|instagram|linkedin|youtube|pinterest|tiktok)\]?\s*[\|/,]\s*){2,}', stripped, re.IGNORECASE):
+        return True
+    if lower in (
+        'enquire today', 'handpicked for you', 'no added commission',
+        'enquire now', 'send enquiry', 'request a quote',
+        'similar venues', 'you may also like', 'related venues',
+        'other venues nearby', 'more venues in this region',
+    ):
+        return True
+    if re.match(r'^.{5,60}\s*[-–|]\s*(south of france|provence|languedoc|dordogne|loire|normandy|brittany|bordeaux|champagne|burgundy)', lower):
+        return True
+    if re.match(r'^\[?\d{1,4}\]?\s*$', stripped) and 'instagram' in line.lower():
+        return True
+    if any(p in lower for p in [
+        'création site internet', 'création site web', 'web design by',
+        'designed by', 'powered by', 'website by', 'site réalisé par',
+        'agence web', 'made with love'
+    ]) and len(stripped) < 150:
+        return True
+    return False
+
+
+LEGACY_COOKIE_KEYWORDS = [
+    'cookie', 'consent', 'gdpr', 'privacy policy', 'accepter', 'rejeter',
+    'nous respectons votre vie', 'we use cookies', 'nous utilisons des cookies',
+    'sauvegarder mes', 'personnaliser', 'always active', 'toujours actif',
+    'cookie-law-info', 'accept all', 'accepter tout', 'reject all',
+    'analytics', 'fonctionnels', 'publicit', 'performance',
+    'pas de cookies', 'no cookies to display'
+]
+
+
+def legacy_remove_cookie_blocks(lines, cookie_keywords=LEGACY_COOKIE_KEYWORDS):
+    """_remove_cookie_blocks as it was before the single-pass rewrite."""
+    result = []
+    i = 0
+    while i < len(lines):
+        lower = lines[i].lower().strip()
+        if any(kw in lower for kw in cookie_keywords):
+            block_start = i
+            block_end = i
+            gap = 0
+            j = i + 1
+            while j < len(lines):
+                jlower = lines[j].lower().strip()
+                if any(kw in jlower for kw in cookie_keywords):
+                    block_end = j
+                    gap = 0
+                elif lines[j].strip() == '':
+                    gap += 1
+                    if gap > 2:
+                        break
+                else:
+                    gap += 1
+                    if gap > 2:
+                        break
+                j += 1
+            cookie_line_count = sum(
+                1 for k in range(block_start, block_end + 1)
+                if any(kw in lines[k].lower().strip() for kw in cookie_keywords)
+            )
+            if cookie_line_count >= 3:
+                i = block_end + 1
+                while i < len(lines) and lines[i].strip() == '':
+                    i += 1
+                continue
+            else:
+                result.append(lines[i])
+                i += 1
+        else:
+            result.append(lines[i])
+            i += 1
+    return result
+
+
+# ─── Corpus ─────────────────────────────────────────────────────
+
+def _json_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _json_strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _json_strings(v)
+
+
+def load_corpus(dirs):
+    """Return all non-empty stripped lines from .md / .json files under dirs."""
+    texts = []
+    for root_dir in dirs:
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if name.endswith('.md'):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            texts.append(f.read())
+                    elif name.endswith('.json'):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            texts.extend(_json_strings(json.load(f)))
+                    elif name.endswith('.jsonl.gz'):
+                        texts.extend(e['markdown'] for e in pv.read_archive(path) if 'markdown' in e)
+                except (OSError, ValueError) as e:
+                    print(f"  skipping {path}: {e}", file=sys.stderr)
+    return [line.strip() for text in texts for line in text.split('\n') if line.strip()]
+
+
+COOKIE_SAMPLE_LINES = [
+    'We use cookies to improve your experience.', 'Accept all', 'Reject all',
+    'Always active', 'Analytics', 'Performance', 'Cookie-law-info', 'GDPR',
+    'Gérer le consentement', 'Nous utilisons des cookies', 'Personnaliser',
+]
+CONTENT_SAMPLE_LINES = [
+    'The chateau sleeps 32 guests across 14 bedrooms.',
+    '## Weddings', 'Ceremonies take place in the orangery.', '   ', '',
+    '- Heated pool', 'Contact us for 2027 availability.',
+]
+
+
+def synthetic_cookie_pages(seed, pages, lines_per_page, cookie_ratio):
+    """Deterministic pages mixing cookie lines, blanks and content."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(pages):
+        page = []
+        while len(page) < lines_per_page:
+            if rng.random() < cookie_ratio:
+                page.extend(rng.choice(COOKIE_SAMPLE_LINES) for _ in range(rng.randint(1, 4)))
+            else:
+                page.extend(rng.choice(CONTENT_SAMPLE_LINES) for _ in range(rng.randint(1, 5)))
+        result.append(page[:lines_per_page])
+    return result
+
+
+def cookie_block_regression():
+    """Compare legacy vs current cookie-block removal; returns number of mismatches."""
+    corpus = []
+    for seed, ratio in enumerate([0.1, 0.3, 0.5, 0.7, 0.9]):
+        corpus.extend(synthetic_cookie_pages(seed, 400, 40, ratio))
+    corpus.append([])
+    corpus.append(['Accept all'] * 2)
+    corpus.append(['Accept all', '', '', 'Reject all', '', '', 'Analytics', '', ''])
+    corpus.append(['Accept all', '', '', '', 'Reject all', 'Analytics'])
+    return sum(1 for page in corpus if legacy_remove_cookie_blocks(page) != pv._remove_cookie_blocks(page)), len(corpus)
+
+
+def cookie_block_timing(repeat):
+    pages = [
+        ('10k lines, 30% cookie', synthetic_cookie_pages(100, 1, 10_000, 0.3)[0]),
+        ('10k lines, 90% cookie', synthetic_cookie_pages(101, 1, 10_000, 0.9)[0]),
+        ('10k lines, pairs 3 apart', (['Accept all', 'text one', 'text two', 'text three'] * 2500)),
+    ]
+    rows = []
+    for label, lines in pages:
+        assert legacy_remove_cookie_blocks(lines) == pv._remove_cookie_blocks(lines), label
+        timings = []
+        for fn in (legacy_remove_cookie_blocks, pv._remove_cookie_blocks):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn(lines)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+        rows.append((label, *timings))
+    return rows
+
+
+# ─── Main ───────────────────────────────────────────────────────
+
+def bench(fn, lines, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = 5
+    if '--repeat' in args:
+        i = args.index('--repeat')
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    dirs = args or [DEFAULT_CORPUS]
+    if os.path.isdir(pv.RAW_ARCHIVE_DIR):
+        dirs.append(pv.RAW_ARCHIVE_DIR)
+
+    lines = load_corpus(dirs)
+    if not lines:
+        print("No corpus lines found.")
+        sys.exit(1)
+
+    mismatches = [line for line in lines if legacy_is_noise(line) != (pv.classify_line(line) is not None)]
+    dropped = sum(1 for line in lines if pv.classify_line(line) is not None)
+
+    legacy_rate = bench(legacy_is_noise, lines, repeat)
+    classifier_rate = bench(pv.classify_line, lines, repeat)
+
+    print(f"Corpus: {len(lines):,} lines ({dropped:,} classified as noise) from {', '.join(dirs)}")
+    print(f"  legacy checks : {legacy_rate:>12,.0f} lines/sec")
+    print(f"  classify_line : {classifier_rate:>12,.0f} lines/sec  ({classifier_rate / legacy_rate:.1f}x)")
+    if mismatches:
+        print(f"MISMATCH: {len(mismatches)} lines classified differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print("  outputs identical")
+
+    bad, pages = cookie_block_regression()
+    print(f"\nCookie blocks: {pages:,} regression pages, {bad} mismatches")
+    if bad:
+        sys.exit(1)
+    for label, legacy_s, current_s in cookie_block_timing(repeat):
+        print(f"  {label:<26} legacy {legacy_s * 1000:8.1f} ms   single-pass {current_s * 1000:8.1f} ms"
+              f"  ({legacy_s / current_s:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -25,8 +25,23 @@ Usage:
   # Fetch venue_url_scraped + brochure_text from Airtable to temp files:
   python process_venue.py --fetch-json-sources <record_id> <venue_name> <at_key> <base_id>
 
+  # Batch: many records from a JSONL manifest in one process (shared worker pool + rate limiter):
+  python process_venue.py --batch <manifest.jsonl> [--scrape-only] [--workers <n>] <fc_key> <at_key> <base_id>
+  (manifest lines: {"record_id": ..., "venue_url": ..., "chateaubee_url": ..., "wedinspire_url": ..., "fwv_url": ...})
+
+  # Replay cleaning offline over the raw scrape archive (working/raw_archive/):
+  python process_venue.py --replay [<archive_dir>] [--workers <n>]
+
   Pass "" for any empty listing-site URL.
 
+Scrape options (may appear anywhere on the command line):
+  --concurrency <n>   Pages scraped in parallel per venue (default 4; 1 = serial)
+  --rate-limit <n>    Firecrawl calls allowed per minute (default 30)
+  --workers <n>       Records processed in parallel in --batch mode (default 3),
+                      or processes used by --replay (default: one per core)
+  --cache-dir <path>  Firecrawl response cache location (default working/firecrawl_cache)
+  --no-cache          Always call Firecrawl; neither read nor write the cache
+
 Output (stdout, single line):
   SUCCESS|<chars>|<venue_pages>+<listing_count>|<sources_csv>
   SCRAPED|<chars>|<pages>+<listings>|<sources_csv>|<listing_chars>
@@ -40,21 +55,45 @@ Output (stdout, single line):
   GEOCODE_SKIP|no address
   MANUAL_CHECK|<reason>|0
   AIRTABLE_ERROR|<reason>|<chars>
+  REPLAYED|<record_id>|<raw_chars>|<cleaned_chars_at_scrape>|<cleaned_chars_now>|<final_chars>  (one per record)
+
+  In --batch mode each line above is prefixed with "<record_id>|" and one line
+  is streamed per record as it finishes; records with no venue_url give
+  "<record_id>|SKIPPED|no venue_url" and unexpected failures "<record_id>|ERROR|<reason>".
 """
+import gzip
+import hashlib
 import json
 import re
 import sys
 import os
+import threading
 import time
 import urllib.parse
-import urllib.request
-import urllib.error
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# Shared HTTP client, Airtable and geocoding modules (repo scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts'))
+from http_client import RetryPolicy, RetryStats, TokenBucket, api_request  # noqa: E402
+from airtable_io import AirtableError, AirtableMirror, AirtableWriteQueue  # noqa: E402
+from geocoding import geocode_address  # noqa: E402
 
 WORKING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'working')
 PAYLOAD_PATH = os.path.join(WORKING_DIR, 'payload.json')
+CACHE_DIR = os.path.join(WORKING_DIR, 'firecrawl_cache')
+RAW_ARCHIVE_DIR = os.path.join(WORKING_DIR, 'raw_archive')   # Uncleaned scrapes for --replay
+CACHE_TTL_SECONDS = 7 * 24 * 3600       # Re-fetch map/scrape responses older than a week
+CACHE_MAX_BYTES = 500 * 1024 * 1024     # Evict least-recently-used entries above this
 MAX_CHARS = 95000
-RATE_LIMIT_DELAY = 2  # seconds between Firecrawl calls
+RATE_LIMIT_DELAY = 2  # seconds between Firecrawl calls (average, enforced by the token bucket)
+FIRECRAWL_RATE_PER_MINUTE = 60 / RATE_LIMIT_DELAY
+SCRAPE_CONCURRENCY = 4    # Pages in flight at once per venue
+BATCH_WORKERS = 3         # Venues in flight at once in --batch mode
 MAX_PAGES = 20
+MAX_SCRAPES = 25  # Scrape calls per venue site, incl. replacements for near-duplicate pages
+MIN_PAGE_YIELD = 300      # Novel cleaned chars a page must add to count as productive
+LOW_YIELD_PATIENCE = 3    # Stop crawling after this many unproductive pages in a row
 MIN_CONTENT_CHARS = 500   # Below this, venue content is likely garbage
 MIN_CONTENT_WORDS = 50    # Minimum word count for meaningful venue content
 MIN_LISTING_CHARS = 200   # Minimum chars for a listing-site scrape to be kept
@@ -71,6 +110,9 @@ PRIORITY_KEYWORDS = [
     'contact', 'pricing', 'tarif', 'gallery', 'galerie', 'event', 'événement'
 ]
 
+# Manifest / Airtable field for each listing-site short code
+LISTING_FIELDS = {'CB': 'chateaubee_url', 'WI': 'wedinspire_url', 'FWV': 'fwv_url'}
+
 LISTING_SITES = [
     {'arg_index': 2, 'label': '**ChateauBee**', 'short': 'CB'},
     {'arg_index': 3, 'label': '**WedInspire**', 'short': 'WI'},
@@ -111,82 +153,174 @@ UI_NOISE_WORDS = {
 
 # ─── HTTP Helper ─────────────────────────────────────────────────
 
-def api_request(url, data=None, headers=None, method='GET'):
-    """Make HTTP request. Returns (status_code, parsed_response)."""
-    if headers is None:
-        headers = {}
-    body = None
-    if data is not None:
-        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
-    try:
-        resp = urllib.request.urlopen(req, timeout=120)
-        return resp.status, json.loads(resp.read().decode('utf-8'))
-    except urllib.error.HTTPError as e:
+# Shared by every Firecrawl call in this process (map, venue pages, listings)
+FIRECRAWL_LIMITER = TokenBucket(FIRECRAWL_RATE_PER_MINUTE, burst=SCRAPE_CONCURRENCY)
+
+
+def configure_firecrawl(rate_per_minute=None, concurrency=None):
+    """Apply --rate-limit / --concurrency overrides to the shared limiter."""
+    global FIRECRAWL_LIMITER, SCRAPE_CONCURRENCY
+    if concurrency is not None:
+        SCRAPE_CONCURRENCY = max(1, concurrency)
+    FIRECRAWL_LIMITER = TokenBucket(rate_per_minute or FIRECRAWL_RATE_PER_MINUTE,
+                                    burst=SCRAPE_CONCURRENCY)
+
+
+class ResponseCache:
+    """On-disk cache of successful Firecrawl responses.
+
+    Entries are gzipped JSON files named by the SHA-256 of the endpoint plus
+    the canonical request payload, so any change to the URL or scrape options
+    is a different entry. Entries expire `ttl` seconds after they were stored;
+    a file's mtime records its last use, and the least recently used files
+    are evicted once the directory grows past `max_bytes`. The directory's
+    size is tracked as a running total (scanned once at startup), so only an
+    eviction lists it again.
+    """
+
+    def __init__(self, cache_dir, ttl=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total = sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        """(mtime, size, name) of every cache file."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.gz'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _path(self, endpoint, payload):
+        canonical = json.dumps([endpoint, payload], sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{key}.json.gz')
+
+    def get(self, endpoint, payload):
+        """Return the cached response dict, or None on a miss or expired entry."""
+        path = self._path(endpoint, payload)
         try:
-            error_body = e.read().decode('utf-8')
-        except Exception:
-            error_body = str(e)
-        return e.code, error_body
-    except urllib.error.URLError as e:
-        return 0, f"Network error: {e.reason}"
-    except Exception as e:
-        return 0, f"Error: {str(e)}"
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('stored', 0) > self.ttl:
+            with self.lock:
+                size = self._size(path)
+                try:
+                    os.remove(path)
+                    self.total -= size
+                except OSError:
+                    pass
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry.get('response')
+
+    def put(self, endpoint, payload, response):
+        path = self._path(endpoint, payload)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        entry = {'stored': time.time(), 'endpoint': endpoint, 'payload': payload, 'response': response}
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        with self.lock:
+            self.total += self._size(tmp_path) - self._size(path)
+            os.replace(tmp_path, path)
+            if self.total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes
+        (called with the lock held). Rescans the directory, which also picks
+        up what other processes sharing it have written."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, name in entries:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes * 0.9:
+                    break
+        self.total = total
+
+
+# None disables caching (--no-cache); replaced by configure_cache() from main
+FIRECRAWL_CACHE = None
+
+
+def configure_cache(cache_dir=None, enabled=True):
+    """Enable the Firecrawl response cache in cache_dir (default CACHE_DIR)."""
+    global FIRECRAWL_CACHE
+    FIRECRAWL_CACHE = ResponseCache(cache_dir or CACHE_DIR) if enabled else None
+
+
+# Firecrawl rejects calls it did not bill (429) and browns out under load
+# (408/5xx), so those POSTs are safe to repeat: wait what Retry-After asks,
+# else back off 2s, 4s, 8s... (jittered, max 60s), up to 6 attempts.
+FIRECRAWL_RETRY = RetryPolicy(attempts=6, backoff=2, max_backoff=60,
+                              retry_statuses=(408, 429, 500, 502, 503, 504),
+                              retry_methods={'POST'}, max_retry_after=120)
+
+
+def firecrawl_request(endpoint, payload, fc_key, retries=None):
+    """POST to a Firecrawl endpoint, each attempt once the shared rate
+    limiter allows it.
+
+    Successful responses are served from / stored in FIRECRAWL_CACHE when
+    enabled; cache hits skip the limiter and cost no credits. Rate limits and
+    brownouts are retried per FIRECRAWL_RETRY, counted in `retries` (a
+    RetryStats) when given.
+    """
+    cache = FIRECRAWL_CACHE
+    if cache is not None:
+        cached = cache.get(endpoint, payload)
+        if cached is not None:
+            return 200, cached
+    status, resp = api_request(
+        f'https://api.firecrawl.dev/v2/{endpoint}',
+        data=payload,
+        headers=firecrawl_headers(fc_key),
+        method='POST',
+        retry=FIRECRAWL_RETRY,
+        stats=retries,
+        limiter=FIRECRAWL_LIMITER,  # every attempt, retries included, takes a token
+    )
+    if cache is not None and status == 200 and isinstance(resp, dict) and resp.get('success'):
+        try:
+            cache.put(endpoint, payload, resp)
+        except OSError as e:
+            log(f"  Cache write failed: {e}")
+    return status, resp
 
 
 def firecrawl_headers(key):
     return {'Authorization': f'Bearer {key}', 'Content-Type': 'application/json'}
 
 
-def airtable_headers(key):
-    return {'Authorization': f'Bearer {key}', 'Content-Type': 'application/json'}
-
-
-# ─── Geocoding ───────────────────────────────────────────────────
-
-NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
-NOMINATIM_HEADERS = {'User-Agent': 'FWSVenueGeocoder/1.0'}
-
-
-def geocode_address(address):
-    """Geocode an address using OpenStreetMap Nominatim. Returns (lat, lon) or (None, None)."""
-    # Append France if not already present for better accuracy
-    addr = address.strip()
-    if 'france' not in addr.lower():
-        addr = f"{addr}, France"
-
-    params = urllib.parse.urlencode({'q': addr, 'format': 'json', 'limit': '1'})
-    url = f'{NOMINATIM_URL}?{params}'
-
-    status, resp = api_request(url, headers=NOMINATIM_HEADERS, method='GET')
-
-    if status == 200 and isinstance(resp, list) and len(resp) > 0:
-        lat = resp[0].get('lat')
-        lon = resp[0].get('lon')
-        if lat and lon:
-            return float(lat), float(lon)
-    return None, None
-
-
 # ─── Stage 1: Map & Scrape ──────────────────────────────────────
 
-def map_venue(venue_url, fc_key):
+def map_venue(venue_url, fc_key, retries=None):
     """Discover all pages on the venue site via Firecrawl /v2/map."""
-    status, resp = api_request(
-        'https://api.firecrawl.dev/v2/map',
-        data={'url': venue_url},
-        headers=firecrawl_headers(fc_key),
-        method='POST'
-    )
-    if status == 429:
-        log("Rate limited on map, waiting 30s...")
-        time.sleep(30)
-        status, resp = api_request(
-            'https://api.firecrawl.dev/v2/map',
-            data={'url': venue_url},
-            headers=firecrawl_headers(fc_key),
-            method='POST'
-        )
+    status, resp = firecrawl_request('map', {'url': venue_url}, fc_key, retries)
     if status != 200 or not isinstance(resp, dict) or not resp.get('success'):
         return None, status
     links = resp.get('links', [])
@@ -195,8 +329,67 @@ def map_venue(venue_url, fc_key):
     return links, status
 
 
-def filter_urls(links, venue_url):
-    """Filter discovered URLs: exclude patterns, prefer English, cap at MAX_PAGES."""
+# URL canonicalization: variants of one page share a key and cost one scrape
+TRACKING_PARAM_PREFIXES = ('utm_', 'hsa_', 'mc_', 'pk_')
+TRACKING_PARAMS = {'fbclid', 'gclid', 'gbraid', 'wbraid', 'dclid', 'msclkid',
+                   'igshid', '_ga', '_gl', 'ref', 'sid', 'sessionid', 'phpsessid'}
+LANG_PARAMS = {'lang', 'language', 'lng', 'hl', 'locale'}
+PAGINATION_PARAMS = {'page', 'paged', 'pg'}
+LANG_PREFIX_RE = re.compile(r'^/(en|fr|de|es|it|nl|pt|english|french)(?:[-_][a-z]{2})?(?=/|$)')
+INDEX_PAGE_RE = re.compile(r'/(?:index|default)\.(?:html?|php|aspx?)$')
+PAGINATION_PATH_RE = re.compile(r'/page/\d+$')
+
+
+def _is_tracking_param(name):
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonical_url(url):
+    """Return (key, lang, fetch_url) for a discovered URL.
+
+    key:       case-, scheme-, www-, fragment-, tracking-, language- and
+               pagination-insensitive identity of the page
+    lang:      language from a path prefix or lang= param ('' if none)
+    fetch_url: the URL with only the fragment and tracking params removed
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+
+    params = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(k, v) for k, v in params if not _is_tracking_param(k.lower())]
+    lang = next((v.lower()[:2] for k, v in kept if k.lower() in LANG_PARAMS), '')
+    key_params = sorted((k.lower(), v) for k, v in kept
+                        if k.lower() not in LANG_PARAMS and k.lower() not in PAGINATION_PARAMS)
+
+    path = urllib.parse.unquote(parts.path).lower()
+    prefix = LANG_PREFIX_RE.match(path)
+    if prefix:
+        lang = lang or prefix.group(1)[:2]
+        path = path[prefix.end():]
+    path = INDEX_PAGE_RE.sub('', path.rstrip('/'))
+    path = PAGINATION_PATH_RE.sub('', path).rstrip('/')
+
+    key = host + (path or '/')
+    if key_params:
+        key += '?' + urllib.parse.urlencode(key_params)
+    fetch_url = urllib.parse.urlunsplit(
+        (parts.scheme, parts.netloc, parts.path, urllib.parse.urlencode(kept), ''))
+    return key, lang, fetch_url
+
+
+def _url_preference(lang, url):
+    """Sort key among variants of one page: English, then unprefixed, then
+    other languages; https before http; shortest URL first."""
+    lang_rank = 0 if lang == 'en' else 1 if not lang else 2
+    return (lang_rank, not url.startswith('https:'), len(url))
+
+
+def filter_urls(links, venue_url, limit=MAX_PAGES):
+    """Filter discovered URLs: exclude patterns, collapse variants of the same
+    page to one canonical URL (preferring English), rank by priority keywords
+    and cap at `limit` (None = no cap)."""
     if not links:
         return [venue_url]
 
@@ -212,57 +405,32 @@ def filter_urls(links, venue_url):
     filtered = []
     for url in urls:
         url_lower = url.lower()
-        if any(pat in url_lower for pat in EXCLUDE_PATTERNS):
+        if not url_lower or any(pat in url_lower for pat in EXCLUDE_PATTERNS):
             continue
         filtered.append(url)
 
-    # Deduplicate French/English: if both /fr/ and /en/ versions exist, prefer /en/
-    en_urls = set()
-    fr_urls = set()
-    for url in filtered:
-        url_lower = url.lower()
-        if '/en/' in url_lower or '/english/' in url_lower:
-            en_urls.add(url)
-        elif '/fr/' in url_lower or '/french/' in url_lower:
-            fr_urls.add(url)
-
-    if en_urls and fr_urls:
-        # Remove French URLs that have English equivalents
-        fr_stems = {}
-        for url in fr_urls:
-            stem = re.sub(r'/fr/|/french/', '/LANG/', url.lower())
-            fr_stems[stem] = url
-        en_stems = set()
-        for url in en_urls:
-            stem = re.sub(r'/en/|/english/', '/LANG/', url.lower())
-            en_stems.add(stem)
-        duplicated_fr = [fr_stems[s] for s in fr_stems if s in en_stems]
-        filtered = [u for u in filtered if u not in duplicated_fr]
-
-    # Ensure venue_url is first
-    venue_url_normalized = venue_url.rstrip('/')
-    filtered_normalized = {u.rstrip('/'): u for u in filtered}
-    if venue_url_normalized in filtered_normalized:
-        venue_entry = filtered_normalized[venue_url_normalized]
-        filtered.remove(venue_entry)
-        filtered.insert(0, venue_entry)
-    elif venue_url not in filtered:
-        filtered.insert(0, venue_url)
-
-    # Prioritize pages with relevant keywords (move them to front, after venue_url)
+    # Collapse variants (/fr/ vs /en/, ?lang=, index.html, tracking params,
+    # /page/2, case, trailing slash) to one URL per canonical key
+    best = {}
+    for url in filtered + [venue_url]:
+        key, lang, fetch_url = canonical_url(url)
+        pref = _url_preference(lang, fetch_url)
+        if key not in best or pref < best[key][0]:
+            best[key] = (pref, fetch_url)
+    venue_key = canonical_url(venue_url)[0]
+    filtered = [fetch_url for key, (_, fetch_url) in best.items() if key != venue_key]
+
+    # Prioritize pages with relevant keywords, venue_url first
     def priority_score(url):
         url_lower = url.lower()
         return sum(1 for kw in PRIORITY_KEYWORDS if kw in url_lower)
 
-    if len(filtered) > 1:
-        first = filtered[0]
-        rest = sorted(filtered[1:], key=priority_score, reverse=True)
-        filtered = [first] + rest
+    venue_entry = best[venue_key][1] if venue_key in best else venue_url
+    filtered = [venue_entry] + sorted(filtered, key=priority_score, reverse=True)
+    return filtered if limit is None else filtered[:limit]
 
-    return filtered[:MAX_PAGES]
 
-
-def scrape_page(url, fc_key):
+def scrape_page(url, fc_key, retries=None):
     """Scrape a single page via Firecrawl /v2/scrape. Returns markdown or None."""
     payload = {
         'url': url,
@@ -271,40 +439,85 @@ def scrape_page(url, fc_key):
         'timeout': 120000,
         'waitFor': 8000,
     }
-    status, resp = api_request(
-        'https://api.firecrawl.dev/v2/scrape',
-        data=payload,
-        headers=firecrawl_headers(fc_key),
-        method='POST'
-    )
-    if status == 429:
-        log("Rate limited on scrape, waiting 30s...")
-        time.sleep(30)
-        status, resp = api_request(
-            'https://api.firecrawl.dev/v2/scrape',
-            data=payload,
-            headers=firecrawl_headers(fc_key),
-            method='POST'
-        )
-    if status in (408, 504) or status >= 500:
-        log(f"  Retrying {url} after error {status}...")
-        time.sleep(5)
-        status, resp = api_request(
-            'https://api.firecrawl.dev/v2/scrape',
-            data=payload,
-            headers=firecrawl_headers(fc_key),
-            method='POST'
-        )
+    status, resp = firecrawl_request('scrape', payload, fc_key, retries)
     if status != 200 or not isinstance(resp, dict) or not resp.get('success'):
+        if status != 200:
+            log(f"  Scrape failed for {url}: {status or resp}")
         return None
     md = resp.get('data', {}).get('markdown', '')
     return md if md and md.strip() else None
 
 
-def scrape_venue_pages(venue_url, fc_key):
-    """Full map+scrape pipeline for the venue website. Returns (combined_markdown, page_count) or (None, reason)."""
+class CrawlPlanner:
+    """Decides how far down a venue's ranked URL list is worth scraping.
+
+    The caller reports the novel cleaned chars each page added (after
+    duplicate and boilerplate removal) via record(). want_more() then stops
+    new scrapes once MAX_PAGES productive pages are kept, after
+    LOW_YIELD_PATIENCE unproductive pages in a row, or when the pages in
+    flight are projected to push the venue text past MAX_CHARS (the rest
+    would be truncated anyway).
+    """
+
+    def __init__(self, max_pages=MAX_PAGES, char_budget=MAX_CHARS,
+                 min_yield=MIN_PAGE_YIELD, patience=LOW_YIELD_PATIENCE):
+        self.max_pages = max_pages
+        self.char_budget = char_budget
+        self.min_yield = min_yield
+        self.patience = patience
+        self.pages = 0           # pages recorded
+        self.kept = 0            # pages that added any text
+        self.total_chars = 0
+        self.low_streak = 0
+        self.stop_reason = None
+
+    def record(self, novel_chars):
+        self.pages += 1
+        self.total_chars += novel_chars
+        if novel_chars:
+            self.kept += 1
+        self.low_streak = self.low_streak + 1 if novel_chars < self.min_yield else 0
+        if self.total_chars >= self.char_budget:
+            self.stop_reason = f"{self.total_chars} chars reached the {self.char_budget} budget"
+        elif self.low_streak >= self.patience:
+            self.stop_reason = f"{self.low_streak} pages in a row added < {self.min_yield} chars"
+
+    def want_more(self, in_flight):
+        """True if another page should be submitted with `in_flight` pending."""
+        if self.stop_reason or self.kept + in_flight >= self.max_pages:
+            return False
+        if self.low_streak and in_flight >= self.patience - self.low_streak:
+            return False  # a losing streak: don't run further ahead than it can last
+        if self.kept:
+            projected = self.total_chars + in_flight * self.total_chars / self.kept
+            if projected >= self.char_budget:
+                return False
+        return True
+
+
+def iter_venue_pages(venue_url, fc_key, concurrency=None, planner=None, retries=None):
+    """Map + scrape the venue website, yielding (url, markdown) for each page
+    that returned content, in filter_urls order, as soon as it is available.
+
+    Pages are scraped `concurrency` at a time (default SCRAPE_CONCURRENCY),
+    throttled by FIRECRAWL_LIMITER, so the caller can clean page N while
+    later pages are still in flight.
+
+    How far down the ranked list to go is decided by `planner`, a
+    CrawlPlanner the caller feeds with each page's novel chars; once it
+    stops, scrapes not yet started are cancelled. Without one, each yielded
+    page counts as its raw length. At most MAX_SCRAPES pages are scraped.
+    Firecrawl retries are counted in `retries` (a RetryStats) when given.
+    """
+    if concurrency is None:
+        concurrency = SCRAPE_CONCURRENCY
+    concurrency = max(1, concurrency)
+    auto_record = planner is None
+    if auto_record:
+        planner = CrawlPlanner()
+
     # Step 1: Map
-    links, map_status = map_venue(venue_url, fc_key)
+    links, map_status = map_venue(venue_url, fc_key, retries)
 
     if links is None:
         # Map failed — fall back to single-page scrape
@@ -314,109 +527,138 @@ def scrape_venue_pages(venue_url, fc_key):
     if not links:
         links = [venue_url]
 
-    # Step 2: Filter
-    filtered = filter_urls(links, venue_url)
-    log(f"  Scraping {len(filtered)} pages...")
+    # Step 2: Filter (uncapped — the planner decides how far to go)
+    ranked = filter_urls(links, venue_url, limit=None)
+    log(f"  {len(ranked)} candidate pages, keeping up to {planner.max_pages} "
+        f"({min(concurrency, len(ranked))} scraped at a time)...")
+
+    # Step 3: Scrape in priority order, handing pages back in that order and
+    # keeping at most concurrency + 1 calls ahead of the consumer
+    candidates = iter(ranked[:MAX_SCRAPES])
+    pending = deque()
+    scraped = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        try:
+            while True:
+                while len(pending) <= concurrency and planner.want_more(len(pending)):
+                    url = next(candidates, None)
+                    if url is None:
+                        break
+                    pending.append((url, pool.submit(scrape_page, url, fc_key, retries)))
+                    scraped += 1
+                if not pending or planner.stop_reason:
+                    break
+                url, future = pending.popleft()
+                md = future.result()
+                if md:
+                    yield url, md
+                    if auto_record:
+                        planner.record(len(md))
+        finally:
+            for _, future in pending:
+                if future.cancel():
+                    scraped -= 1
+
+    if planner.stop_reason and scraped < len(ranked):
+        log(f"  Stopped after {scraped} of {len(ranked)} pages: {planner.stop_reason}")
 
-    # Step 3: Scrape each page
-    parts = []
-    for i, url in enumerate(filtered):
-        md = scrape_page(url, fc_key)
-        if md:
-            parts.append(f"## Page: {url}\n\n{md.strip()}")
-        if i < len(filtered) - 1:
-            time.sleep(RATE_LIMIT_DELAY)
 
-    if not parts:
-        return None, "Empty content returned"
+# ─── Stage 2: Clean (Noise Removal) ─────────────────────────────
 
-    combined = '\n\n---\n\n'.join(parts)
-    return combined, len(parts)
+COOKIE_BANNER_KEYWORDS = [
+    'cookie', 'consent', 'gdpr', 'privacy policy', 'accepter', 'rejeter',
+    'nous respectons votre vie', 'we use cookies', 'nous utilisons des cookies',
+    'sauvegarder mes', 'personnaliser', 'always active', 'toujours actif',
+    'cookie-law-info', 'accept all', 'accepter tout', 'reject all',
+    'analytics', 'fonctionnels', 'publicit', 'performance',
+    'pas de cookies', 'no cookies to display'
+]
+COOKIE_BLOCK_MIN_HITS = 3   # A block needs this many cookie lines to be removed
+COOKIE_BLOCK_MAX_GAP = 2    # Non-cookie lines allowed between two cookie lines of one block
 
 
-# ─── Stage 2: Clean (Noise Removal) ─────────────────────────────
+def _remove_cookie_blocks(lines):
+    """Remove all contiguous cookie consent blocks from lines (any position).
 
-def _remove_cookie_blocks(lines, cookie_keywords):
-    """Remove all contiguous cookie consent blocks from lines (any position)."""
+    A block is a run of cookie-keyword lines where consecutive hits are at
+    most COOKIE_BLOCK_MAX_GAP lines apart; blocks with at least
+    COOKIE_BLOCK_MIN_HITS hits are dropped together with the blank lines
+    that follow them. Each line is tested once, then one forward pass finds
+    the blocks, so the cost is linear in the number of lines.
+    """
+    hits = bytearray(1 if COOKIE_BANNER_RE.search(line.lower()) else 0 for line in lines)
+    n = len(lines)
     result = []
     i = 0
-    while i < len(lines):
-        lower = lines[i].lower().strip()
-        if any(kw in lower for kw in cookie_keywords):
-            block_start = i
-            block_end = i
-            gap = 0
-            j = i + 1
-            while j < len(lines):
-                jlower = lines[j].lower().strip()
-                if any(kw in jlower for kw in cookie_keywords):
-                    block_end = j
-                    gap = 0
-                elif lines[j].strip() == '':
-                    gap += 1
-                    if gap > 2:
-                        break
-                else:
-                    gap += 1
-                    if gap > 2:
-                        break
-                j += 1
-            cookie_line_count = sum(
-                1 for k in range(block_start, block_end + 1)
-                if any(kw in lines[k].lower().strip() for kw in cookie_keywords)
-            )
-            if cookie_line_count >= 3:
-                i = block_end + 1
-                while i < len(lines) and lines[i].strip() == '':
-                    i += 1
-                continue
-            else:
-                result.append(lines[i])
-                i += 1
-        else:
+    while i < n:
+        if not hits[i]:
             result.append(lines[i])
             i += 1
+            continue
+        # Extend the block hit by hit while the gap stays small
+        block_end = i
+        count = 1
+        j = i + 1
+        while j < n and j - block_end <= COOKIE_BLOCK_MAX_GAP + 1:
+            if hits[j]:
+                block_end = j
+                count += 1
+            j += 1
+        if count >= COOKIE_BLOCK_MIN_HITS:
+            i = block_end + 1
+            while i < n and lines[i].strip() == '':
+                i += 1
+        else:
+            # Blocks starting at the later hits are suffixes of this one, so
+            # they are smaller still: keep the whole span
+            result.extend(lines[i:block_end + 1])
+            i = block_end + 1
     return result
 
 
+# Blocks of 5+ consecutive nav-style link lines: - [Text](url) or [Text](url)
+NAV_BLOCK_RE = re.compile(
+    r'(?:^[ \t]*[-*]?\s*\[.{1,40}\]\([^)]+\)\s*\n){5,}',
+    re.MULTILINE
+)
+
+# "Contact" header followed by phone/email/address/social within 15 lines
+FOOTER_BLOCK_RE = re.compile(
+    r'^#{1,4}\s*Contact.*?\n'
+    r'(?:.*?\n){0,15}?'
+    r'(?:©|copyright|all rights reserved|tous droits).*$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+COOKIE_TABLE_ROW_RE = re.compile(
+    r'\|[^\n]*(?:_gcl_au|_ga_|_ga|_fbp|_gid|CookieLawInfo|cookielawinfo|PHPSESSID)[^\n]*\|',
+    re.IGNORECASE
+)
+TABLE_SEPARATOR_RE = re.compile(r'^[\s|:-]+$')
+
+
 def _remove_nav_menu_blocks(text):
     """Remove repeated nav menu blocks (lists of short links appearing on every page)."""
-    # Match blocks of 5+ consecutive nav-style link lines: - [Text](url) or [Text](url)
-    nav_block_re = re.compile(
-        r'(?:^[ \t]*[-*]?\s*\[.{1,40}\]\([^)]+\)\s*\n){5,}',
-        re.MULTILINE
-    )
-    return nav_block_re.sub('\n', text)
+    return NAV_BLOCK_RE.sub('\n', text)
 
 
 def _remove_footer_boilerplate(text):
     """Remove footer blocks: Contact us + phone + email + address + Follow us + copyright."""
-    # Match "Contact" header followed by phone/email/address/social within 15 lines
-    footer_re = re.compile(
-        r'^#{1,4}\s*Contact.*?\n'
-        r'(?:.*?\n){0,15}?'
-        r'(?:©|copyright|all rights reserved|tous droits).*$',
-        re.MULTILINE | re.IGNORECASE
-    )
-    return footer_re.sub('', text)
+    return FOOTER_BLOCK_RE.sub('', text)
 
 
 def _remove_cookie_detail_tables(text):
     """Remove cookie detail tables with cookie names, durations, tracker descriptions."""
-    cookie_table_re = re.compile(
-        r'\|[^\n]*(?:_gcl_au|_ga_|_ga|_fbp|_gid|CookieLawInfo|cookielawinfo|PHPSESSID)[^\n]*\|',
-        re.IGNORECASE
-    )
     lines = text.split('\n')
     # If we find a cookie detail table, remove the entire table (header + separator + rows)
     result = []
     in_cookie_table = False
     for line in lines:
-        if cookie_table_re.search(line):
+        if COOKIE_TABLE_ROW_RE.search(line):
             in_cookie_table = True
             continue
         if in_cookie_table:
-            if line.strip().startswith('|') or line.strip() == '' or re.match(r'^[\s|:-]+$', line.strip()):
+            if line.strip().startswith('|') or line.strip() == '' or TABLE_SEPARATOR_RE.match(line.strip()):
                 continue
             else:
                 in_cookie_table = False
@@ -434,155 +676,353 @@ def clean_markdown(text):
 
     lines = text.split('\n')
 
-    # --- Cookie consent banners (multi-pass, any position) ---
-    cookie_keywords = [
-        'cookie', 'consent', 'gdpr', 'privacy policy', 'accepter', 'rejeter',
-        'nous respectons votre vie', 'we use cookies', 'nous utilisons des cookies',
-        'sauvegarder mes', 'personnaliser', 'always active', 'toujours actif',
-        'cookie-law-info', 'accept all', 'accepter tout', 'reject all',
-        'analytics', 'fonctionnels', 'publicit', 'performance',
-        'pas de cookies', 'no cookies to display'
-    ]
-
-    lines = _remove_cookie_blocks(lines, cookie_keywords)
-
-    # --- Booking engine widgets ---
-    booking_keywords = [
-        'arrival', 'departure', 'check-in', 'check-out', 'checkin', 'checkout',
-        'number of adults', 'number of guests', 'select date', 'book now',
-        'book your stay', 'availability', 'réserver', 'arrivée', 'départ',
-        "nombre d'adultes", 'rechercher', 'vérifier la disponibilité',
-        'check availability', 'select room', 'adults', 'children',
-        'promo code', 'discount code', 'best rate'
-    ]
+    # --- Cookie consent banners (any position) ---
+    lines = _remove_cookie_blocks(lines)
 
+    # --- Per-line noise (nav, widgets, forms, footers, …) — see classify_line ---
     cleaned_lines = []
     for line in lines:
         stripped = line.strip()
-        lower = stripped.lower()
-
-        # Skip empty lines (kept, but don't apply filters)
-        if not stripped:
-            cleaned_lines.append(line)
+        # Empty lines are kept; the blank-line collapse below tidies them
+        if stripped and classify_line(stripped) is not None:
             continue
+        cleaned_lines.append(line)
 
-        # Navigation noise: sequences of short links
-        if re.match(r'^(\[.{1,20}\]\([^)]+\)\s*\|\s*){2,}', stripped):
-            continue
+    result = '\n'.join(cleaned_lines)
+    result = re.sub(r'\n{3,}', '\n\n', result)
+    return result.strip()
 
-        # "Skip to content" links
-        if re.match(r'^\[?(go to |skip to |aller au |passer au )?(main )?content\]?', lower):
-            continue
 
-        # Short UI/navigation text (exact match)
-        if lower in UI_NOISE_WORDS:
-            continue
+# Cross-page boilerplate: blocks repeated across a venue's pages (menus,
+# footers, CTAs the regex rules don't know about). This is first-copy
+# dedup: a block already seen on any earlier page is dropped, so a menu on
+# every page is kept once and nothing is lost outright.
+SHINGLE_LINES = 3           # Consecutive non-empty lines hashed together as one shingle
+SHINGLE_SOLO_CHARS = 80     # Lines at least this long are also hashed on their own
+
+LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+LINE_MARKER_RE = re.compile(r'^[-*+>#\s]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize_shingle_line(line):
+    """Lowercase, drop link targets and list/heading markers, collapse whitespace."""
+    line = LINK_TARGET_RE.sub(']', line.lower())
+    line = LINE_MARKER_RE.sub('', line)
+    return WHITESPACE_RE.sub(' ', line).strip()
+
+
+def _shingle_hash(text):
+    """64-bit hash of a shingle (ints keep the per-venue table small)."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class BoilerplateFilter:
+    """Drops blocks that repeat across the pages of one venue, keeping the
+    first copy (first-copy dedup, not a page-count threshold).
+
+    Every run of SHINGLE_LINES consecutive non-empty lines (normalized) and
+    every long line is hashed into a set of 64-bit ints. The lines a shingle
+    covers are removed from a page if an earlier page already had that
+    shingle. Pages are processed in order, so the first copy of any block is
+    kept.
+    """
+
+    def __init__(self, shingle_lines=SHINGLE_LINES):
+        self.shingle_lines = shingle_lines
+        self.seen = set()          # shingle hashes of the pages filtered so far
+        self.removed_chars = 0
+
+    def filter(self, text):
+        """Return text without the blocks already seen on earlier pages."""
+        lines = text.split('\n')
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        norm = [_normalize_shingle_line(lines[i]) for i in content]
+
+        spans = {}  # shingle hash -> [(first, last + 1) positions in `content`]
+        k = self.shingle_lines
+        for pos in range(len(norm) - k + 1):
+            spans.setdefault(_shingle_hash('\n'.join(norm[pos:pos + k])), []).append((pos, pos + k))
+        for pos, line in enumerate(norm):
+            if len(line) >= SHINGLE_SOLO_CHARS:
+                spans.setdefault(_shingle_hash(line), []).append((pos, pos + 1))
+
+        drop = set()
+        for key, key_spans in spans.items():
+            if key in self.seen:
+                for first, end in key_spans:
+                    drop.update(content[first:end])
+        self.seen.update(spans)
+
+        if not drop:
+            return text
+        self.removed_chars += sum(len(lines[i]) for i in drop)
+        kept = '\n'.join(line for i, line in enumerate(lines) if i not in drop)
+        return re.sub(r'\n{3,}', '\n\n', kept).strip()
+
+
+# Near-duplicate pages: 64-bit SimHash over word 3-grams
+SIMHASH_MAX_DISTANCE = 3    # Pages whose fingerprints differ in <= this many bits are near-duplicates
+WORD_RE = re.compile(r'\w+')
+
+
+def simhash(text):
+    """64-bit SimHash of text over its distinct word 3-grams."""
+    words = WORD_RE.findall(text.lower())
+    features = {_shingle_hash(' '.join(words[i:i + 3])) for i in range(max(1, len(words) - 2))}
+    half = len(features) / 2
+    fingerprint = 0
+    for bit in range(64):
+        mask = 1 << bit
+        if sum(1 for h in features if h & mask) > half:
+            fingerprint |= mask
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class PageCleaner:
+    """Cleans a venue's pages one at a time as they are scraped.
+
+    Each page is cleaned on its own, so only the cleaned output accumulates
+    and a raw page can be dropped as soon as add() returns. Pages whose
+    cleaned body repeats an earlier page exactly, or whose SimHash is within
+    SIMHASH_MAX_DISTANCE bits of a kept page (same text, different banner or
+    date), are skipped, and blocks repeated from earlier pages are removed
+    by a BoilerplateFilter.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.page_count = 0      # pages received (with content)
+        self.duplicates = 0      # pages skipped as exact or near repeats
+        self._seen = set()       # digests of cleaned page bodies
+        self._fingerprints = []  # SimHash of each kept page
+        self.boilerplate = BoilerplateFilter()
+
+    def add(self, url, markdown):
+        """Clean one page and append it. Returns the length of its cleaned
+        body (0 if it added nothing), not counting the page header."""
+        self.page_count += 1
+        body = clean_markdown(markdown)
+        if not body:
+            return 0
+        digest = hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest()
+        if digest in self._seen:
+            self.duplicates += 1
+            return 0
+        self._seen.add(digest)
+        fingerprint = simhash(body)
+        if any(hamming_distance(fingerprint, fp) <= SIMHASH_MAX_DISTANCE for fp in self._fingerprints):
+            self.duplicates += 1
+            return 0
+        self._fingerprints.append(fingerprint)
+        body = self.boilerplate.filter(body)
+        if not body:
+            return 0
+        self.parts.append(f"## Page: {url}\n\n{body}")
+        return len(body)
+
+    def text(self):
+        return '\n\n---\n\n'.join(self.parts)
+
+
+# ─── Stage 2b: Line Classifier ──────────────────────────────────
+#
+# Every per-line noise rule lives in the tables below and is compiled once at
+# import into a handful of matchers, so classify_line() does a dict lookup,
+# two anchored regex matches and one keyword scan instead of ~30 separate
+# checks. A line is dropped if ANY rule matches, so rule order only decides
+# which category gets reported.
+
+BOOKING_KEYWORDS = [
+    'arrival', 'departure', 'check-in', 'check-out', 'checkin', 'checkout',
+    'number of adults', 'number of guests', 'select date', 'book now',
+    'book your stay', 'availability', 'réserver', 'arrivée', 'départ',
+    "nombre d'adultes", 'rechercher', 'vérifier la disponibilité',
+    'check availability', 'select room', 'adults', 'children',
+    'promo code', 'discount code', 'best rate'
+]
 
-        # Bare language-switcher links: [en](...) [fr](...) etc.
-        if re.match(r'^\[?(en|fr|es|de|it|nl|pt)\]?\s*(\(.*?\))?\s*$', stripped, re.IGNORECASE):
-            continue
+FOOTER_PHRASES = [
+    'all rights reserved', 'tous droits', '© ', 'copyright',
+    'follow us on', 'suivez-nous'
+]
 
-        # Booking widget controls (short lines only)
-        if any(kw in lower for kw in booking_keywords) and len(stripped) < 120:
-            continue
+AGENCY_CREDIT_PHRASES = [
+    'création site internet', 'création site web', 'web design by',
+    'designed by', 'powered by', 'website by', 'site réalisé par',
+    'agence web', 'made with love'
+]
 
-        # Contact form fields and labels (short lines only)
-        if any(kw in lower for kw in FORM_FIELD_KEYWORDS) and len(stripped) < 80:
-            continue
+# Long single-line cookie notices: need 'cookie' plus one of these, and > 80 chars
+COOKIE_NOTICE_PHRASES = [
+    'function properly', 'we use cookies', 'consent',
+    'nous utilisons', 'fonctionner correctement'
+]
 
-        # Form dropdown options (month names, guest ranges)
-        if FORM_DROPDOWN_RE.match(stripped):
-            continue
+# (category, keywords, max_len) — substring match on the lowercased line,
+# only counted when len(stripped) < max_len (None = any length)
+LINE_KEYWORD_RULES = [
+    ('booking_widget', BOOKING_KEYWORDS, 120),
+    ('form_field', FORM_FIELD_KEYWORDS, 80),
+    ('recaptcha', ['recaptcha'], 200),
+    ('map_attribution', ['geobasis', 'map data ©'], None),
+    ('footer', FOOTER_PHRASES, 200),
+    ('agency_credit', AGENCY_CREDIT_PHRASES, 150),
+    ('cookie_notice', ['cookie'], None),
+    ('cookie_notice_phrase', COOKIE_NOTICE_PHRASES, None),
+]
 
-        # SVG data URI images (lazy-load placeholders)
-        if 'data:image/svg+xml' in stripped:
-            continue
+# Whole-line exact matches (lowercased)
+EXACT_NOISE_LINES = {
+    'ui_noise': UI_NOISE_WORDS,
+    'consent_ui': {'gérer le consentement', 'gérer le consentement aux cookies', 'manage consent'},
+    'placeholder': {
+        'sorry, we have no imagery here.', 'sorry, we have no imagery here',
+        'no imagery available', 'no image available',
+    },
+    'map_widget': {
+        'move left', 'move right', 'move up', 'move down',
+        'zoom in', 'zoom out', 'jump left by 75%', 'jump right by 75%',
+        'jump up by 75%', 'jump down by 75%', 'keyboard shortcuts',
+    },
+    'directory_cta': {
+        'enquire today', 'handpicked for you', 'no added commission',
+        'enquire now', 'send enquiry', 'request a quote',
+        'similar venues', 'you may also like', 'related venues',
+        'other venues nearby', 'more venues in this region',
+    },
+}
 
-        # Image-only lines (including list-item images)
-        if re.match(r'^[-*]?\s*!\[.*?\]\(.*?\)$', stripped) and not re.search(r'[a-zA-Z]{5,}', stripped.split('](')[0]):
-            continue
+# Anchored patterns matched against the stripped line (original case)
+STRIPPED_LINE_PATTERNS = [
+    ('nav_links', r'(\[.{1,20}\]\([^)]+\)\s*\|\s*){2,}'),
+    ('language_switcher', r'(?i:\[?(en|fr|es|de|it|nl|pt)\]?\s*(\(.*?\))?\s*$)'),
+    ('form_dropdown', f'(?i:{FORM_DROPDOWN_RE.pattern})'),
+    ('hex_token', r'[0-9a-f]{16,}$'),
+    ('recaptcha', r'(?i:\[privacy\].*\[terms\])'),
+    ('map_widget', r'`[←→↑↓\+\-]`$'),
+    ('social_links', r'(?i:(\[?(facebook|twitter|instagram|linkedin|youtube|pinterest|tiktok)\]?\s*[\|/,]\s*){2,})'),
+    # Must stay last: a match still needs the caption check in classify_line
+    ('image_only', r'[-*]?\s*!\[.*?\]\(.*?\)$'),
+]
 
-        # Random hex hash strings (form tokens)
-        if re.match(r'^[0-9a-f]{16,}$', stripped):
-            continue
+# Anchored patterns matched against the lowercased line
+LOWER_LINE_PATTERNS = [
+    ('skip_link', r'\[?(go to |skip to |aller au |passer au )?(main )?content\]?'),
+    ('consent_ui', r'\[?(manage|gérer)\s+(options|services|consent|cookies|vendors)'),
+    ('map_attribution', r'map\s*data'),
+    ('related_venue', r'.{5,60}\s*[-–|]\s*(south of france|provence|languedoc|dordogne|loire|normandy|brittany|bordeaux|champagne|burgundy)'),
+]
 
-        # reCAPTCHA and Google privacy/terms boilerplate
-        if 'recaptcha' in lower and len(stripped) < 200:
-            continue
-        if re.match(r'^\[privacy\].*\[terms\]', stripped, re.IGNORECASE):
-            continue
+IMAGE_CAPTION_WORD_RE = re.compile(r'[a-zA-Z]{5,}')
+INSTAGRAM_COUNT_RE = re.compile(r'^\[?\d{1,4}\]?\s*$')
+
+
+def _trie_pattern(words):
+    """Regex source matching any of `words`, factored into a prefix trie.
+
+    CPython's re tries alternation branches one by one, so a flat
+    'a|b|c|…' of 100 keywords is slower than `any(kw in s …)`; sharing
+    prefixes lets each position be rejected after one or two branches.
+    Longer words are preferred at each branch point.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if '' in node else body
+
+    return build(trie)
+
+
+def _compile_anchored(patterns):
+    return re.compile('|'.join(f'(?P<{name}_{i}>{pat})' for i, (name, pat) in enumerate(patterns)))
+
+
+def _compile_line_classifier():
+    exact = {}
+    for category, phrases in EXACT_NOISE_LINES.items():
+        for phrase in phrases:
+            exact.setdefault(phrase, category)
+
+    # Each keyword maps to every rule it satisfies — including the rules of
+    # keywords that are substrings of it, because the scan below reports only
+    # the longest keyword starting at each position.
+    rule_of = {}
+    for index, (_, keywords, _) in enumerate(LINE_KEYWORD_RULES):
+        for kw in keywords:
+            rule_of.setdefault(kw, set()).add(index)
+    keyword_rules = {
+        kw: frozenset().union(*(rules for other, rules in rule_of.items() if other in kw))
+        for kw in rule_of
+    }
+    scan = re.compile(f'(?=({_trie_pattern(rule_of)}))')
+    return exact, _compile_anchored(STRIPPED_LINE_PATTERNS), _compile_anchored(LOWER_LINE_PATTERNS), scan, keyword_rules
 
-        # Cookie consent UI remnants
-        if re.match(r'^\[?(manage|gérer)\s+(options|services|consent|cookies|vendors)', lower):
-            continue
-        if lower in ('gérer le consentement', 'gérer le consentement aux cookies', 'manage consent'):
-            continue
 
-        # Long cookie notice paragraphs (single-line blocks that slip past multi-pass)
-        if 'cookie' in lower and len(stripped) > 80 and any(
-            p in lower for p in ['function properly', 'we use cookies', 'consent',
-                                  'nous utilisons', 'fonctionner correctement']
-        ):
-            continue
+(_EXACT_NOISE, _STRIPPED_NOISE_RE, _LOWER_NOISE_RE,
+ _KEYWORD_SCAN_RE, _KEYWORD_RULES) = _compile_line_classifier()
+COOKIE_BANNER_RE = re.compile(_trie_pattern(COOKIE_BANNER_KEYWORDS))
+_COOKIE_NOTICE_PHRASE = next(i for i, rule in enumerate(LINE_KEYWORD_RULES) if rule[0] == 'cookie_notice_phrase')
 
-        # Placeholder / empty gallery text
-        if lower in ('sorry, we have no imagery here.', 'sorry, we have no imagery here',
-                      'no imagery available', 'no image available'):
-            continue
 
-        # Keyboard shortcut tables (map widgets)
-        if re.match(r'^`[←→↑↓\+\-]`$', stripped) or lower in (
-            'move left', 'move right', 'move up', 'move down',
-            'zoom in', 'zoom out', 'jump left by 75%', 'jump right by 75%',
-            'jump up by 75%', 'jump down by 75%', 'keyboard shortcuts',
-        ):
-            continue
+def _category(match):
+    return match.lastgroup.rsplit('_', 1)[0]
 
-        # Map data attribution strings
-        if re.match(r'^map\s*data', lower) or 'geobasis' in lower or 'map data ©' in lower:
-            continue
 
-        # Footer boilerplate (short lines only)
-        if any(p in lower for p in [
-            'all rights reserved', 'tous droits', '© ', 'copyright',
-            'follow us on', 'suivez-nous'
-        ]) and len(stripped) < 200:
-            continue
+def classify_line(stripped):
+    """Return the noise category of a non-empty stripped line, or None to keep it."""
+    lower = stripped.lower()
 
-        # Social media link lists
-        if re.match(r'^(\[?(facebook|twitter|instagram|linkedin|youtube|pinterest|tiktok)\]?\s*[\|/,]\s*){2,}', stripped, re.IGNORECASE):
-            continue
+    category = _EXACT_NOISE.get(lower)
+    if category:
+        return category
 
-        # Directory-site boilerplate CTAs
-        if lower in (
-            'enquire today', 'handpicked for you', 'no added commission',
-            'enquire now', 'send enquiry', 'request a quote',
-            'similar venues', 'you may also like', 'related venues',
-            'other venues nearby', 'more venues in this region',
-        ):
-            continue
+    if 'data:image/svg+xml' in stripped:
+        return 'svg_placeholder'
 
-        # Related venue listing blocks (venue name + region + guest count from listing sites)
-        if re.match(r'^.{5,60}\s*[-–|]\s*(south of france|provence|languedoc|dordogne|loire|normandy|brittany|bordeaux|champagne|burgundy)', lower):
-            continue
+    m = _STRIPPED_NOISE_RE.match(stripped)
+    if m:
+        category = _category(m)
+        # Image-only lines are noise unless the alt text reads like a caption
+        if category != 'image_only' or not IMAGE_CAPTION_WORD_RE.search(stripped.split('](')[0]):
+            return category
 
-        # Instagram link numbers (bare numbers linking to instagram)
-        if re.match(r'^\[?\d{1,4}\]?\s*$', stripped) and 'instagram' in line.lower():
-            continue
+    m = _LOWER_NOISE_RE.match(lower)
+    if m:
+        return _category(m)
 
-        # Agency credits / website creation
-        if any(p in lower for p in [
-            'création site internet', 'création site web', 'web design by',
-            'designed by', 'powered by', 'website by', 'site réalisé par',
-            'agence web', 'made with love'
-        ]) and len(stripped) < 150:
-            continue
+    hits = set()
+    for m in _KEYWORD_SCAN_RE.finditer(lower):
+        hits |= _KEYWORD_RULES[m.group(1)]
+    length = len(stripped)
+    for index in sorted(hits):
+        category, _, max_len = LINE_KEYWORD_RULES[index]
+        if category == 'cookie_notice':
+            if _COOKIE_NOTICE_PHRASE in hits and length > 80:
+                return category
+        elif category != 'cookie_notice_phrase' and (max_len is None or length < max_len):
+            return category
 
-        cleaned_lines.append(line)
+    # Bare numbers linking to Instagram
+    if 'instagram' in lower and INSTAGRAM_COUNT_RE.match(stripped):
+        return 'instagram_count'
 
-    result = '\n'.join(cleaned_lines)
-    result = re.sub(r'\n{3,}', '\n\n', result)
-    return result.strip()
+    return None
 
 
 # ─── Stage 3: Categorize (No-Deletion Policy) ───────────────────
@@ -722,28 +1162,361 @@ def truncate_content(text):
 
 # ─── Airtable Helpers ───────────────────────────────────────────
 
+_AIRTABLE_QUEUES = {}
+_AIRTABLE_QUEUES_LOCK = threading.Lock()
+
+
+def airtable_queue(at_key, base_id):
+    """The process-wide write queue for base_id's Venues table: updates from
+    every record (and --batch worker) go out 10 per PATCH, under 5 req/s,
+    and are written through to the local Venues mirror once accepted."""
+    with _AIRTABLE_QUEUES_LOCK:
+        queue = _AIRTABLE_QUEUES.get((at_key, base_id))
+        if queue is None:
+            mirror = AirtableMirror(at_key, base_id, 'Venues')
+            queue = _AIRTABLE_QUEUES[(at_key, base_id)] = AirtableWriteQueue(
+                at_key, base_id, 'Venues', on_written=mirror.apply_update)
+        return queue
+
+
 def write_manual_check(record_id, reason, at_key, base_id):
-    """Write MANUAL_CHECK marker to Airtable."""
+    """Write a MANUAL_CHECK marker to Airtable and wait for it. Returns the
+    MANUAL_CHECK status line, or AIRTABLE_ERROR if the marker wasn't written."""
     timestamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
     marker = f"MANUAL_CHECK -- {reason} -- {timestamp}"
-    url = f'https://api.airtable.com/v0/{base_id}/Venues/{record_id}'
-    api_request(url, data={'fields': {'venue_url_scraped': marker}},
-                headers=airtable_headers(at_key), method='PATCH')
-    print(f"MANUAL_CHECK|{reason}|0")
+    if not airtable_queue(at_key, base_id).update(record_id, {'venue_url_scraped': marker}).wait():
+        return f"AIRTABLE_ERROR|MANUAL_CHECK marker not written ({reason})|0"
+    return f"MANUAL_CHECK|{reason}|0"
+
+
+_PAYLOAD_LOCK = threading.Lock()
 
 
 def write_to_airtable(record_id, content, at_key, base_id):
     """PATCH venue_url_scraped to Airtable. Returns True on success."""
     payload = {'fields': {'venue_url_scraped': content}}
 
-    # Also write payload to file for debugging
+    # Also write payload to file for debugging (locked: --batch writes from several threads)
     os.makedirs(WORKING_DIR, exist_ok=True)
-    with open(PAYLOAD_PATH, 'w', encoding='utf-8') as f:
+    with _PAYLOAD_LOCK, open(PAYLOAD_PATH, 'w', encoding='utf-8') as f:
         json.dump(payload, f, ensure_ascii=False)
 
-    url = f'https://api.airtable.com/v0/{base_id}/Venues/{record_id}'
-    status, _ = api_request(url, data=payload, headers=airtable_headers(at_key), method='PATCH')
-    return status == 200
+    return airtable_queue(at_key, base_id).update(record_id, payload['fields']).wait()
+
+
+# ─── Raw Scrape Archive & Replay ────────────────────────────────
+
+def archive_path(record_id, archive_dir=None):
+    return os.path.join(archive_dir or RAW_ARCHIVE_DIR, f'{record_id}.jsonl.gz')
+
+
+class RawArchive:
+    """Streams one record's uncleaned Firecrawl markdown to disk so cleaning
+    can be replayed offline.
+
+    The archive is gzipped JSON lines: a header ({record_id, venue_url,
+    scraped}), then {page, markdown} / {listing, markdown} entries as they
+    arrive, then {cleaned_chars} (the cleaned venue size at scrape time, the
+    replay baseline). It is written to a temp file and only moved into place
+    by close() if at least one page was stored, so a failed re-scrape never
+    replaces a good archive.
+    """
+
+    def __init__(self, record_id, venue_url, archive_dir=None):
+        self.path = archive_path(record_id, archive_dir)
+        self.tmp_path = f'{self.path}.tmp'
+        self.pages = 0
+        self.file = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+        except OSError as e:
+            log(f"  Raw archive unavailable: {e}")
+        self._write({
+            'record_id': record_id,
+            'venue_url': venue_url,
+            'scraped': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        })
+
+    def _write(self, entry):
+        if self.file is None:
+            return
+        try:
+            self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            log(f"  Raw archive write failed: {e}")
+            self.file.close()
+            self.file = None
+
+    def add_page(self, url, markdown):
+        self.pages += 1
+        self._write({'page': url, 'markdown': markdown})
+
+    def add_listing(self, short, markdown):
+        self._write({'listing': short, 'markdown': markdown})
+
+    def set_cleaned_chars(self, chars):
+        self._write({'cleaned_chars': chars})
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if self.pages:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+
+def read_archive(path):
+    """Yield the entries of a raw archive one line at a time."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_venue_document(cleaned_venue, listing_results):
+    """Categorize the venue content, append listing sections, truncate. Returns (final, was_truncated)."""
+    categorized_venue = categorize_content(cleaned_venue)
+
+    label_map = {'CB': '**ChateauBee**', 'WI': '**WedInspire**', 'FWV': '**French Wedding Venues**'}
+    parts = [f"**Venue Website**\n\n{categorized_venue}"]
+
+    for short in ['CB', 'WI', 'FWV']:
+        if short in listing_results:
+            label = label_map[short]
+            parts.append(f"{label}\n\n{listing_results[short]}")
+
+    combined = '\n\n---\n\n'.join(parts)
+    return truncate_content(combined)
+
+
+def replay_archive_entry(path):
+    """Re-run clean → categorize → truncate on one archived record (no network).
+
+    Writes the result to working/replay/<record_id>.md and returns
+    REPLAYED|<record_id>|<raw_chars>|<before_chars>|<after_chars>|<final_chars>.
+    """
+    record_id = None
+    before = None
+    raw_chars = 0
+    cleaner = PageCleaner()
+    listing_results = {}
+    for entry in read_archive(path):
+        if 'record_id' in entry:
+            record_id = entry['record_id']
+        elif 'page' in entry:
+            raw_chars += len(entry['markdown'])
+            cleaner.add(entry['page'], entry['markdown'])
+        elif 'listing' in entry:
+            cleaned = clean_markdown(entry['markdown'])
+            if cleaned.strip() and len(cleaned.strip()) >= MIN_LISTING_CHARS:
+                listing_results[entry['listing']] = cleaned
+        elif 'cleaned_chars' in entry:
+            before = entry['cleaned_chars']
+
+    cleaned_venue = cleaner.text()
+    final, was_truncated = build_venue_document(cleaned_venue, listing_results)
+
+    out_dir = os.path.join(WORKING_DIR, 'replay')
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f'{record_id}.md'), 'w', encoding='utf-8') as f:
+        f.write(final)
+
+    trunc_note = " Truncated" if was_truncated else ""
+    return (f"REPLAYED|{record_id}|{raw_chars}|{before if before is not None else '?'}"
+            f"|{len(cleaned_venue.strip())}|{len(final)}{trunc_note}")
+
+
+def run_replay(archive_dir=None, workers=None):
+    """Replay every archived record across a process pool (one per core by default)."""
+    archive_dir = archive_dir or RAW_ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        print(f"ERROR|Archive not found: {archive_dir}|0")
+        sys.exit(1)
+    paths = sorted(os.path.join(archive_dir, name) for name in os.listdir(archive_dir)
+                   if name.endswith('.jsonl.gz'))
+    log(f"Replaying {len(paths)} archived records...")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(replay_archive_entry, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                print(future.result(), flush=True)
+            except Exception as e:
+                name = os.path.basename(futures[future])
+                print(f"REPLAY_ERROR|{name}|{type(e).__name__}: {e}", flush=True)
+
+
+# ─── Pipeline ───────────────────────────────────────────────────
+
+def process_record(record_id, venue_url, listing_urls, fc_key, at_key, base_id, scrape_only=False):
+    """Run the scrape → clean → categorize → write pipeline for one record.
+
+    listing_urls maps 'CB'/'WI'/'FWV' to a URL (or ''). Returns the
+    single-line status string (SUCCESS|…, SCRAPED|…, MANUAL_CHECK|…, …).
+    Raw scrapes are archived for --replay along the way, and the Firecrawl
+    retries made for the record are logged.
+    """
+    archive = RawArchive(record_id, venue_url)
+    retries = RetryStats()
+    try:
+        return _process_record(record_id, venue_url, listing_urls, fc_key, at_key, base_id,
+                               scrape_only, archive, retries)
+    finally:
+        archive.close()
+        if retries.total:
+            log(f"  Firecrawl retries for {record_id}: {retries.summary()}")
+
+
+def _process_record(record_id, venue_url, listing_urls, fc_key, at_key, base_id, scrape_only,
+                    archive, retries):
+    mode_label = "Scraping" if scrape_only else "Processing"
+    log(f"{mode_label} {venue_url} ...")
+
+    # ── Part 1: Venue Website (mandatory, multi-page) ──
+    # Each page is archived and cleaned as soon as it arrives.
+
+    cleaner = PageCleaner()
+    planner = CrawlPlanner()
+    for url, md in iter_venue_pages(venue_url, fc_key, planner=planner, retries=retries):
+        archive.add_page(url, md)
+        planner.record(cleaner.add(url, md))
+
+    if not cleaner.page_count:
+        return write_manual_check(record_id, "Empty content returned", at_key, base_id)
+
+    venue_pages = cleaner.page_count
+    if cleaner.duplicates:
+        log(f"  Skipped {cleaner.duplicates} duplicate or near-duplicate page(s)")
+    if cleaner.boilerplate.removed_chars:
+        log(f"  Removed {cleaner.boilerplate.removed_chars} chars of repeated boilerplate")
+    cleaned_venue = cleaner.text()
+    archive.set_cleaned_chars(len(cleaned_venue.strip()))
+
+    if not cleaned_venue.strip():
+        return write_manual_check(record_id, "Empty content after cleaning", at_key, base_id)
+
+    venue_char_count = len(cleaned_venue.strip())
+    venue_word_count = len(cleaned_venue.split())
+    if venue_char_count < MIN_CONTENT_CHARS or venue_word_count < MIN_CONTENT_WORDS:
+        return write_manual_check(
+            record_id,
+            f"Low quality content ({venue_char_count} chars, {venue_word_count} words)",
+            at_key, base_id
+        )
+
+    # ── Part 2: Listing Sites (optional, single-page) ──
+
+    listing_results = {}
+    sources = ['Venue']
+    listing_count = 0
+
+    for short, url in listing_urls.items():
+        if not url.strip():
+            continue
+
+        log(f"  Scraping listing: {short} ({url})")
+        md = scrape_page(url, fc_key, retries)
+
+        if md:
+            archive.add_listing(short, md)
+            cleaned = clean_markdown(md)
+            if cleaned.strip() and len(cleaned.strip()) >= MIN_LISTING_CHARS:
+                listing_results[short] = cleaned
+                sources.append(short)
+                listing_count += 1
+                log(f"  {short}: OK ({len(cleaned)} chars)")
+            else:
+                log(f"  {short}: empty or too short after cleaning, skipping")
+        else:
+            log(f"  {short}: scrape failed, skipping")
+
+    # ── Part 3: Output ──
+
+    if scrape_only:
+        # Save raw cleaned content to temp files for Claude to structure
+        os.makedirs(WORKING_DIR, exist_ok=True)
+
+        raw_path = os.path.join(WORKING_DIR, f'raw_{record_id}.md')
+        with open(raw_path, 'w', encoding='utf-8') as f:
+            f.write(cleaned_venue)
+
+        for short in ['CB', 'WI', 'FWV']:
+            if short in listing_results:
+                listing_path = os.path.join(WORKING_DIR, f'listing_{record_id}_{short}.md')
+                with open(listing_path, 'w', encoding='utf-8') as f:
+                    f.write(listing_results[short])
+
+        sources_csv = ','.join(sources)
+        listing_chars = sum(len(v) for v in listing_results.values())
+        return f"SCRAPED|{venue_char_count}|{venue_pages}+{listing_count}|{sources_csv}|{listing_chars}"
+
+    # Full pipeline mode: categorize + combine + write to Airtable
+    final, was_truncated = build_venue_document(cleaned_venue, listing_results)
+
+    # Write to Airtable
+    success = write_to_airtable(record_id, final, at_key, base_id)
+
+    if success:
+        char_count = len(final)
+        trunc_note = " Truncated" if was_truncated else ""
+        sources_csv = ','.join(sources)
+        return f"SUCCESS|{char_count}|{venue_pages}+{listing_count}|{sources_csv}{trunc_note}"
+    return "AIRTABLE_ERROR|PATCH failed|0"
+
+
+def load_manifest(path):
+    """Read a --batch manifest: one JSON object per line with record_id + venue_url
+    and optional chateaubee_url / wedinspire_url / fwv_url."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError as e:
+                log(f"  Manifest line {line_no}: invalid JSON ({e}), skipping")
+                continue
+            if not rec.get('record_id'):
+                log(f"  Manifest line {line_no}: missing record_id, skipping")
+                continue
+            records.append(rec)
+    return records
+
+
+def run_batch(manifest_path, fc_key, at_key, base_id, scrape_only=False, workers=None):
+    """Process every manifest record across a shared worker pool.
+
+    All workers share FIRECRAWL_LIMITER, so the per-minute quota holds for
+    the whole run. Prints one `<record_id>|<status line>` per record as each
+    finishes (completion order, not manifest order).
+    """
+    records = load_manifest(manifest_path)
+    workers = max(1, workers or BATCH_WORKERS)
+    log(f"Batch: {len(records)} records, {workers} workers")
+    out_lock = threading.Lock()
+
+    def run_one(rec):
+        record_id = rec['record_id']
+        venue_url = (rec.get('venue_url') or '').strip()
+        if not venue_url:
+            return record_id, "SKIPPED|no venue_url"
+        listing_urls = {short: (rec.get(field) or '') for short, field in LISTING_FIELDS.items()}
+        try:
+            line = process_record(record_id, venue_url, listing_urls, fc_key, at_key, base_id, scrape_only)
+        except Exception as e:
+            line = f"ERROR|{type(e).__name__}: {e}"
+        return record_id, line
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(run_one, rec) for rec in records]):
+            record_id, line = future.result()
+            with out_lock:
+                print(f"{record_id}|{line}", flush=True)
 
 
 # ─── Logging ────────────────────────────────────────────────────
@@ -755,11 +1528,47 @@ def log(msg):
 
 # ─── Main ───────────────────────────────────────────────────────
 
+def pop_option(argv, flag, cast=str):
+    """Remove `flag <value>` from argv (in place) and return the value, or None."""
+    if flag not in argv:
+        return None
+    i = argv.index(flag)
+    if i + 1 >= len(argv):
+        print(f"ERROR|{flag} needs a value")
+        sys.exit(1)
+    value = argv[i + 1]
+    del argv[i:i + 2]
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"ERROR|Invalid value for {flag}: {value}")
+        sys.exit(1)
+
+
 def main():
+    argv = list(sys.argv)
+    concurrency = pop_option(argv, '--concurrency', int)
+    rate_limit = pop_option(argv, '--rate-limit', float)
+    batch_manifest = pop_option(argv, '--batch')
+    workers = pop_option(argv, '--workers', int)
+    cache_dir = pop_option(argv, '--cache-dir')
+    no_cache = '--no-cache' in argv
+    argv = [a for a in argv if a != '--no-cache']
+    configure_cache(cache_dir, enabled=not no_cache)
+    if concurrency is not None or rate_limit is not None:
+        configure_firecrawl(rate_limit, concurrency)
+
+    # ── --replay mode: re-run clean/categorize/truncate over archived raw scrapes ──
+    if '--replay' in argv:
+        # Usage: python process_venue.py --replay [<archive_dir>] [--workers <n>]
+        args = [a for a in argv if a != '--replay']
+        run_replay(args[1] if len(args) > 1 else None, workers)
+        return
+
     # ── --write-file mode: read structured file, write to Airtable, delete temps ──
-    if '--write-file' in sys.argv:
+    if '--write-file' in argv:
         # Usage: python process_venue.py --write-file <record_id> <structured_file> <airtable_key> <base_id>
-        args = [a for a in sys.argv if a != '--write-file']
+        args = [a for a in argv if a != '--write-file']
         if len(args) < 5:
             print("ERROR|Usage: python process_venue.py --write-file <record_id> <structured_file> <airtable_key> <base_id>")
             sys.exit(1)
@@ -795,9 +1604,9 @@ def main():
         return
 
     # ── --geocode mode: geocode venue address, write GPS to Airtable ──
-    if '--geocode' in sys.argv:
+    if '--geocode' in argv:
         # Usage: python process_venue.py --geocode <record_id> <venue_address> <airtable_key> <base_id>
-        args = [a for a in sys.argv if a != '--geocode']
+        args = [a for a in argv if a != '--geocode']
         if len(args) < 5:
             print("ERROR|Usage: python process_venue.py --geocode <record_id> <venue_address> <airtable_key> <base_id>")
             sys.exit(1)
@@ -819,23 +1628,19 @@ def main():
 
         # Write to Airtable gps_coordinates field as "lat, lon"
         coords = f"{lat}, {lon}"
-        url = f'https://api.airtable.com/v0/{base_id}/Venues/{record_id}'
-        status, _ = api_request(
-            url,
-            data={'fields': {'gps_coordinates': coords}},
-            headers=airtable_headers(at_key),
-            method='PATCH'
-        )
-        if status == 200:
+        queue = airtable_queue(at_key, base_id)
+        written = queue.update(record_id, {'gps_coordinates': coords})
+        queue.flush()
+        if written.ok:
             print(f"GEOCODED|{lat},{lon}")
         else:
-            print(f"GEOCODE_FAIL|Airtable PATCH failed ({status})")
+            print(f"GEOCODE_FAIL|Airtable PATCH failed ({written.error})")
         return
 
     # ── --write-json mode: write full + summary JSON files to Airtable ──
-    if '--write-json' in sys.argv:
+    if '--write-json' in argv:
         # Usage: python process_venue.py --write-json <record_id> <full_json_path> <summary_json_path> <airtable_key> <base_id>
-        args = [a for a in sys.argv if a != '--write-json']
+        args = [a for a in argv if a != '--write-json']
         if len(args) < 6:
             print("ERROR|Usage: python process_venue.py --write-json <record_id> <full_json_path> <summary_json_path> <airtable_key> <base_id>")
             sys.exit(1)
@@ -859,27 +1664,25 @@ def main():
         with open(summary_json_path, 'r', encoding='utf-8') as f:
             summary_json = f.read()
 
-        # PATCH both fields to Airtable in a single request
-        url = f'https://api.airtable.com/v0/{base_id}/Venues/{record_id}'
-        payload = {
-            'fields': {
-                'full_venue_json': full_json,
-                'summary_venue_json': summary_json
-            }
-        }
-        status, resp = api_request(url, data=payload, headers=airtable_headers(at_key), method='PATCH')
-
-        if status == 200:
+        # PATCH both fields to Airtable in a single update
+        queue = airtable_queue(at_key, base_id)
+        written = queue.update(record_id, {
+            'full_venue_json': full_json,
+            'summary_venue_json': summary_json
+        })
+        queue.flush()
+
+        if written.ok:
             print(f"JSON_WRITTEN|{len(full_json)}|{len(summary_json)}")
         else:
-            print(f"AIRTABLE_ERROR|JSON PATCH failed ({status})|{len(full_json)}+{len(summary_json)}")
+            print(f"AIRTABLE_ERROR|JSON PATCH failed ({written.error})|{len(full_json)}+{len(summary_json)}")
             sys.exit(1)
         return
 
     # ── --fetch-json-sources mode: download venue_url_scraped + brochure_text to temp files ──
-    if '--fetch-json-sources' in sys.argv:
+    if '--fetch-json-sources' in argv:
         # Usage: python process_venue.py --fetch-json-sources <record_id> <venue_name> <airtable_key> <base_id>
-        args = [a for a in sys.argv if a != '--fetch-json-sources']
+        args = [a for a in argv if a != '--fetch-json-sources']
         if len(args) < 5:
             print("ERROR|Usage: python process_venue.py --fetch-json-sources <record_id> <venue_name> <airtable_key> <base_id>")
             sys.exit(1)
@@ -890,15 +1693,20 @@ def main():
 
         log(f"Fetching JSON sources for: {venue_name} ({record_id})")
 
-        # Fetch the record from Airtable (single-record GET doesn't support fields[] filter)
-        url = f'https://api.airtable.com/v0/{base_id}/Venues/{record_id}'
-        status, resp = api_request(url, headers=airtable_headers(at_key), method='GET')
-
-        if status != 200:
-            print(f"FETCH_ERROR|Airtable GET failed ({status})")
+        # Refresh just the two long-text fields of this record into the local
+        # mirror (a projected list query; single-record GET can't use fields[])
+        mirror = AirtableMirror(at_key, base_id, 'Venues')
+        try:
+            mirror.refresh_records([record_id], ['venue_url_scraped', 'brochure_text'])
+        except AirtableError as e:
+            print(f"FETCH_ERROR|{e}")
+            sys.exit(1)
+        record = mirror.get(record_id)
+        if record is None:
+            print("FETCH_ERROR|record not found in Airtable")
             sys.exit(1)
 
-        fields = resp.get('fields', {}) if isinstance(resp, dict) else {}
+        fields = record['fields']
         scraped = fields.get('venue_url_scraped', '')
         brochure = fields.get('brochure_text', '')
 
@@ -929,8 +1737,20 @@ def main():
         return
 
     # Parse optional flags
-    scrape_only = '--scrape-only' in sys.argv
-    args = [a for a in sys.argv if a != '--scrape-only']
+    scrape_only = '--scrape-only' in argv
+    args = [a for a in argv if a != '--scrape-only']
+
+    # ── --batch mode: many records from a JSONL manifest, one status line each ──
+    if batch_manifest:
+        # Usage: python process_venue.py --batch <manifest.jsonl> [--scrape-only] [--workers <n>] <firecrawl_key> <airtable_key> <base_id>
+        if len(args) < 4:
+            print("ERROR|Usage: python process_venue.py --batch <manifest.jsonl> [--scrape-only] [--workers <n>] <firecrawl_key> <airtable_key> <base_id>")
+            sys.exit(1)
+        if not os.path.exists(batch_manifest):
+            print(f"ERROR|Manifest not found: {batch_manifest}|0")
+            sys.exit(1)
+        run_batch(batch_manifest, args[1], args[2], args[3], scrape_only, workers)
+        return
 
     if len(args) < 9:
         print("ERROR|Usage: python process_venue.py [--scrape-only] <record_id> <venue_url> <chateaubee_url> <wedinspire_url> <fwv_url> <firecrawl_key> <airtable_key> <base_id>")
@@ -947,105 +1767,7 @@ def main():
     at_key = args[7]
     base_id = args[8]
 
-    mode_label = "Scraping" if scrape_only else "Processing"
-    log(f"{mode_label} {venue_url} ...")
-
-    # ── Part 1: Venue Website (mandatory, multi-page) ──
-
-    result, info = scrape_venue_pages(venue_url, fc_key)
-
-    if result is None:
-        write_manual_check(record_id, info, at_key, base_id)
-        return
-
-    venue_pages = info  # page count
-    cleaned_venue = clean_markdown(result)
-
-    if not cleaned_venue.strip():
-        write_manual_check(record_id, "Empty content after cleaning", at_key, base_id)
-        return
-
-    venue_char_count = len(cleaned_venue.strip())
-    venue_word_count = len(cleaned_venue.split())
-    if venue_char_count < MIN_CONTENT_CHARS or venue_word_count < MIN_CONTENT_WORDS:
-        write_manual_check(
-            record_id,
-            f"Low quality content ({venue_char_count} chars, {venue_word_count} words)",
-            at_key, base_id
-        )
-        return
-
-    # ── Part 2: Listing Sites (optional, single-page) ──
-
-    listing_results = {}
-    sources = ['Venue']
-    listing_count = 0
-
-    for short, url in listing_urls.items():
-        if not url.strip():
-            continue
-
-        log(f"  Scraping listing: {short} ({url})")
-        time.sleep(RATE_LIMIT_DELAY)
-        md = scrape_page(url, fc_key)
-
-        if md:
-            cleaned = clean_markdown(md)
-            if cleaned.strip() and len(cleaned.strip()) >= MIN_LISTING_CHARS:
-                listing_results[short] = cleaned
-                sources.append(short)
-                listing_count += 1
-                log(f"  {short}: OK ({len(cleaned)} chars)")
-            else:
-                log(f"  {short}: empty or too short after cleaning, skipping")
-        else:
-            log(f"  {short}: scrape failed, skipping")
-
-    # ── Part 3: Output ──
-
-    if scrape_only:
-        # Save raw cleaned content to temp files for Claude to structure
-        os.makedirs(WORKING_DIR, exist_ok=True)
-
-        raw_path = os.path.join(WORKING_DIR, f'raw_{record_id}.md')
-        with open(raw_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned_venue)
-
-        for short in ['CB', 'WI', 'FWV']:
-            if short in listing_results:
-                listing_path = os.path.join(WORKING_DIR, f'listing_{record_id}_{short}.md')
-                with open(listing_path, 'w', encoding='utf-8') as f:
-                    f.write(listing_results[short])
-
-        sources_csv = ','.join(sources)
-        listing_chars = sum(len(v) for v in listing_results.values())
-        print(f"SCRAPED|{venue_char_count}|{venue_pages}+{listing_count}|{sources_csv}|{listing_chars}")
-        return
-
-    # Full pipeline mode: categorize + combine + write to Airtable
-    categorized_venue = categorize_content(cleaned_venue)
-
-    label_map = {'CB': '**ChateauBee**', 'WI': '**WedInspire**', 'FWV': '**French Wedding Venues**'}
-    parts = [f"**Venue Website**\n\n{categorized_venue}"]
-
-    for short in ['CB', 'WI', 'FWV']:
-        if short in listing_results:
-            label = label_map[short]
-            parts.append(f"{label}\n\n{listing_results[short]}")
-
-    combined = '\n\n---\n\n'.join(parts)
-    final, was_truncated = truncate_content(combined)
-
-    # Write to Airtable
-    success = write_to_airtable(record_id, final, at_key, base_id)
-
-    if success:
-        char_count = len(final)
-        trunc_note = " Truncated" if was_truncated else ""
-        sources_csv = ','.join(sources)
-        print(f"SUCCESS|{char_count}|{venue_pages}+{listing_count}|{sources_csv}{trunc_note}")
-    else:
-        print(f"AIRTABLE_ERROR|PATCH failed|0")
+    print(process_record(record_id, venue_url, listing_urls, fc_key, at_key, base_id, scrape_only))
 
 
 if __name__ == '__main__':